@@ -0,0 +1,44 @@
+"""structured log store
+
+Revision ID: 3b1f7c9d2e40
+Revises: fcf0e6522047
+Create Date: 2026-10-19 10:12:31.208114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b1f7c9d2e40'
+down_revision: Union[str, Sequence[str], None] = 'fcf0e6522047'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('logs', sa.Column('logger', sa.String(length=50), nullable=True))
+    op.add_column('logs', sa.Column('lineno', sa.Integer(), nullable=True))
+    op.create_index('ix_logs_timestamp', 'logs', ['timestamp'], unique=False)
+    op.create_index('ix_logs_level_timestamp', 'logs', ['level', 'timestamp'], unique=False)
+    op.create_index('ix_logs_logger_timestamp', 'logs', ['logger', 'timestamp'], unique=False)
+    op.create_table('log_sources',
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('inode', sa.Integer(), nullable=False),
+    sa.Column('offset', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('path')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('log_sources')
+    op.drop_index('ix_logs_logger_timestamp', table_name='logs')
+    op.drop_index('ix_logs_level_timestamp', table_name='logs')
+    op.drop_index('ix_logs_timestamp', table_name='logs')
+    with op.batch_alter_table('logs') as batch_op:
+        batch_op.drop_column('lineno')
+        batch_op.drop_column('logger')
@@ -0,0 +1,123 @@
+"""weather history per location
+
+Revision ID: 5c2e8a7d1f36
+Revises: 3b1f7c9d2e40
+Create Date: 2026-10-19 11:02:47.531906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8a7d1f36'
+down_revision: Union[str, Sequence[str], None] = '3b1f7c9d2e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _location_columns() -> list:
+    return [
+        sa.Column('city', sa.String(), nullable=False),
+        sa.Column('lat', sa.Float(), nullable=False),
+        sa.Column('lon', sa.Float(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('country', sa.String(), nullable=True),
+    ]
+
+
+def _forecast_columns() -> list:
+    return [
+        sa.Column('time_requested', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('sunrise', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('sunset', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('moonrise', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('moonset', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('min_temp_c', sa.Float(), nullable=True),
+        sa.Column('max_temp_c', sa.Float(), nullable=True),
+        sa.Column('avg_temp_c', sa.Float(), nullable=True),
+        sa.Column('min_temp_f', sa.Float(), nullable=True),
+        sa.Column('max_temp_f', sa.Float(), nullable=True),
+        sa.Column('avg_temp_f', sa.Float(), nullable=True),
+        sa.Column('maxwind_kph', sa.Float(), nullable=True),
+        sa.Column('avgvis_km', sa.Float(), nullable=True),
+        sa.Column('maxwind_mph', sa.Float(), nullable=True),
+        sa.Column('avgvis_miles', sa.Float(), nullable=True),
+        sa.Column('daily_chance_of_rain', sa.Float(), nullable=True),
+        sa.Column('daily_chance_of_snow', sa.Float(), nullable=True),
+        sa.Column('daily_will_it_rain', sa.Integer(), nullable=True),
+        sa.Column('daily_will_it_snow', sa.Integer(), nullable=True),
+    ]
+
+
+def _current_columns() -> list:
+    return [
+        sa.Column('text', sa.String(), nullable=True),
+        sa.Column('temp_c', sa.Float(), nullable=True),
+        sa.Column('feels_c', sa.Float(), nullable=True),
+        sa.Column('temp_f', sa.Float(), nullable=True),
+        sa.Column('feels_f', sa.Float(), nullable=True),
+        sa.Column('humidity', sa.String(), nullable=True),
+        sa.Column('wind_kph', sa.Float(), nullable=True),
+        sa.Column('wind_mph', sa.Float(), nullable=True),
+        sa.Column('wind_dir', sa.Float(), nullable=True),
+        sa.Column('time_requested', sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def _alert_columns() -> list:
+    return [
+        sa.Column('headline', sa.String(), nullable=True),
+        sa.Column('event', sa.String(), nullable=True),
+        sa.Column('certainty', sa.String(), nullable=True),
+        sa.Column('urgency', sa.String(), nullable=True),
+        sa.Column('severity', sa.String(), nullable=True),
+        sa.Column('note', sa.String(), nullable=True),
+        sa.Column('effective', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('instructions', sa.String(), nullable=True),
+        sa.Column('time_requested', sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # rows keyed by country hold whichever city of it was fetched last, there is no location or day to carry over
+    op.drop_table('forecasts')
+    op.drop_table('alerts')
+    op.drop_table('current')
+    for name, columns in (('current', _current_columns), ('alerts', _alert_columns), ('forecasts', _forecast_columns)):
+        op.create_table(name,
+        *_location_columns(),
+        *columns(),
+        sa.PrimaryKeyConstraint('city', 'lat', 'lon', 'date')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('forecasts')
+    op.drop_table('alerts')
+    op.drop_table('current')
+    op.create_table('current',
+    sa.Column('city', sa.String(), nullable=False),
+    sa.Column('country', sa.String(), nullable=True),
+    *_current_columns(),
+    sa.PrimaryKeyConstraint('city')
+    )
+    op.create_table('alerts',
+    sa.Column('country', sa.String(), nullable=False),
+    sa.Column('city', sa.String(), nullable=True),
+    *_alert_columns(),
+    sa.ForeignKeyConstraint(['city'], ['current.city'], ),
+    sa.PrimaryKeyConstraint('country')
+    )
+    op.create_table('forecasts',
+    sa.Column('country', sa.String(), nullable=False),
+    *_forecast_columns(),
+    sa.Column('city', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['city'], ['current.city'], ),
+    sa.PrimaryKeyConstraint('country')
+    )
@@ -0,0 +1,35 @@
+"""logs explicit id
+
+Revision ID: 9d4b6e2a8c17
+Revises: 5c2e8a7d1f36
+Create Date: 2026-10-19 14:26:09.418352
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4b6e2a8c17'
+down_revision: Union[str, Sequence[str], None] = '5c2e8a7d1f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ids start as the current rowids, so the log vector index built on them stays valid across the rebuild
+    op.add_column('logs', sa.Column('id', sa.Integer(), nullable=True))
+    op.execute('UPDATE logs SET id = rowid')
+    with op.batch_alter_table('logs', recreate='always', table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        batch_op.alter_column('id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_primary_key('pk_logs', ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # the primary key goes with its only column
+    with op.batch_alter_table('logs', recreate='always') as batch_op:
+        batch_op.drop_column('id')
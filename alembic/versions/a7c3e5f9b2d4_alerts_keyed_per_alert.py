@@ -0,0 +1,59 @@
+"""alerts keyed per alert
+
+Revision ID: a7c3e5f9b2d4
+Revises: 9d4b6e2a8c17
+Create Date: 2026-10-19 15:08:44.672019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e5f9b2d4'
+down_revision: Union[str, Sequence[str], None] = '9d4b6e2a8c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _alerts_table(*key: str) -> sa.Table:
+    """The alerts table as it stands, with key as its primary key, batch mode rebuilds to this shape"""
+    keyed = set(key)
+    return sa.Table('alerts', sa.MetaData(),
+    sa.Column('city', sa.String(), nullable=False),
+    sa.Column('lat', sa.Float(), nullable=False),
+    sa.Column('lon', sa.Float(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('country', sa.String(), nullable=True),
+    sa.Column('headline', sa.String(), nullable='headline' not in keyed),
+    sa.Column('event', sa.String(), nullable=True),
+    sa.Column('certainty', sa.String(), nullable=True),
+    sa.Column('urgency', sa.String(), nullable=True),
+    sa.Column('severity', sa.String(), nullable=True),
+    sa.Column('note', sa.String(), nullable=True),
+    sa.Column('effective', sa.String(), nullable='effective' not in keyed),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('instructions', sa.String(), nullable=True),
+    sa.Column('time_requested', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint(*key)
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the new key columns cannot hold NULL, empty strings keep the rows already stored
+    op.execute("UPDATE alerts SET headline = coalesce(headline, ''), effective = coalesce(effective, '')")
+    with op.batch_alter_table('alerts', recreate='always', copy_from=_alerts_table('city', 'lat', 'lon', 'date', 'headline', 'effective')):
+        pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # one row per location and day again, the last alert stored for it is kept
+    op.execute(
+        "DELETE FROM alerts WHERE rowid NOT IN (SELECT max(rowid) FROM alerts GROUP BY city, lat, lon, date)"
+    )
+    with op.batch_alter_table('alerts', recreate='always', copy_from=_alerts_table('city', 'lat', 'lon', 'date')):
+        pass
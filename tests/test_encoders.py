@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from theodore.ai import encoders
+
+
+INTENTS = {
+    "START-SERVERS": ["start the servers", "boot up the backend", "spin up the services", "bring the servers online"],
+    "STOP-SERVERS": ["stop the servers", "shut down the backend", "kill the services", "take the servers offline"],
+    "WEATHER": ["what is the weather today", "will it rain tomorrow", "is it sunny outside", "weather forecast please"],
+    "SHOW-DASH": ["show the dashboard", "open the status panel", "display the live metrics", "bring up the monitoring board"],
+}
+
+
+class FakeEncoding:
+    def __init__(self, length: int, width: int):
+        self.ids = [1] * length + [0] * (width - length)
+        self.attention_mask = [1] * length + [0] * (width - length)
+        self.type_ids = [0] * width
+
+
+class FakeTokenizer:
+    def encode_batch(self, texts):
+        width = max(len(text.split()) for text in texts)
+        return [FakeEncoding(len(text.split()), width) for text in texts]
+
+
+class FakeSession:
+    """Returns random hidden states, padded positions get large values that pooling must ignore"""
+    def run(self, _, feeds):
+        mask = feeds["attention_mask"]
+        hidden = np.random.default_rng(0).random((*mask.shape, 8)).astype(np.float32)
+        hidden[mask == 0] = 1e3
+        self.hidden = hidden
+        return [hidden]
+
+
+def test_onnx_pooling_ignores_padding():
+    encoder = encoders.OnnxEncoder()
+    encoder._tokenizer, encoder._session, encoder._inputs = FakeTokenizer(), FakeSession(), ["input_ids", "attention_mask"]
+
+    vectors = encoder.encode(["one two", "one two three four"])
+    expected = encoder._session.hidden[0, :2].mean(axis=0)
+    assert np.allclose(vectors[0], expected / np.linalg.norm(expected), atol=1e-6)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-6)
+    assert encoder.encode("one two").shape == (8,)
+
+
+@pytest.fixture(scope="module")
+def reference():
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+    huggingface_hub = pytest.importorskip("huggingface_hub")
+    try:
+        for filename in ("onnx/model.onnx", "tokenizer.json"):
+            huggingface_hub.hf_hub_download(encoders.SENTENCE_REPO, filename, local_files_only=True)
+    except Exception:
+        pytest.skip(f"{encoders.SENTENCE_REPO} weights are not in the local hub cache")
+    return encoders.TorchEncoder()
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_onnx_matches_torch(reference, backend):
+    candidate = encoders.make_encoder(backend)
+    assert candidate.name == backend
+
+    sentences = [txt for items in INTENTS.values() for txt in items]
+    similarity = np.sum(reference.encode(sentences) * candidate.encode(sentences), axis=1)
+    # the fp32 graph is the same network, int8 weights move the vectors slightly
+    assert similarity.min() > (0.999 if backend == "onnx" else 0.97)
+
+    check = encoders.top1_agreement(INTENTS, reference, candidate)
+    assert check["agreement"] >= encoders.AGREEMENT_MIN
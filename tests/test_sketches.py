@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from theodore.core.etl_helpers import ProfileAccumulator
+from theodore.core.sketches import DistinctCounter, HyperLogLog, TDigest, EXACT_LIMIT
+
+
+def hashes(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 2**64, size=n, dtype=np.uint64)
+
+
+@pytest.mark.parametrize("n", [1_000, 50_000, 1_000_000])
+def test_hll_within_error_bound(n):
+    hll = HyperLogLog()
+    hll.add(hashes(n))
+    # three standard errors, the estimate stays inside it far more often than 99% of the time
+    assert abs(hll.count() - n) / n < 3 * 1.04 / np.sqrt(hll.m)
+
+
+def test_hll_merge_counts_the_union():
+    values = hashes(200_000)
+    a, b, whole = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    a.add(values[:120_000])
+    b.add(values[80_000:])
+    whole.add(values)
+    assert np.array_equal(a.merge(b).registers, whole.registers)
+
+
+def test_distinct_counter_is_exact_below_the_limit():
+    counter = DistinctCounter()
+    values = hashes(EXACT_LIMIT)
+    counter.add(values)
+    counter.add(values[:100])
+    assert counter.exact and counter.count() == EXACT_LIMIT
+
+    counter.add(hashes(EXACT_LIMIT, seed=1))
+    assert not counter.exact
+    assert abs(counter.count() - 2 * EXACT_LIMIT) / (2 * EXACT_LIMIT) < 0.05
+
+
+def test_distinct_counter_merges_exact_into_estimate():
+    small, large = DistinctCounter(), DistinctCounter()
+    small.add(hashes(100, seed=2))
+    large.add(hashes(20_000, seed=3))
+    assert abs(large.merge(small).count() - 20_100) / 20_100 < 0.05
+
+
+@pytest.mark.parametrize("q", [0.001, 0.01, 0.25, 0.5, 0.75, 0.99, 0.999])
+def test_tdigest_quantiles(q):
+    values = np.random.default_rng(4).lognormal(size=200_000)
+    digest = TDigest()
+    for chunk in np.array_split(values, 20):
+        digest.update(chunk)
+    assert not digest.exact
+    # rank error is what a t-digest bounds, and it shrinks toward the tails
+    rank = np.mean(values <= digest.quantile(q))
+    assert abs(rank - q) < max(0.005, 2 * q * (1 - q) * 0.02)
+
+
+def test_tdigest_exact_below_the_limit():
+    values = np.random.default_rng(5).normal(size=5_000)
+    digest = TDigest()
+    digest.update(values)
+    assert digest.exact
+    assert digest.quantile(0.9) == pytest.approx(np.quantile(values, 0.9))
+    assert digest.cdf(0.0) == pytest.approx(np.mean(values <= 0.0))
+
+
+def test_tdigest_merge_matches_single_digest():
+    values = np.random.default_rng(6).normal(size=100_000)
+    merged, whole = TDigest(), TDigest()
+    parts = np.array_split(values, 7)
+    for part in parts:
+        digest = TDigest()
+        digest.update(part)
+        merged.merge(digest)
+    whole.update(values)
+
+    assert merged.count == whole.count == values.size
+    assert (merged.min, merged.max) == (values.min(), values.max())
+    for q in (0.01, 0.5, 0.99):
+        assert abs(np.mean(values <= merged.quantile(q)) - q) < 0.005
+
+
+def test_welford_chan_merge_matches_numpy():
+    rng = np.random.default_rng(7)
+    # a large offset is where the naive sum of squares loses its digits
+    values = 1e9 + rng.normal(scale=3.0, size=30_000)
+    accumulator = ProfileAccumulator()
+    for chunk in np.array_split(values, 9):
+        accumulator.update(pd.DataFrame({"x": chunk}))
+
+    mean, std = accumulator.mean_std("x")
+    assert mean == pytest.approx(values.mean(), rel=1e-12)
+    assert std == pytest.approx(values.std(ddof=1), rel=1e-6)
+
+
+def test_profile_accumulators_merge_like_one_pass():
+    rng = np.random.default_rng(8)
+    frame = pd.DataFrame({"x": rng.normal(size=9_000), "y": rng.integers(0, 50, size=9_000)})
+    left, right, whole = ProfileAccumulator(), ProfileAccumulator(), ProfileAccumulator()
+    left.update(frame.iloc[:4_000])
+    right.update(frame.iloc[4_000:])
+    whole.update(frame)
+    left.merge(right)
+
+    assert left.rows == whole.rows
+    for col in ("x", "y"):
+        assert left.mean_std(col) == pytest.approx(whole.mean_std(col), rel=1e-9)
+        assert left.moments[col][3:] == whole.moments[col][3:]
+    assert left.uniques["y"].count() == whole.uniques["y"].count() == 50
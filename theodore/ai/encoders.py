@@ -0,0 +1,225 @@
+"""
+
+Pluggable sentence encoders for IntentRouter.
+"torch" is the SentenceTransformer path. "onnx" runs the same all-MiniLM-L6-v2 graph in ONNX Runtime with the
+fast tokenizer, mean pooling and normalisation done in numpy, so neither torch nor transformers is imported.
+"onnx-int8" is that graph with its weights dynamically quantized to int8, made once and kept under data/models.
+THEODORE_INTENT_BACKEND picks one, a missing onnxruntime or tokenizers falls back to torch.
+
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+from pathlib import Path
+
+from theodore.core.informers import base_logger
+from theodore.core.lazy import sentence_model, SENTENCE_MODEL
+from theodore.core.paths import DATA_DIR
+
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+ENCODER_BACKEND = os.getenv("THEODORE_INTENT_BACKEND", "torch").lower()
+SENTENCE_REPO = f"sentence-transformers/{SENTENCE_MODEL}"
+MODELS_DIR = DATA_DIR/"models"
+MAX_SEQ_LENGTH = 256        # the model card's max_seq_length, longer input is truncated as SentenceTransformer does
+ENCODE_BATCH = 64
+AGREEMENT_MIN = 0.98        # share of utterances whose top-1 intent must match the torch path
+
+
+class TorchEncoder:
+    name = "torch"
+
+    def __init__(self):
+        self._model = None
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        # warm_up and a waiting match may both get here first, the lock keeps it to one load
+        with self._lock:
+            if self._model is None:
+                self._model = sentence_model()
+
+    def encode(self, text: str | list[str]) -> np.ndarray:
+        if self._model is None:
+            self.load()
+        return self._model.encode(text, convert_to_numpy=True, precision="float32")
+
+
+class OnnxEncoder:
+    def __init__(self, quantized: bool = False):
+        self.quantized = quantized
+        self.name = "onnx-int8" if quantized else "onnx"
+        self._session = None
+        self._tokenizer = None
+        self._inputs: list[str] = []
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                return
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+
+            model_path = hub_file("onnx/model.onnx")
+            if self.quantized:
+                model_path = quantized_model(Path(model_path))
+
+            tokenizer = Tokenizer.from_file(hub_file("tokenizer.json"))
+            tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+            tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+            session = ort.InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+            self._inputs = [node.name for node in session.get_inputs()]
+            self._tokenizer, self._session = tokenizer, session
+
+    def encode(self, text: str | list[str]) -> np.ndarray:
+        if self._session is None:
+            self.load()
+        single = isinstance(text, str)
+        texts = [text] if single else list(text)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        vectors = np.concatenate([self._encode_batch(texts[i:i + ENCODE_BATCH]) for i in range(0, len(texts), ENCODE_BATCH)])
+        return vectors[0] if single else vectors
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        encodings = self._tokenizer.encode_batch(texts)
+        mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": mask,
+            "token_type_ids": np.array([encoding.type_ids for encoding in encodings], dtype=np.int64),
+        }
+        hidden = self._session.run(None, {name: feeds[name] for name in self._inputs})[0]
+
+        # the Pooling(mean) and Normalize modules of the SentenceTransformer pipeline
+        weights = mask[..., None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        return (pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)).astype(np.float32)
+
+
+def hub_file(filename: str) -> str:
+    """Path of a model repo file, from the local hub cache when it is there so an offline start neither waits nor fails"""
+    from huggingface_hub import hf_hub_download
+    from huggingface_hub.utils import LocalEntryNotFoundError
+
+    try:
+        return hf_hub_download(SENTENCE_REPO, filename, local_files_only=True)
+    except LocalEntryNotFoundError:
+        return hf_hub_download(SENTENCE_REPO, filename)
+
+
+def quantized_model(source: Path) -> Path:
+    """Int8 weight copy of the exported graph, activations are quantized per call by ONNX Runtime"""
+    target = MODELS_DIR/f"{SENTENCE_MODEL}-int8.onnx"
+    if not target.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        MODELS_DIR.mkdir(parents=True, exist_ok=True)
+        partial = target.with_suffix(".part")
+        quantize_dynamic(str(source), str(partial), weight_type=QuantType.QInt8)
+        partial.rename(target)
+    return target
+
+
+def make_encoder(backend: str = ENCODER_BACKEND) -> TorchEncoder | OnnxEncoder:
+    if backend not in BACKENDS:
+        base_logger.internal(f"Unknown intent backend '{backend}', using torch")
+        return TorchEncoder()
+    if backend == "torch":
+        return TorchEncoder()
+    if not all(importlib.util.find_spec(module) for module in ("onnxruntime", "tokenizers", "huggingface_hub")):
+        base_logger.internal(f"Intent backend '{backend}' needs onnxruntime and tokenizers, using torch")
+        return TorchEncoder()
+    return OnnxEncoder(quantized=backend == "onnx-int8")
+
+
+def top1_agreement(data: dict[str, list[str]], reference, candidate) -> dict:
+    """
+    Leave-one-out intent of every train utterance under both encoders: each one is matched against all the others.
+    `agreement` is the share where both pick the same intent, the accuracies are against the true labels.
+    """
+    labels = np.array([label for label, sentences in data.items() for _ in sentences])
+    sentences = [txt for items in data.values() for txt in items]
+
+    picks = []
+    for encoder in (reference, candidate):
+        vectors = encoder.encode(sentences)
+        vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, -np.inf)
+        picks.append(labels[similarity.argmax(axis=1)])
+
+    return {
+        "utterances": len(sentences),
+        "agreement": float(np.mean(picks[0] == picks[1])),
+        "reference_accuracy": float(np.mean(picks[0] == labels)),
+        "candidate_accuracy": float(np.mean(picks[1] == labels)),
+    }
+
+
+def benchmark_encoders(backends: list[str], texts: list[str], repeats: int = 50) -> dict:
+    """
+    Load time, resident memory added and per-utterance latency of each backend, loaded one after another
+    in this process, so a later backend's memory excludes what an earlier one already imported.
+    """
+    import psutil
+
+    process = psutil.Process()
+    results = {}
+    for backend in backends:
+        encoder = make_encoder(backend)
+        rss = process.memory_info().rss
+        start = time.perf_counter()
+        encoder.load()
+        encoder.encode(texts[0])
+        loaded = time.perf_counter() - start
+
+        single = []
+        for i in range(repeats):
+            start = time.perf_counter()
+            encoder.encode(texts[i % len(texts)])
+            single.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        encoder.encode(texts)
+        batch = time.perf_counter() - start
+
+        ms = np.array(single) * 1000
+        results[encoder.name] = {
+            "load_s": round(loaded, 2),
+            "rss_mb": round((process.memory_info().rss - rss) / 1024**2, 1),
+            "p50_ms": round(float(np.percentile(ms, 50)), 2),
+            "p95_ms": round(float(np.percentile(ms, 95)), 2),
+            "batch_per_s": round(len(texts) / batch, 1),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    # python -m theodore.ai.encoders --bench [backend ...]
+    from theodore.ai.train_data import DEFAULT_TRAIN_DATA
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        backends = sys.argv[2:] or list(BACKENDS)
+        texts = [txt for items in DEFAULT_TRAIN_DATA.values() for txt in items]
+        for name, result in benchmark_encoders(backends, texts).items():
+            print(f"{name:<10} load {result['load_s']}s  +{result['rss_mb']} mb  "
+                  f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  {result['batch_per_s']} utterances/s")
+
+        reference = make_encoder("torch")
+        failed = False
+        for backend in backends:
+            if backend == "torch":
+                continue
+            check = top1_agreement(DEFAULT_TRAIN_DATA, reference, make_encoder(backend))
+            failed |= check["agreement"] < AGREEMENT_MIN
+            print(f"{backend} vs torch: top-1 agreement {check['agreement']:.3f} over {check['utterances']} utterances "
+                  f"(accuracy {check['reference_accuracy']:.3f} -> {check['candidate_accuracy']:.3f})")
+        sys.exit(1 if failed else 0)
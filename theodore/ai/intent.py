@@ -1,27 +1,121 @@
+import hashlib
 import json
+import os
+import threading
+import time
+import traceback
 import numpy as np
+from collections import OrderedDict
 from pathlib import Path
 
 from theodore.core.file_helpers import resolve_path
+from theodore.core.informers import base_logger
+from theodore.core.logger_setup import error_logger
+from theodore.ai.rules import RuleMatcher, normalize_text
 from theodore.core.paths import DATA_DIR
 
-from theodore.core.lazy import SentenceModel, sentence_model
+from theodore.core.lazy import get_encoder, SENTENCE_MODEL
 from theodore.core.exceptions import MissingParamArgument
 
 
+EMBEDDINGS_DIR = DATA_DIR/"vector_embeddings"
+EMBEDDINGS_PATH = EMBEDDINGS_DIR/"theodore_train_data_embeddings.npy"
+LABELS_PATH = EMBEDDINGS_DIR/"theodore_train_data_labels.json"
+FINGERPRINT_PATH = EMBEDDINGS_DIR/"theodore_train_data_fingerprint.json"
+UTTERANCE_CACHE_PATH = EMBEDDINGS_DIR/"theodore_utterance_cache.npz"
+UTTERANCE_CACHE_SIZE = int(os.getenv("THEODORE_INTENT_CACHE", 1024))     # 0 turns the cache off
+
+
+class UtteranceCache:
+    """
+    LRU of normalized utterance to its unit embedding, intent and confidence, in front of the encoder.
+    Entries hold for one train data fingerprint, a persisted file written under another one is ignored on load.
+    """
+    def __init__(self, fingerprint: str, size: int = UTTERANCE_CACHE_SIZE, path: Path | None = None):
+        self.fingerprint = fingerprint
+        self.size = size
+        self.path = path
+        self.entries: OrderedDict[str, tuple[np.ndarray, str, float]] = OrderedDict()
+        self.hits = self.misses = 0
+        self._dirty = False
+        if path is not None and size > 0:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str) -> tuple[np.ndarray, str, float] | None:
+        if (entry:=self.entries.get(key)) is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, vector: np.ndarray, label: str, confidence: float) -> None:
+        if self.size <= 0:
+            return
+        self.entries[key] = (vector.astype(np.float32, copy=False), label, float(confidence))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        self._dirty = True
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as saved:
+                if str(saved["fingerprint"]) != self.fingerprint:
+                    base_logger.internal("Utterance cache was made for other train data, starting empty")
+                    return
+                rows = zip(saved["texts"].tolist(), saved["vectors"], saved["labels"].tolist(), saved["confidences"].tolist())
+                # saved oldest first, the most recent keep their place when size shrank since
+                for key, vector, label, confidence in list(rows)[-self.size:]:
+                    self.entries[key] = (vector, label, confidence)
+        except (OSError, ValueError, KeyError):
+            base_logger.internal(f"Unreadable utterance cache at {self.path}, starting empty")
+            self.entries.clear()
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty or not self.entries:
+            return
+        texts, rows = list(self.entries), list(self.entries.values())
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        partial = self.path.with_suffix(".part")
+        with partial.open("wb") as f:
+            np.savez(
+                f,
+                fingerprint=np.array(self.fingerprint),
+                texts=np.array(texts),
+                vectors=np.stack([vector for vector, _, _ in rows]),
+                labels=np.array([label for _, label, _ in rows]),
+                confidences=np.array([confidence for _, _, confidence in rows], dtype=np.float32),
+            )
+        partial.replace(self.path)
+        self._dirty = False
+
+
 class IntentRouter:
     def __init__(
             self,
             *,
             train_data: Path | None = None, 
             data_embeddings_path: Path | None = None, 
-            labels_embeddings_path: Path | None = None
+            labels_embeddings_path: Path | None = None,
+            cache_size: int = UTTERANCE_CACHE_SIZE,
+            cache_path: Path | None = None
         ):
 
         if not (paths:=all((data_embeddings_path, labels_embeddings_path))) and train_data is None:
             raise MissingParamArgument(f"{self.__str__} Expects a 'data_embeddings_path' and 'labels_embeddings_path', or 'Train Data' but None was given.")
         
-        self.model: SentenceModel | None = None
+        self.encoder = get_encoder()
+        # vectors of different backends are close but not interchangeable, cached ones belong to the backend that made them
+        self.model_id = f"{SENTENCE_MODEL}:{self.encoder.name}"
+        self.rules: RuleMatcher | None = None
+        self.ready = threading.Event()
+        self.timings: dict[str, float] = {}
         
         if paths:
             try:
@@ -31,46 +125,135 @@ class IntentRouter:
                 raise
             except json.JSONDecodeError:
                 raise
+            digest = hashlib.sha256(json.dumps([self.model_id, self.labels]).encode())
+            digest.update(np.ascontiguousarray(self.embeddings).tobytes())
+            self.fingerprint = digest.hexdigest()
         elif train_data:
             try:
                 data = json.loads(resolve_path(train_data).read_text())
             except json.JSONDecodeError:
                 raise
 
-            sentences = [txt for sentence_list in data.values() for txt in sentence_list]
             self.labels = [label for label, sentence_list in data.items() for _ in range(len(sentence_list))]
+            self.rules = RuleMatcher(data)
+            self.fingerprint, intents = train_fingerprint(data, self.model_id)
+            self.embeddings = self._load_or_encode(data, intents)
+
+        self.cache = UtteranceCache(self.fingerprint, size=cache_size, path=cache_path)
+    
+    def _load_or_encode(self, data: dict, intents: dict) -> np.ndarray:
+        """
+        Cached unit embeddings when the fingerprint of train data and model name matches. Otherwise intents
+        whose own hash is unchanged keep their cached rows and only new or edited intents go through the model.
+        """
+        cached, previous = None, {}
+        if FINGERPRINT_PATH.exists() and EMBEDDINGS_PATH.exists() and LABELS_PATH.exists():
+            try:
+                meta = json.loads(FINGERPRINT_PATH.read_text())
+                cached = np.load(str(EMBEDDINGS_PATH))
+                cached_labels = json.loads(LABELS_PATH.read_text())
+            except (OSError, ValueError):
+                meta, cached = {}, None
+            if cached is not None and meta.get("model") == self.model_id and len(cached_labels) == len(cached):
+                if meta.get("fingerprint") == self.fingerprint:
+                    base_logger.internal("Intent embeddings loaded from cache")
+                    return cached
+                # rows of an intent are contiguous, in the order the intents were listed
+                offsets, start = {}, 0
+                for label in dict.fromkeys(cached_labels):
+                    count = cached_labels.count(label)
+                    offsets[label] = (start, start + count)
+                    start += count
+                previous = {
+                    label: cached[slice(*offsets[label])]
+                    for label, digest in meta.get("intents", {}).items()
+                    if label in offsets and intents.get(label) == digest
+                }
 
-            embeddings = self.encode_text(sentences)
-            self.embeddings = get_unit_vec(embeddings)
+        stale = [label for label in data if label not in previous]
+        if stale:
+            sentences = [txt for label in stale for txt in data[label]]
+            encoded = get_unit_vec(self.encode_text(sentences))
+            start = 0
+            for label in stale:
+                previous[label] = encoded[start:start + len(data[label])]
+                start += len(data[label])
+            base_logger.internal(f"Intent embeddings re-encoded for {len(stale)} of {len(data)} intents")
 
-            embeddings_dir = DATA_DIR/"vector_embeddings"
-            embeddings_dir.mkdir(exist_ok=True, parents=True)
+        embeddings = np.concatenate([previous[label] for label in data]).astype(np.float32, copy=False)
 
-            npy_path = embeddings_dir/"theodore_train_data_embeddings.npy"
-            json_path = embeddings_dir/"theodore_train_data_labels.json"
+        EMBEDDINGS_DIR.mkdir(exist_ok=True, parents=True)
+        np.save(file=EMBEDDINGS_PATH, arr=embeddings)
+        LABELS_PATH.write_text(json.dumps(self.labels))
+        # written last, a crash in between leaves a mismatch that simply re-encodes next time
+        FINGERPRINT_PATH.write_text(json.dumps({"model": self.model_id, "fingerprint": self.fingerprint, "intents": intents}))
+        return embeddings
 
+    def warm_up(self, started: float | None = None) -> threading.Thread:
+        """
+        Import and load the sentence model on a background thread, match(wait=False) answers from the rules until it is done.
+        `started` is the perf_counter the caller counts from, time to model ready is kept in timings.
+        """
+        started = time.perf_counter() if started is None else started
 
-            np.save(file=npy_path, arr=self.embeddings)
-            json_path.write_text(json.dumps(self.labels))
-    
-    def match(self, text: str) -> tuple[str, float]:
-        vector = self.encode_text(text)
-        similarities =  get_similarity(self.embeddings, get_unit_vec(vector))
+        def load() -> None:
+            try:
+                self.encode_text("warm up")
+                self.timings["model_ready"] = time.perf_counter() - started
+                base_logger.internal(f"Intent model ready after {round(self.timings['model_ready'], 2)}s")
+            except Exception:
+                error_logger.internal(traceback.format_exc())
+            finally:
+                # a model that failed to load is not coming, match falls through to it and raises there
+                self.ready.set()
+
+        thread = threading.Thread(target=load, name="intent-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def match(self, text: str, wait: bool = True) -> tuple[str | None, float]:
+        """
+        Best intent and its cosine confidence. Utterances seen before answer from the cache without the model,
+        otherwise with wait=False a model still loading is not waited on and the rules answer instead.
+        """
+        key = normalize_text(text)
+        if (cached:=self.cache.get(key)) is not None:
+            return cached[1], cached[2]
+
+        if not wait and not self.ready.is_set():
+            if self.rules is None:
+                return None, 0.0
+            return self.rules.match(text)
+
+        vector = get_unit_vec(self.encode_text(text))
+        similarities =  get_similarity(self.embeddings, vector)
 
         best_idx = similarities.argmax()
         best_match = self.labels[best_idx]
-        confidence = similarities[best_idx]
+        confidence = float(similarities[best_idx])
 
+        self.cache.put(key, vector, best_match, confidence)
         return best_match, confidence
     
     def encode_text(self, text: str | list[str]) -> np.ndarray:
-        model = self._get_model()
-        return model.encode(text, convert_to_numpy=True, precision="float32")
-    
-    def _get_model(self) -> SentenceModel:
-        if self.model is None:
-            self.model = sentence_model()
-        return self.model
+        return self.encoder.encode(text)
+
+    def save_cache(self) -> None:
+        """Persist the utterance cache, a no-op when it was built without a path"""
+        try:
+            self.cache.save()
+        except OSError:
+            error_logger.internal(traceback.format_exc())
+
+
+def train_fingerprint(data: dict, model_id: str = SENTENCE_MODEL) -> tuple[str, dict]:
+    """Digest of the whole train data with the model id, and one digest per intent"""
+    intents = {
+        label: hashlib.sha256(json.dumps([model_id, label, sentences]).encode()).hexdigest()
+        for label, sentences in data.items()
+    }
+    overall = hashlib.sha256(json.dumps([model_id, list(intents.items())]).encode()).hexdigest()
+    return overall, intents
 
 
 def get_unit_vec(vector: np.ndarray):
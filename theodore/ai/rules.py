@@ -17,6 +17,62 @@ def extract_entities(text):
 }
 
 CONFIDENCE_THRESHOLD = 0.50
+# keyword votes are not cosine similarities, they answer only when one intent clearly leads
+RULES_THRESHOLD = 0.60
+RULES_MARGIN = 0.30
+WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "the", "to", "of", "for", "in", "on", "me", "my", "this", "that", "is", "are", "i",
+    "please", "can", "you", "it", "with", "up", "and", "what", "how", "some", "all", "now",
+}
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase words only, so 'Show the dashboard!' and 'show the  dashboard' are one utterance"""
+    return " ".join(WORD.findall(text.lower()))
+
+
+class RuleMatcher:
+    """
+    Model free intent matching from the train data. Exact utterances answer with full confidence,
+    otherwise each content word votes for the intents it appears in, weighted by how specific it is to them.
+    A vote only answers above RULES_THRESHOLD and RULES_MARGIN ahead of the runner-up, start and stop
+    commands share most of their words and a near tie is as likely to be the opposite command.
+    """
+    def __init__(self, data: dict[str, list[str]]):
+        self.exact: dict[str, str] = {}
+        self.votes: dict[str, dict[str, float]] = {}
+        counts: dict[str, dict[str, int]] = {}
+        for label, sentences in data.items():
+            for sentence in sentences:
+                normalized = normalize_text(sentence)
+                self.exact.setdefault(normalized, label)
+                for word in set(normalized.split()) - STOPWORDS:
+                    counts.setdefault(word, {}).setdefault(label, 0)
+                    counts[word][label] += 1
+
+        for word, labels in counts.items():
+            total = sum(labels.values())
+            self.votes[word] = {label: count / total for label, count in labels.items()}
+
+    def match(self, text: str) -> tuple[str | None, float]:
+        normalized = normalize_text(text)
+        if (label:=self.exact.get(normalized)) is not None:
+            return label, 1.0
+
+        words = [word for word in normalized.split() if word not in STOPWORDS]
+        scores: dict[str, float] = {}
+        for word in words:
+            for label, weight in self.votes.get(word, {}).items():
+                scores[label] = scores.get(label, 0.0) + weight
+        if not scores:
+            return None, 0.0
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        label, best = ranked[0][0], ranked[0][1] / len(words)
+        runner_up = ranked[1][1] / len(words) if len(ranked) > 1 else 0.0
+        if best < RULES_THRESHOLD or best - runner_up < RULES_MARGIN:
+            return None, best
+        return label, best
 
 class IntentMetadata(BaseModel):
     filepath: List[str] = Field(default_factory=list)
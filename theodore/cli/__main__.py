@@ -10,6 +10,7 @@ from theodore.cli.task_cli import task_manager
 from theodore.cli.shell_cli import shell, backup, add_git, add_commit, upgrade_migration, migrate_db
 from theodore.cli.weather_cli import weather
 from theodore.cli.dash_cli import dash
+from theodore.cli.log_viewer_cli import logs
 from theodore.core.theme import cli_defaults
 from theodore.core.logger_setup import base_logger
 from theodore.cli.async_click import AsyncCommand
@@ -45,6 +46,7 @@ def theodore(ctx: click.Context, verbose):
 
 task_manager.add_command(file_manager, name='file-manager')
 theodore.add_command(dash, "dash")
+theodore.add_command(logs, "logs")
 theodore.add_command(shell, "shell")
 theodore.add_command(file_manager, "manager")
 theodore.add_command(start_servers, 'serve')
@@ -80,24 +82,37 @@ async def status():
 @theodore.command()
 def live():
     """Interact with click in interactive Mode."""
-    click.echo("This may take a minute or two. Setting up...")
+    started = time.perf_counter()
+    click.echo("Setting up...")
     
     import traceback
+    import numpy
     from theodore.core.informers import user_info, user_error
+    from theodore.core.logger_setup import vector_perf
+    from theodore.managers.shell_manager import TaskID
     from theodore.system_service import SystemService
-    from theodore.ai.intent import IntentRouter
+    from theodore.ai.intent import IntentRouter, UTTERANCE_CACHE_PATH
     from theodore.ai.route_builder import routeBuilder
     from theodore.ai.rules import CONFIDENCE_THRESHOLD
     from theodore.ai.train_data import TRAIN_DATA_Path
     ss = SystemService(["theodore", "serve"])
 
     ss.start_processes()
-    Intent = IntentRouter(train_data=TRAIN_DATA_Path)
+    # repeated commands answer from the utterance cache, kept across sessions
+    Intent = IntentRouter(train_data=TRAIN_DATA_Path, cache_path=UTTERANCE_CACHE_PATH)
+    # the model loads behind the prompt, until then exact and keyword matches come from the rules
+    Intent.warm_up(started=started)
 
     click.echo("Hi I'm Theodore.")
+    first_prompt = True
     try:
         while True:
             try:
+                if first_prompt:
+                    first_prompt = False
+                    vector_perf.internal(numpy.array([TaskID.FirstPrompt, 1, time.perf_counter() - started, 0, 0]))
+                if "model_ready" in Intent.timings:
+                    vector_perf.internal(numpy.array([TaskID.ModelReady, 1, Intent.timings.pop("model_ready"), 0, 0]))
                 text = input(">> ")
                 request = text.strip()
                 if not request:
@@ -106,10 +121,13 @@ def live():
                 if request.lower() == "quit":
                     break
 
-                intent, confidence = Intent.match(request)
+                intent, confidence = Intent.match(request, wait=False)
 
-                if confidence < CONFIDENCE_THRESHOLD:
-                    user_info(f"request '{request}' not understood")
+                if intent is None or confidence < CONFIDENCE_THRESHOLD:
+                    if not Intent.ready.is_set():
+                        user_info(f"request '{request}' not understood yet, the language model is still loading")
+                    else:
+                        user_info(f"request '{request}' not understood")
                     continue
 
                 if intent == "STOP-SERVERS":
@@ -138,6 +156,7 @@ def live():
             except Exception:
                 user_error(traceback.format_exc())
     finally:
+        Intent.save_cache()
         if ss.is_running():
             ss.stop_processes()
             ss.supervise()
@@ -1,10 +1,21 @@
 import rich_click as click
 
 from theodore.cli.async_click import AsyncCommand
-from theodore.managers.dash import runDashboard
+from theodore.core.theme import console
+from theodore.managers.dash import runDashboard, benchmarkDashboard
 
 
 @click.command(cls=AsyncCommand)
-async def dash():
+@click.option("--benchmark", is_flag=True, help="Measure render cost per frame without drawing to the terminal")
+@click.option("--frames", default=200, show_default=True, help="Frames rendered by --benchmark")
+async def dash(benchmark, frames):
     """Show Dashboard"""
+    if benchmark:
+        result = benchmarkDashboard(frames=frames)
+        console.print(
+            f"{result['frames']} frames, full rebuild: mean {result['full']['mean_ms']} ms, "
+            f"p95 {result['full']['p95_ms']} ms | unchanged: mean {result['unchanged']['mean_ms']} ms, "
+            f"p95 {result['unchanged']['p95_ms']} ms"
+        )
+        return
     await runDashboard()
@@ -55,21 +55,26 @@ def delete(ctx: click.Context, name, all):
     return
 
 @file_manager.command()
+@click.option('--steps', '-n', type=int, default=1, help='Number of recent tasks to undo')
 @click.pass_context
-def undo(ctx: click.Context):
-    """Undo most recent task"""
+def undo(ctx: click.Context, steps):
+    """Undo most recent task(s)"""
     manager = get_file_manager()
-    manager.undo_move()
+    reverted = manager.undo_move(steps=steps)
+    user_info(f"{reverted} task(s) undone.")
     return
 
 @file_manager.command()
 @click.option('--source-dir', "-d", default=".", required=True)
+@click.option('--dry-run', is_flag=True, help='Show planned moves and timing without moving anything')
 @click.pass_context
-def organize(ctx: click.Context, source_dir):
+def organize(ctx: click.Context, source_dir, dry_run):
     """Automate file Movement, source directory defaults to current directory."""
     manager = get_file_manager()
     DISPATCH = get_dispatch()
-    DISPATCH.dispatch_cli(manager.organize_files, src=source_dir)
+    report = DISPATCH.dispatch_cli(manager.organize_files, src=source_dir, dry_run=dry_run)
+    if report:
+        console.print(manager.get_organize_table(report))
     return
 
 @file_manager.command()
@@ -0,0 +1,76 @@
+import rich_click as click
+
+from theodore.cli.async_click import AsyncCommand
+from theodore.core.theme import console
+from theodore.core.informers import user_error, user_info, base_logger
+from theodore.core.utils import parse_date
+from theodore.core.lazy import get_log_service
+
+
+LEVELS = ["DEBUG", "INTERNAL", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+@click.group()
+@click.pass_context
+def logs(ctx: click.Context):
+    """Query Theodore's structured logs"""
+    ctx.ensure_object(dict)
+
+
+@logs.command(cls=AsyncCommand)
+@click.option("--since", "-s", help="Start of the time range, e.g. '2 hours ago' or '2026/01/30 08:00'")
+@click.option("--until", "-u", help="End of the time range")
+@click.option("--level", "-l", multiple=True, type=click.Choice(LEVELS, case_sensitive=False), help="Level to include, repeatable")
+@click.option("--logger", "-n", help="Logger name prefix, e.g. theodore.errors")
+@click.option("--contains", "-c", help="Text the message must contain")
+@click.option("--limit", default=50, show_default=True, help="Most recent records to show")
+@click.pass_context
+async def query(ctx: click.Context, since, until, level, logger, contains, limit):
+    """Filter logs by time range, level and logger"""
+    bounds = {}
+    for name, value in (("since", since), ("until", until)):
+        if value:
+            parsed = parse_date(value)
+            if not parsed.get("ok") or parsed.get("date") is None:
+                user_error(f"Invalid date for --{name}: {value}")
+                return
+            # log timestamps are naive local time
+            bounds[name] = parsed.get("date").replace(tzinfo=None)
+
+    base_logger.internal("Querying structured logs")
+    response = await get_log_service().query(levels=list(level), logger=logger, contains=contains, limit=limit, **bounds)
+    if not response.get("ok"):
+        user_error(response.get("message"))
+        return
+
+    rows = response.get("data")
+    if not rows:
+        user_info("No log records match")
+        return
+    console.print(get_log_service().get_logs_table(rows))
+
+
+@logs.command(cls=AsyncCommand)
+@click.argument("text")
+@click.option("--top", "-k", default=10, show_default=True, help="Number of closest records to show")
+@click.pass_context
+async def search(ctx: click.Context, text, top):
+    """Find log records by meaning rather than exact words"""
+    service = get_log_service()
+    with console.status("Indexing new log records"):
+        await service.ingest()
+        response = await service.embed_pending(limit=None)
+    if not response.get("ok"):
+        user_error(response.get("message"))
+        return
+
+    response = await service.search(text, k=top)
+    if not response.get("ok"):
+        user_error(response.get("message"))
+        return
+
+    rows = response.get("data")
+    if not rows:
+        user_info("No log records indexed yet")
+        return
+    # the table prints its rows oldest first, reversed here so the best match leads
+    console.print(service.get_logs_table(rows[::-1]))
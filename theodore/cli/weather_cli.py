@@ -28,7 +28,7 @@ async def current(ctx: click.Context, temp, location, clear_cache, speed):
     """Get live weather updates around you"""
     WEATHER: WeatherManagement =get_weather_manager()
 
-    response = await WEATHER.make_request(query='forecast', location=location, retries=4)
+    response = await WEATHER.make_request(query='forecast', location=location, retries=4, clear_cache=clear_cache)
 
     if not response.get('ok'):
         base_logger.internal(f"Failed Aborting")
@@ -53,7 +53,7 @@ async def forecast(ctx: click.Context, temp, location, clear_cache):
 
     base_logger.internal('Calling make request call')
 
-    response = await WEATHER.make_request(query="forecast", location=location, retries=4)
+    response = await WEATHER.make_request(query="forecast", location=location, retries=4, clear_cache=clear_cache)
     if not response.get('ok'):
         base_logger.internal(f"Failed Aborting")
         user_error(response.get('message'))
@@ -78,7 +78,7 @@ async def alerts(ctx: click.Context, location, clear_cache):
     WEATHER: WeatherManagement =get_weather_manager()
 
     base_logger.internal('Calling make request call')
-    response = await WEATHER.make_request(query='alerts', location=location, retries=4)
+    response = await WEATHER.make_request(query='alerts', location=location, retries=4, clear_cache=clear_cache)
     if not response.get('ok'):
         user_error(response.get('message'))
         return
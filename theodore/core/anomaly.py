@@ -0,0 +1,130 @@
+"""
+
+Streaming anomaly detection for the daemon's metric and log rate series.
+Every series keeps an EWMA mean and variance overall and per hour of day, so memory is fixed no matter
+how long the daemon runs, and a sample is judged against what is usual for its hour once that hour has been seen.
+
+"""
+
+import numpy as np
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Sequence
+
+
+ALPHA = 0.01            # weight of a new sample, ~1/alpha samples of memory
+SEASONS = 24            # hour of day slots
+THRESHOLD = 4.0         # |z| that raises an alert
+WARMUP = 30             # samples before a baseline is trusted
+COOLDOWN = 5 * 60       # seconds before the same series alerts again
+MIN_SCALE = 0.05        # spread floor as a share of the mean, flat series would alert on any change otherwise
+
+
+@dataclass
+class Anomaly:
+    series: str
+    value: float
+    expected: float
+    z: float
+    timestamp: datetime
+
+    def __str__(self) -> str:
+        direction = "above" if self.z > 0 else "below"
+        return (
+            f"{self.series} at {round(self.value, 2)} is {abs(round(self.z, 1))} deviations {direction} "
+            f"its usual {round(self.expected, 2)}"
+        )
+
+
+class SeriesDetector:
+    """
+    EWMA z-score over a fixed set of named series, all updated in one numpy step per sample.
+    Once past the threshold a value is clipped before it is learned, so a spike does not become the new normal.
+    """
+    def __init__(
+        self,
+        names: Sequence[str],
+        alpha: float = ALPHA,
+        threshold: float = THRESHOLD,
+        warmup: int = WARMUP,
+        cooldown: float = COOLDOWN,
+        seasons: int = SEASONS,
+    ):
+        self.names = list(names)
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.cooldown = cooldown
+        self.seasons = seasons
+
+        size = len(self.names)
+        self.mean = np.zeros(size)
+        self.var = np.zeros(size)
+        self.count = np.zeros(size, dtype=np.int64)
+        self.season_mean = np.zeros((seasons, size))
+        self.season_var = np.zeros((seasons, size))
+        self.season_count = np.zeros((seasons, size), dtype=np.int64)
+        self.last_alert = np.full(size, -np.inf)
+
+    def _slot(self, when: datetime) -> int:
+        return when.hour * self.seasons // 24
+
+    def _learn(self, mean: np.ndarray, var: np.ndarray, count: np.ndarray, values: np.ndarray, mask: np.ndarray) -> None:
+        # West's incremental EWMA, a plain running mean and variance for the first 1/alpha samples so young baselines are unbiased
+        count[mask] += 1
+        alpha = np.maximum(self.alpha, 1 / count[mask])
+        diff = values[mask] - mean[mask]
+        step = alpha * diff
+        mean[mask] += step
+        var[mask] = (1 - alpha) * (var[mask] + diff * step)
+
+    def observe(self, values: Sequence[float] | np.ndarray, when: datetime | None = None) -> List[Anomaly]:
+        """Score one sample per series, NaN skips a series for this tick, then fold the sample into the baselines"""
+        when = when or datetime.now()
+        values = np.asarray(values, dtype=np.float64)
+        seen = ~np.isnan(values)
+        slot = self._slot(when)
+
+        # the hour's own baseline once it has enough history, the overall one until then
+        seasonal = self.season_count[slot] >= self.warmup
+        mean = np.where(seasonal, self.season_mean[slot], self.mean)
+        var = np.where(seasonal, self.season_var[slot], self.var)
+        scale = np.maximum(np.sqrt(var), MIN_SCALE * np.abs(mean) + 1e-9)
+        z = np.where(seen, (np.nan_to_num(values) - mean) / scale, 0.0)
+
+        warm = seen & (self.count >= self.warmup)
+        flagged = warm & (np.abs(z) > self.threshold)
+        stamp = when.timestamp()
+        alerts = flagged & (stamp - self.last_alert >= self.cooldown)
+        self.last_alert[alerts] = stamp
+
+        learned = np.where(flagged, mean + np.sign(z) * self.threshold * scale, values)
+        self._learn(self.mean, self.var, self.count, learned, seen)
+        self._learn(self.season_mean[slot], self.season_var[slot], self.season_count[slot], learned, seen)
+
+        return [
+            Anomaly(self.names[i], float(values[i]), float(mean[i]), float(z[i]), when)
+            for i in np.flatnonzero(alerts)
+        ]
+
+
+class RateDetector(SeriesDetector):
+    """SeriesDetector over per-minute rates of monotonic counters, a counter that goes backwards was reset and is skipped"""
+    def __init__(self, names: Sequence[str], **kwds):
+        super().__init__(names, **kwds)
+        self._previous: np.ndarray | None = None
+        self._previous_at: datetime | None = None
+
+    def observe_counts(self, counts: Sequence[float] | np.ndarray, when: datetime | None = None) -> List[Anomaly]:
+        when = when or datetime.now()
+        counts = np.asarray(counts, dtype=np.float64)
+        previous, previous_at = self._previous, self._previous_at
+        self._previous, self._previous_at = counts, when
+        if previous is None or (elapsed:=(when - previous_at).total_seconds()) <= 0:
+            return []
+
+        delta = counts - previous
+        rates = np.where(delta >= 0, delta * 60 / elapsed, np.nan)
+        return self.observe(rates, when)
+
@@ -1,5 +1,9 @@
+import hashlib
+import importlib.util
 import numpy as np
+import os
 import pandas as pd
+import time
 import traceback
 import json
 
@@ -8,6 +12,19 @@ from pandas.errors import DtypeWarning, ParserError
 from typing import List, Tuple, Literal
 from theodore.core.informers import user_info, base_logger
 from theodore.core.file_helpers import resolve_path
+from theodore.core.sketches import DistinctCounter, TDigest, SAMPLE_ROWS
+
+
+STREAM_THRESHOLD = 256 * 1024**2     # files above this are transformed in chunks
+DEFAULT_CHUNKSIZE = 100_000
+
+OUTPUT_FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather", "arrow": ".arrow"}
+OUTPUT_FORMAT = os.getenv("THEODORE_ETL_FORMAT", "parquet").lower()
+OUTPUT_COMPRESSION = "zstd"
+CATEGORY_RATIO = 0.5                 # object columns with fewer distinct values than this share of rows become categories
+MEMORY_FACTOR = 6                    # pandas frames take roughly this many times their csv size
+CHUNK_BYTES = 64 * 1024**2           # csv bytes assumed per chunk when estimating a chunked transform
+OUTLIER_PASS_ROWS = 250_000          # chunked inputs up to this many rows get an exact second pass for outliers
 
 
 class NumpySerializer(json.JSONEncoder):
@@ -52,45 +69,227 @@ def get_data_profile(df: pd.DataFrame) -> Tuple[str, str]:
     returns a tuple of general and numeric dictionaries with columns as rows
     - General_desc [value counts, Null count, data types, null percentage (col wise)] or None if no string dtypes,
     - Numeric_desc [mean, std, outliers, null count, datatypes ] or None if no Numeric dtypes
+    Counts are exact up to sketches.EXACT_LIMIT distinct values per column and HyperLogLog estimates past it.
     """
-    df_cp = df.copy()
-    numeric_df = df_cp.select_dtypes(include=[np.number])
-    object_cols = df_cp.select_dtypes(include=["object"]).columns
-    
-    # 1. General Profile (Metadata)
-    generalStats = {
-        "row_count": df_cp.shape[0],
-        "col_count": df_cp.shape[1],
-        "num_count": numeric_df.shape[1],
-        "obj_count": df_cp[object_cols].shape[1],
-        "null_count": np.abs(df_cp.count().sum() - df_cp.shape[0] * df_cp.shape[1]),
-        "unique_count": df_cp.nunique().sum(),
-        "duplicated_count": df_cp.duplicated().sum(),
-        "size": df_cp.memory_usage(deep=True).sum()
+    accumulator = ProfileAccumulator()
+    accumulator.update(df)
+    # the frame is in memory, outliers can be counted exactly
+    accumulator.count_outliers(df)
+    return accumulator.profile()
+
+def frame_memory(df: pd.DataFrame) -> Tuple[int, bool]:
+    """Deep memory usage, object columns of large frames are measured on a sample. Returns (bytes, exact)"""
+    if len(df) <= SAMPLE_ROWS:
+        return int(df.memory_usage(deep=True).sum()), True
+    obj_cols = df.select_dtypes(include=["object"]).columns
+    shallow = df.memory_usage(deep=False)
+    if not len(obj_cols):
+        return int(shallow.sum()), True
+    sample = df[obj_cols].sample(SAMPLE_ROWS, random_state=0)
+    per_row = sample.memory_usage(deep=True, index=False) / SAMPLE_ROWS
+    return int(shallow.drop(obj_cols).sum() + (per_row * len(df)).sum()), False
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcast numerics and encode low cardinality strings as categories, in place"""
+    for col in df.select_dtypes(include=["integer"]).columns:
+        downcast = "unsigned" if len(df[col]) and df[col].min() >= 0 else "integer"
+        df[col] = pd.to_numeric(df[col], downcast=downcast)
+
+    for col in df.select_dtypes(include=["floating"]).columns:
+        downcast = pd.to_numeric(df[col], downcast="float")
+        # float32 only when nothing is lost past its precision
+        if np.allclose(downcast.to_numpy(dtype=np.float64), df[col].to_numpy(dtype=np.float64), equal_nan=True, rtol=1e-6):
+            df[col] = downcast
+
+    rows = len(df)
+    for col in df.select_dtypes(include=["object"]).columns:
+        if rows and df[col].nunique(dropna=True) < rows * CATEGORY_RATIO:
+            df[col] = df[col].astype("category")
+    return df
+
+def output_path(save_to: str | Path, filepath: Path, output_format: str) -> Path:
+    return Path(save_to)/f"cleaned_{filepath.stem.lower()}{OUTPUT_FORMATS[output_format]}"
+
+def write_output(df: pd.DataFrame, fullpath: Path, output_format: str) -> None:
+    if output_format == "csv":
+        df.to_csv(fullpath)
+        return
+
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if output_format == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, fullpath, compression=OUTPUT_COMPRESSION)
+    elif output_format == "feather":
+        feather.write_feather(table, fullpath, compression=OUTPUT_COMPRESSION)
+    else:
+        options = pa.ipc.IpcWriteOptions(compression=OUTPUT_COMPRESSION)
+        with pa.OSFile(str(fullpath), "wb") as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+
+def save_cleaned(df: pd.DataFrame, save_to: str | Path, filepath: Path, output_format: str | None = None) -> dict:
+    """
+    Write the cleaned frame in output_format and return storage stats for the profile.
+    Columnar formats need pyarrow, without it the output falls back to csv.
+    """
+    output_format = (output_format or OUTPUT_FORMAT).lower()
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {output_format}, expected one of {list(OUTPUT_FORMATS)}")
+
+    memory_before = int(df.memory_usage(deep=True).sum())
+    if output_format != "csv":
+        df = optimize_dtypes(df)
+    memory_after = int(df.memory_usage(deep=True).sum())
+
+    fullpath = output_path(save_to, filepath, output_format)
+    try:
+        write_output(df, fullpath, output_format)
+    except ImportError:
+        base_logger.internal(f"pyarrow unavailable, saving {filepath.name} as csv instead of {output_format}")
+        output_format = "csv"
+        fullpath = output_path(save_to, filepath, output_format)
+        write_output(df, fullpath, output_format)
+
+    base_logger.internal(f"{filepath.name} saved at {fullpath}")
+    return {
+        "format": output_format,
+        "path": str(fullpath),
+        "memory_before": memory_before,
+        "memory_after": memory_after,
+        "input_size": filepath.stat().st_size,
+        "output_size": fullpath.stat().st_size,
     }
 
-    # 2. Numeric Profile
-    numero = {}
+def _chunk_type(arrow_type, output_format: str):
+    """
+    Arrow type a column keeps for the whole file. Numeric widths are widened because a later chunk can hold values
+    past the first one's range, parquet stores them as 32 or 64 bit either way. The ipc file format cannot replace
+    a dictionary between batches, so feather and arrow get plain values and parquet takes the categories.
+    """
+    import pyarrow as pa
+
+    if pa.types.is_dictionary(arrow_type):
+        if output_format == "parquet":
+            return pa.dictionary(pa.int32(), arrow_type.value_type)
+        return arrow_type.value_type
+    if pa.types.is_integer(arrow_type):
+        return pa.int64()
+    if pa.types.is_floating(arrow_type):
+        return pa.float64()
+    return arrow_type
 
-    if not numeric_df.empty:
-        std = numeric_df.std()
-        mean = numeric_df.mean()
-        z = np.where(std > 0, (numeric_df - mean) / std, 0.0)
-        outliers = (np.abs(z) >= 3).sum(axis=0)
-        
-        numeric_dict = {
-            "columns": numeric_df.columns.tolist(),
-            "mean": mean,
-            "max": numeric_df.max(),
-            "min": numeric_df.min(),
-            "std": std,
-            "outliers": outliers,
-            }
-        numero = pd.DataFrame(numeric_dict).to_dict(orient="list")
+class ChunkWriter:
+    """
+    Streams cleaned chunks into one output file. Columnar chunks go through optimize_dtypes, the first one fixes
+    the arrow schema and later chunks are cast to it. Without pyarrow chunks are appended as csv, as save_cleaned does.
+    Everything is written to a .part file that close() renames into place.
+    """
+    def __init__(self, save_to: str | Path, filepath: Path, output_format: str | None = None):
+        output_format = (output_format or OUTPUT_FORMAT).lower()
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {output_format}, expected one of {list(OUTPUT_FORMATS)}")
+        if output_format != "csv" and importlib.util.find_spec("pyarrow") is None:
+            base_logger.internal(f"pyarrow unavailable, saving {filepath.name} as csv instead of {output_format}")
+            output_format = "csv"
 
-    return json.dumps(generalStats, cls=NumpySerializer), json.dumps(numero, cls=NumpySerializer)
+        self.filepath = filepath
+        self.format = output_format
+        self.fullpath = output_path(save_to, filepath, output_format)
+        self.partial = self.fullpath.with_suffix(self.fullpath.suffix + ".part")
+        self.memory_before = 0
+        self.memory_after = 0
+        self._chunks = 0
+        self._schema = None
+        self._sink = None
+        self._writer = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        self.memory_before += frame_memory(df)[0]
+        if self.format == "csv":
+            df.to_csv(self.partial, mode="w" if not self._chunks else "a", header=not self._chunks)
+        else:
+            import pyarrow as pa
+
+            df = optimize_dtypes(df)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._open(table.schema)
+            self._writer.write_table(table.cast(self._schema))
+        self.memory_after += frame_memory(df)[0]
+        self._chunks += 1
+
+    def _open(self, schema) -> None:
+        import pyarrow as pa
+
+        self._schema = pa.schema([field.with_type(_chunk_type(field.type, self.format)) for field in schema])
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(str(self.partial), self._schema, compression=OUTPUT_COMPRESSION)
+        else:
+            # feather v2 is the arrow ipc file format
+            options = pa.ipc.IpcWriteOptions(compression=OUTPUT_COMPRESSION)
+            self._sink = pa.OSFile(str(self.partial), "wb")
+            self._writer = pa.ipc.new_file(self._sink, self._schema, options=options)
+
+    def _release(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def close(self) -> dict:
+        """Finish the file and return storage stats in the shape save_cleaned returns"""
+        self._release()
+        self.partial.replace(self.fullpath)
+        return {
+            "format": self.format,
+            "path": str(self.fullpath),
+            "memory_before": self.memory_before,
+            "memory_after": self.memory_after,
+            "input_size": self.filepath.stat().st_size,
+            "output_size": self.fullpath.stat().st_size,
+        }
+
+    def abort(self) -> None:
+        try:
+            self._release()
+        except Exception:
+            base_logger.internal(traceback.format_exc())
+        self.partial.unlink(missing_ok=True)
+
+def with_storage(general: str, storage: dict) -> str:
+    return json.dumps({**json.loads(general), "storage": storage}, cls=NumpySerializer)
+
+def content_key(path: Path | str, **options) -> str:
+    """blake2b of the file bytes and the transform options, the same data dropped again maps to the same key"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while block := f.read(1024**2):
+            digest.update(block)
+    options.setdefault("output_format", OUTPUT_FORMAT)
+    digest.update(json.dumps(options, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+def estimate_memory(path: Path | str, chunksize: int | None = None) -> int:
+    """Rough peak RAM of transforming path, chunked transforms only hold one chunk"""
+    size = Path(path).stat().st_size
+    if chunksize or size > STREAM_THRESHOLD:
+        size = min(size, CHUNK_BYTES)
+    return size * MEMORY_FACTOR
+
+def run_transform(**kwds) -> Tuple[str, str, float]:
+    """
+    Process pool entry point. The cleaned frame is written to disk by the worker,
+    only the profile JSON and the elapsed time travel back to the parent.
+    """
+    start = time.perf_counter()
+    general, numeric = transform_data(**kwds)
+    return general, numeric, time.perf_counter() - start
 
-    
 def parse_dates(df: pd.DataFrame, date_cols, errors: str = "coerce") -> pd.DataFrame:
     for col in date_cols:
         df[col] = pd.to_datetime(df[col], errors=errors)
@@ -106,13 +305,22 @@ def transform_data(
         fillna: str | None = None,
         axis: int | None = None,
         thresh: int | None = None,
-        save_to: str | Path | None= None
+        save_to: str | Path | None= None,
+        chunksize: int | None = None,
+        output_format: str | None = None
         ) -> Tuple[str, str]:
     if not isinstance(path, (Path, str)):
         raise TypeError(f"path args '{path}' not of type str or path")
     
     if not (filepath:=resolve_path(path)).exists():
         raise FileNotFoundError(f"Path {path} could not be resolved")
+
+    if chunksize or filepath.stat().st_size > STREAM_THRESHOLD:
+        return transform_data_chunked(
+            path=filepath, date_cols=date_cols, date_errors=date_errors, 
+            fillna=fillna, save_to=save_to, chunksize=chunksize or DEFAULT_CHUNKSIZE,
+            output_format=output_format
+            )
     
     try:
         df = pd.read_csv(filepath)
@@ -121,7 +329,8 @@ def transform_data(
     except ParserError:
         raise
 
-    df_cp = df.copy()
+    # df is not used again, cleaning in place saves a full copy
+    df_cp = df
 
     if date_cols:
         if date_errors is None:
@@ -149,10 +358,231 @@ def transform_data(
 
     try:
         if save_to:
-            fullpath = str(Path(f"{save_to}/cleaned_{filepath.name.lower()}"))
-            cleaned_records.to_csv(fullpath)
-            base_logger.internal(f"{filepath.name} saved at {fullpath}")
+            storage = save_cleaned(cleaned_records, save_to, filepath, output_format)
+            general = with_storage(general, storage)
     except (ValueError, TypeError):
-        user_info(f"Unable to save to csv: {traceback.format_exc()}")
+        user_info(f"Unable to save cleaned data: {traceback.format_exc()}")
+
+    return general, numeric
+
+
+
+class ProfileAccumulator:
+    """
+    Running DataFrame profile fed one chunk at a time, every part of it merges so chunks and files can be profiled apart.
+    Small inputs are profiled exactly, past the sketch limits the same calls return estimates and `approximate` is set.
+    """
+    def __init__(self):
+        self.rows = 0
+        self.columns: List[str] = []
+        self.numeric_cols: List[str] = []
+        self.obj_count = 0
+        self.nulls = 0
+        self.size = 0
+        self.size_exact = True
+        self.row_counter = DistinctCounter()
+        self.uniques: dict[str, DistinctCounter] = {}
+        # column -> [count, mean, m2, min, max]
+        self.moments: dict[str, List[float]] = {}
+        self.digests: dict[str, TDigest] = {}
+        # exact counts once count_outliers ran, otherwise estimated from the digests
+        self.outliers: dict[str, int] | None = None
+
+    @property
+    def approximate(self) -> bool:
+        return (
+            not self.size_exact
+            or not self.row_counter.exact
+            or any(not counter.exact for counter in self.uniques.values())
+            or (self.outliers is None and any(not digest.exact for digest in self.digests.values()))
+        )
+
+    @property
+    def duplicates(self) -> int:
+        return max(0, self.rows - self.row_counter.count())
+
+    def update(self, df: pd.DataFrame) -> None:
+        if not self.columns:
+            self.columns = df.columns.tolist()
+            self.numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+            self.obj_count = df.select_dtypes(include=["object"]).shape[1]
+
+        self.rows += df.shape[0]
+        self.nulls += int(df.isna().sum().sum())
+        size, exact = frame_memory(df)
+        self.size += size
+        self.size_exact = self.size_exact and exact
+
+        for col in df.columns:
+            hashes = pd.util.hash_pandas_object(df[col].dropna(), index=False).to_numpy()
+            self.uniques.setdefault(col, DistinctCounter()).add(hashes)
+        self.row_counter.add(pd.util.hash_pandas_object(df, index=False).to_numpy())
+
+        for col in self.numeric_cols:
+            if col not in df.columns:
+                continue
+            values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            if values.size:
+                self._merge_moments(col, [values.size, values.mean(), ((values - values.mean())**2).sum(), values.min(), values.max()])
+                self.digests.setdefault(col, TDigest()).update(values)
+
+    def _merge_moments(self, col: str, other: List[float]) -> None:
+        if (current:=self.moments.get(col)) is None:
+            self.moments[col] = list(other)
+            return
+        n_a, mean_a, m2_a, min_a, max_a = current
+        n_b, mean_b, m2_b, min_b, max_b = other
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        self.moments[col] = [
+            n,
+            mean_a + delta * n_b / n,
+            m2_a + m2_b + delta**2 * n_a * n_b / n,
+            min(min_a, min_b),
+            max(max_a, max_b),
+        ]
+
+    def merge(self, other: "ProfileAccumulator") -> "ProfileAccumulator":
+        if not self.columns:
+            self.columns, self.numeric_cols, self.obj_count = other.columns, other.numeric_cols, other.obj_count
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.size += other.size
+        self.size_exact = self.size_exact and other.size_exact
+        self.row_counter.merge(other.row_counter)
+
+        for col, counter in other.uniques.items():
+            self.uniques.setdefault(col, DistinctCounter()).merge(counter)
+        for col, moments in other.moments.items():
+            self._merge_moments(col, moments)
+        for col, digest in other.digests.items():
+            self.digests.setdefault(col, TDigest()).merge(digest)
+
+        if self.outliers is not None and other.outliers is not None:
+            for col, count in other.outliers.items():
+                self.outliers[col] = self.outliers.get(col, 0) + count
+        else:
+            self.outliers = None
+        return self
+
+    def mean_std(self, col: str) -> Tuple[float, float]:
+        n, mean, m2, _, _ = self.moments[col]
+        return mean, (m2 / (n - 1)) ** 0.5 if n > 1 else 0.0
+
+    def count_outliers(self, df: pd.DataFrame) -> None:
+        """Exact second pass, z scores need the final mean and std"""
+        if self.outliers is None:
+            self.outliers = {}
+        for col in self.moments:
+            if col not in df.columns:
+                continue
+            mean, std = self.mean_std(col)
+            if std <= 0:
+                continue
+            values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+            self.outliers[col] = self.outliers.get(col, 0) + int((np.abs((values - mean) / std) >= 3).sum())
+
+    def outlier_count(self, col: str) -> int:
+        if self.outliers is not None:
+            return self.outliers.get(col, 0)
+        mean, std = self.mean_std(col)
+        if std <= 0 or (digest:=self.digests.get(col)) is None:
+            return 0
+        tails = digest.cdf(mean - 3 * std) + 1 - digest.cdf(mean + 3 * std)
+        return int(round(tails * digest.count))
+
+    def profile(self) -> Tuple[str, str]:
+        """Same shape as get_data_profile"""
+        generalStats = {
+            "row_count": self.rows,
+            "col_count": len(self.columns),
+            "num_count": len(self.numeric_cols),
+            "obj_count": self.obj_count,
+            "null_count": self.nulls,
+            "unique_count": sum(counter.count() for counter in self.uniques.values()),
+            "duplicated_count": self.duplicates,
+            "size": self.size,
+            "approximate": self.approximate,
+        }
+
+        numero = {}
+        cols = [col for col in self.numeric_cols if col in self.moments]
+        if cols:
+            stats = [self.mean_std(col) for col in cols]
+            numero = {
+                "columns": cols,
+                "mean": [mean for mean, _ in stats],
+                "max": [self.moments[col][4] for col in cols],
+                "min": [self.moments[col][3] for col in cols],
+                "std": [std for _, std in stats],
+                "outliers": [self.outlier_count(col) for col in cols],
+                "median": [self.digests[col].quantile(0.5) for col in cols],
+                "p95": [self.digests[col].quantile(0.95) for col in cols],
+            }
+        return json.dumps(generalStats, cls=NumpySerializer), json.dumps(numero, cls=NumpySerializer)
+
+
+def transform_data_chunked(
+        *,
+        path: Path | str,
+        date_cols: List[str] | None = None,
+        date_errors: Literal["coerce", "ignore", "raise", "RaiseCoerce"] | None = None,
+        fillna: str | None = None,
+        save_to: str | Path | None = None,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        output_format: str | None = None
+        ) -> Tuple[str, str]:
+    """
+    transform_data for files that do not fit in memory. Each chunk is cleaned, profiled and appended to the output.
+    Outliers are counted against the final mean and std, exactly by a second pass for small inputs, from t-digests otherwise.
+    """
+    filepath = resolve_path(path)
+    if date_cols and date_errors is None:
+        raise ValueError("Date errors cannot be of Nonetype")
+
+    accumulator = ProfileAccumulator()
+    writer = ChunkWriter(save_to, filepath, output_format) if save_to else None
+    raw_numeric: dict[str, str] = {}
+
+    for i, chunk in enumerate(pd.read_csv(filepath, chunksize=chunksize, low_memory=False)):
+        raw_cols = chunk.columns.tolist()
+        if date_cols:
+            try:
+                chunk = parse_dates(chunk, date_cols=date_cols, errors=date_errors)
+            except (KeyError, ParserError):
+                base_logger.internal(traceback.format_exc())
+
+        cleaned = clean_records(chunk)
+        accumulator.update(cleaned)
+        if i == 0:
+            raw_numeric = {clean: raw for raw, clean in zip(raw_cols, cleaned.columns) if clean in accumulator.numeric_cols}
+
+        if fillna:
+            try:
+                cleaned.fillna(value=fillna, inplace=True)
+            except (ValueError, TypeError):
+                base_logger.internal(traceback.format_exc())
+
+        if writer:
+            try:
+                writer.write(cleaned)
+            except (ValueError, TypeError):
+                # arrow's invalid and type errors subclass these, a chunk that will not cast to the schema lands here
+                user_info(f"Unable to save cleaned data: {traceback.format_exc()}")
+                writer.abort()
+                writer = None
+
+    # small inputs get the exact second pass, large ones keep the t-digest tail estimates
+    if raw_numeric and accumulator.rows <= OUTLIER_PASS_ROWS:
+        for chunk in pd.read_csv(filepath, chunksize=chunksize, usecols=list(raw_numeric.values()), low_memory=False):
+            chunk.columns = [clean for clean, raw in raw_numeric.items() if raw in chunk.columns]
+            accumulator.count_outliers(chunk)
+
+    general, numeric = accumulator.profile()
+    if writer:
+        storage = writer.close()
+        base_logger.internal(f"{filepath.name} saved at {writer.fullpath} in chunks of {chunksize}")
+        general = with_storage(general, storage)
 
     return general, numeric
@@ -1,3 +1,5 @@
+import atexit
+import os
 import re
 import getpass
 import json
@@ -8,11 +10,12 @@ import traceback
 import threading
 import concurrent.futures
 
+from dataclasses import dataclass, field
 from datetime import datetime
 from itertools import chain
 from pathlib import Path
 from tzlocal import get_localzone
-from typing import Tuple, Dict, Generator, List, Any, Iterable
+from typing import Tuple, Dict, Generator, List, Any, Iterable, Callable
 
 from theodore.core.logger_setup import base_logger, error_logger
 from theodore.core.paths import JSON_DIR
@@ -23,7 +26,15 @@ DOWNLOADS = HOME/"Downloads"
 VIDEOS = HOME/"Videos"
 DOCUMENTS = HOME/"Documents"
 GAURD = threading.Lock()
-FILE_LOGS = JSON_DIR/"file_entries.log"
+FILE_LOGS = JSON_DIR/"file_entries.log"         # legacy single json document, folded into the journal
+FILE_JOURNAL = JSON_DIR/"file_entries.jsonl"
+JOURNAL_MAX_BYTES = 4 * 1024**2
+JOURNAL_KEEP = 5_000
+IO_WORKERS = 8
+RENAME_CHUNK = 256
+_compacting = threading.Event()
+_IO_EXECUTOR: concurrent.futures.ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
 
 dst_map = {
     '.deb': HOME / DOCUMENTS / "deb_files",
@@ -44,23 +55,36 @@ def validate_source(src: str | Path)-> None:
         raise FileNotFoundError(f"File not found '{src}'.")
 
 
-def get_file_logs() -> Dict:
-    with GAURD:
-        if FILE_LOGS.exists():
-            try:
-                return json.loads(FILE_LOGS.read_text())
-            except json.JSONDecodeError:
-                FILE_LOGS.unlink()
-        return {}
+def _migrate_file_logs() -> None:
+    """Fold the legacy file_entries.log into the journal, callers hold GAURD"""
+    if not FILE_LOGS.exists():
+        return
+    try:
+        legacy = json.loads(FILE_LOGS.read_text())
+    except (json.JSONDecodeError, OSError):
+        legacy = {}
 
+    if isinstance(legacy, dict) and legacy:
+        with FILE_JOURNAL.open('a', encoding='utf-8') as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in legacy.values())
+    FILE_LOGS.unlink(missing_ok=True)
 
-def save_file_logs(logs: dict):
-    with GAURD:
-        logger = Path(FILE_LOGS)
-        if isinstance(logs, dict):
-            logger.write_text(json.dumps(logs, indent=4))
-            return
-        logger.write_text(json.dumps({}))
+
+def _tail_offset(f, count: int) -> int:
+    """Byte offset where the last count lines of an open binary file start, reads backwards from the end"""
+    f.seek(0, os.SEEK_END)
+    end = pos = f.tell()
+    buffer = b""
+
+    while pos > 0 and buffer.count(b"\n") <= count:
+        read = min(64 * 1024, pos)
+        pos -= read
+        f.seek(pos)
+        buffer = f.read(read) + buffer
+
+    lines = buffer.splitlines(keepends=True)
+    tail = lines[-count:] if count else []
+    return end - sum(len(line) for line in tail)
 
 
 def resolve_entry(
@@ -93,18 +117,54 @@ def iterate_path(pattern: Generator):
     return chain.from_iterable(pattern)
 
 
-def log_entry(src: str, dst: str) -> None:
-    entry = {
+def new_entry(src: str, dst: str, action: str = "move") -> Dict:
+    return {
         "src": src,
         "dst": dst,
+        "action": action,
         "timestamp": time.time(),
+        "date": datetime.now(get_localzone()).isoformat(),
         "user": getpass.getuser()
     }
 
-    date = datetime.now(get_localzone()).isoformat()
-    file_logs = get_file_logs()
-    file_logs[date] = entry
-    save_file_logs(file_logs)
+
+def log_entries(entries: Iterable[Dict]) -> None:
+    """Append entries to the journal in one write, compaction runs in the background once it grows past JOURNAL_MAX_BYTES"""
+    lines = "".join(json.dumps(entry) + "\n" for entry in entries)
+    if not lines:
+        return
+
+    with GAURD:
+        _migrate_file_logs()
+        with FILE_JOURNAL.open('a', encoding='utf-8') as f:
+            f.write(lines)
+            size = f.tell()
+
+    if size > JOURNAL_MAX_BYTES and not _compacting.is_set():
+        _compacting.set()
+        threading.Thread(target=compact_journal, name="journal-compaction", daemon=True).start()
+
+
+def log_entry(src: str, dst: str, action: str = "move") -> None:
+    log_entries([new_entry(src=src, dst=dst, action=action)])
+
+
+def compact_journal(keep: int = JOURNAL_KEEP) -> None:
+    """Keep only the newest entries, undo never reaches further back than this"""
+    try:
+        with GAURD:
+            if not FILE_JOURNAL.exists():
+                return
+            with FILE_JOURNAL.open('rb') as f:
+                f.seek(_tail_offset(f, keep))
+                tail = f.read()
+
+            tmp = FILE_JOURNAL.with_suffix('.tmp')
+            tmp.write_bytes(tail)
+            tmp.replace(FILE_JOURNAL)
+        base_logger.internal(f"File journal compacted to the last {keep} entries.")
+    finally:
+        _compacting.clear()
 
 
 def move_entry(
@@ -132,15 +192,50 @@ def move_unknown_destination(
     return destination, resolve_path(src)
 
 
-def undo() -> None:
-    logger = get_file_logs()
-    _, last_task = logger.popitem()
-
-    dst = Path(last_task.get('src')).parent
-    src = Path(last_task.get('dst'))
+def undo(steps: int = 1) -> int:
+    """
+    Revert the last steps journal entries newest first, only the tail of the journal is read.
+    The journal is cut only once the reverts ran, entries that failed for any reason but a missing file
+    are written back so a later undo can retry them.
+    """
+    with GAURD:
+        _migrate_file_logs()
+        if steps < 1 or not FILE_JOURNAL.exists():
+            return 0
+        with FILE_JOURNAL.open('rb+') as f:
+            start = _tail_offset(f, steps)
+            f.seek(start)
+            tail = f.read().splitlines(keepends=True)
 
-    move_entry(src=src, dst=dst, log=False)
-    save_file_logs(logger)
+            reverted = 0
+            kept: List[bytes] = []
+            try:
+                while tail:
+                    line = tail.pop()
+                    try:
+                        last_task = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+
+                    dst = Path(last_task.get('src')).parent
+                    src = Path(last_task.get('dst'))
+                    try:
+                        if last_task.get('action') == "copy":
+                            delete_entry(src)
+                        else:
+                            move_entry(src=src, dst=dst, log=False)
+                        reverted += 1
+                    except FileNotFoundError:
+                        user_error(f"Cannot undo '{src.name}', file no longer exists.")
+                    except OSError as e:
+                        user_error(f"Cannot undo '{src.name}': {e}")
+                        kept.append(line)
+            finally:
+                # whatever was not reached and whatever failed stays, in journal order
+                f.seek(start)
+                f.truncate()
+                f.write(b"".join(tail + kept[::-1]))
+    return reverted
 
 
 def copy_entry(
@@ -153,7 +248,7 @@ def copy_entry(
     src_str, dst_str =  resolve_entry(src=src, dst=dst)
     shutil.copy(src=src_str, dst=dst_str)
     if log:
-        log_entry(src=src_str, dst=dst_str)
+        log_entry(src=src_str, dst=dst_str, action="copy")
 
 
 def delete_entry(src: str | Path, dst: str | Path | None = None) -> None:
@@ -164,18 +259,107 @@ def delete_entry(src: str | Path, dst: str | Path | None = None) -> None:
     if path.is_dir(): shutil.rmtree(str(path))
 
 
-def organize(src_path: str | Path) -> None:
-    validate_source(src=src_path)
+@dataclass
+class OrganizeReport:
+    planned: Dict[str, int] = field(default_factory=dict)
+    moved: int = 0
+    failed: int = 0
+    cross_device: int = 0
+    plan_seconds: float = 0.0
+    move_seconds: float = 0.0
+    dry_run: bool = False
 
-    for path in list(iter_dir_content(path=src_path, recursive=True)):
-        if not path.is_file():
+    @property
+    def total(self) -> int:
+        return sum(self.planned.values())
+
+
+def plan_organize(src_path: str | Path) -> Dict[Path, List[Tuple[str, str]]]:
+    """Group every file under src_path by dst_map destination, target names are made unique up front"""
+    from theodore.core.file_index import walk
+
+    groups: Dict[Path, List[str]] = {}
+    for path, name, is_dir in walk(resolve_path(src_path)):
+        if is_dir or not os.path.isfile(path):
+            continue
+        dst = (dst_map.get(Path(name).suffix) or dst_map['unknown']).expanduser()
+        if os.path.dirname(path) == str(dst):
             continue
+        groups.setdefault(dst, []).append(path)
+
+    plan = {}
+    stamp = int(time.time())
+    for dst, sources in groups.items():
+        try:
+            taken = set(os.listdir(dst))
+        except OSError:
+            taken = set()
+
+        moves = []
+        for src in sources:
+            basename = os.path.basename(src)
+            target, n = basename, 0
+            while target in taken:
+                n += 1
+                target = f"{stamp}-{basename}" if n == 1 else f"{stamp}-{n}-{basename}"
+            taken.add(target)
+            moves.append((src, os.path.join(dst, target)))
+        plan[dst] = moves
+    return plan
+
+
+def _move_batch(mover: Any, moves: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    done = []
+    for src, dst in moves:
+        try:
+            mover(src, dst)
+            done.append((src, dst))
+        except OSError:
+            error_logger.internal(f"Unable to move {src} to {dst}\n{traceback.format_exc()}")
+    return done
+
+
+def organize(src_path: str | Path, dry_run: bool = False) -> OrganizeReport:
+    """Plan every move first, then rename same-device files in chunks and cross-device files one batch per destination"""
+    validate_source(src=src_path)
+    report = OrganizeReport(dry_run=dry_run)
+
+    start = time.perf_counter()
+    plan = plan_organize(src_path)
+    report.plan_seconds = round(time.perf_counter() - start, 4)
+    report.planned = {str(dst): len(moves) for dst, moves in plan.items()}
+    if dry_run or not plan:
+        return report
+
+    start = time.perf_counter()
+    batches = []
+    for dst, moves in plan.items():
+        dst.mkdir(parents=True, exist_ok=True)
+        dst_dev = os.stat(dst).st_dev
+        local, remote = [], []
+        for src, target in moves:
+            try:
+                (local if os.lstat(src).st_dev == dst_dev else remote).append((src, target))
+            except OSError:
+                continue
 
-        dst = dst_map.get(path.suffix) or dst_map['unknown']
-        dst.expanduser().mkdir(parents=True, exist_ok=True)
+        batches.extend((os.rename, local[i:i + RENAME_CHUNK]) for i in range(0, len(local), RENAME_CHUNK))
+        if remote:
+            batches.append((shutil.move, remote))
+            report.cross_device += len(remote)
 
-        move_entry(src=path, dst=dst)
-        base_logger.internal(f"\nMoved {path.name} from {path.parent} to {dst.as_posix()}.")
+    done = []
+    for _, moved in iter_completed(lambda batch: _move_batch(*batch), batches):
+        done.extend(moved)
+
+    log_entries(new_entry(src=src, dst=dst) for src, dst in done)
+    report.moved = len(done)
+    report.failed = report.total - report.moved
+    report.move_seconds = round(time.perf_counter() - start, 4)
+    base_logger.internal(
+        f"Organized {report.moved}/{report.total} files from {src_path} in {report.plan_seconds + report.move_seconds}s"
+    )
+    return report
 
 
 def archive_folder(src: str | Path, filename: str | None = None, format: str = ".tar.gz"):
@@ -229,6 +413,12 @@ def iter_dir_content(path: Path | str, recursive: bool = False):
 def search_with_match(entry_name: str, base_path: Path | str = "~", recursive = False) -> List[Path]:
     validate_source(src=str(base_path))
     path = resolve_path(base_path)
+
+    if recursive:
+        from theodore.core.lazy import get_file_index
+        if (indexed:=get_file_index().search(entry_name, base=path)) is not None:
+            return indexed
+        base_logger.internal(f"File index stale, scanning {path} for '{entry_name}'")
     
     match = list()
     for p in iter_dir_content(path=path, recursive=recursive):
@@ -237,16 +427,83 @@ def search_with_match(entry_name: str, base_path: Path | str = "~", recursive =
     return match
 
 
-def run_tasks(func: Any, args: List[Any] | set[Any], max_worker: int = 8) -> int:
-    """Performs multiples tasks concurrently using the threadpool executor and map function."""
+def get_io_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Shared thread pool for file I/O, created on first use and shut down at exit"""
+    global _IO_EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _IO_EXECUTOR is None:
+            _IO_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="theodore-io")
+            atexit.register(shutdown_io_executor)
+        return _IO_EXECUTOR
+
+
+def shutdown_io_executor(wait: bool = True) -> None:
+    """Cancel queued work and stop the shared pool, the next get_io_executor call starts a fresh one"""
+    global _IO_EXECUTOR
+    with _EXECUTOR_LOCK:
+        executor, _IO_EXECUTOR = _IO_EXECUTOR, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def iter_completed(
+        func: Any,
+        args: Iterable[Any],
+        progress: Callable[[int, int], Any] | None = None,
+        cancel_event: threading.Event | None = None,
+        timeout: float | None = None
+    ) -> Generator[Tuple[Any, Any], None, None]:
+    """
+    Submit every arg to the shared pool and yield (arg, result) as tasks finish.
+    Failed tasks are logged and skipped, setting cancel_event, a timeout or closing the generator cancels what is still queued.
+    """
+    executor = get_io_executor()
+    futures = {executor.submit(func, arg): arg for arg in args}
+    total = len(futures)
+    completed = 0
+
+    try:
+        for future in concurrent.futures.as_completed(futures, timeout=timeout):
+            if cancel_event is not None and cancel_event.is_set():
+                base_logger.internal(f"Bulk task cancelled after {completed}/{total}")
+                return
+
+            completed += 1
+            if progress is not None:
+                progress(completed, total)
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                user_error(f"{type(e).__name__}: {e}")
+                error_logger.internal(traceback.format_exc())
+    except concurrent.futures.TimeoutError:
+        user_error(f"{total - completed} task(s) took too long and were cancelled.")
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def run_tasks(
+        func: Any,
+        args: List[Any] | set[Any],
+        progress: Callable[[int, int], Any] | None = None,
+        cancel_event: threading.Event | None = None
+    ) -> int:
+    """Performs multiples tasks concurrently on the shared executor, returns the number of truthy results."""
     if not isinstance(args, Iterable):
         raise TypeError(f"Concurrent Worker Expected an Iterable but got {type(args).__name__}")
     
-    results = concurrent.futures.ThreadPoolExecutor(max_workers=max_worker).map(func, args)
-    return sum(1 for result in results if result)
+    return sum(1 for _, result in iter_completed(func, args, progress=progress, cancel_event=cancel_event) if result)
 
 
-def bulk_run(func: Any, dst: Path | str, records: Dict[Any, Any], indices: List[Any] | None = None):
+def bulk_run(
+        func: Any, 
+        dst: Path | str, 
+        records: Dict[Any, Any], 
+        indices: List[Any] | None = None,
+        progress: Callable[[int, int], Any] | None = None,
+        cancel_event: threading.Event | None = None
+    ):
     if not isinstance(records, dict):
         # Invalid format
         return 0
@@ -263,4 +520,4 @@ def bulk_run(func: Any, dst: Path | str, records: Dict[Any, Any], indices: List[
         func(src=f, dst=dest)
         return 1
     
-    return run_tasks(func=run, args=_args)
\ No newline at end of file
+    return run_tasks(func=run, args=_args, progress=progress, cancel_event=cancel_event)
\ No newline at end of file
@@ -0,0 +1,270 @@
+"""
+
+Persistent filename index for FileManager searches.
+Names live in a sqlite table with an FTS5 trigram index over them, so the patterns built by
+clean_user_search are narrowed inside sqlite before re.search runs on a handful of candidates.
+The daemon's watchdog Observer keeps it current, searches fall back to a directory walk when it is stale.
+
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from contextlib import closing
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+from theodore.core.paths import DATA_DIR, SERVER_STATE_FILE
+from theodore.core.logger_setup import base_logger
+
+
+INDEX_DB = DATA_DIR/"file_index.db"
+INDEX_ROOT = Path.home()
+INDEX_MAX_AGE = 60 * 60     # seconds an unwatched index is still trusted
+BATCH_SIZE = 10_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    is_dir INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(name, content='files', content_rowid='id', tokenize='trigram');
+"""
+
+Entry = Tuple[str, str, int]
+
+
+class FileIndex:
+    def __init__(self, db_path: Path | str = INDEX_DB, root: Path | str = INDEX_ROOT):
+        self.db_path = Path(db_path)
+        self.root = Path(root).expanduser().absolute()
+        self._building = threading.Lock()
+        self._fts = True
+        self._setup()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _setup(self) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(SCHEMA)
+            try:
+                conn.executescript(FTS_SCHEMA)
+            except sqlite3.OperationalError:
+                # sqlite built without fts5 trigram, LIKE still runs over the names table
+                self._fts = False
+
+    def _get_meta(self, key: str) -> str | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, conn: sqlite3.Connection, **values) -> None:
+        conn.executemany(
+            "INSERT INTO meta(key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            [(key, str(value)) for key, value in values.items()]
+        )
+
+    def set_watching(self, watching: bool) -> None:
+        # only index changes move updated_at, a daemon starting or stopping says nothing about what changed on disk
+        with closing(self._connect()) as conn, conn:
+            self._set_meta(conn, watching=int(watching))
+
+    def is_fresh(self) -> bool:
+        """Built, and either watched by a running daemon or rebuilt recently"""
+        if self._get_meta("built_at") is None:
+            return False
+        if self._get_meta("watching") == "1" and SERVER_STATE_FILE.exists():
+            return True
+        return time.time() - float(self._get_meta("updated_at") or 0) < INDEX_MAX_AGE
+
+    def covers(self, path: Path) -> bool:
+        return path == self.root or self.root in path.parents
+
+    def build(self) -> int:
+        """Walk root and replace the index in one transaction, readers keep the old snapshot until commit"""
+        if not self._building.acquire(blocking=False):
+            return 0
+        try:
+            start = time.perf_counter()
+            count = 0
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM files")
+                if self._fts:
+                    conn.execute("INSERT INTO files_fts(files_fts) VALUES('delete-all')")
+
+                entries = walk(self.root, skip=self.db_path.parent)
+                while batch := list(islice(entries, BATCH_SIZE)):
+                    conn.executemany("INSERT OR IGNORE INTO files(path, name, is_dir) VALUES (?, ?, ?)", batch)
+                    count += len(batch)
+
+                if self._fts:
+                    conn.execute("INSERT INTO files_fts(files_fts) VALUES('rebuild')")
+                now = time.time()
+                self._set_meta(conn, built_at=now, updated_at=now)
+            base_logger.internal(f"File index built: {count} entries in {round(time.perf_counter() - start, 2)}s")
+            return count
+        finally:
+            self._building.release()
+
+    def build_if_stale(self) -> int:
+        if self.is_fresh():
+            return 0
+        return self.build()
+
+    def _entries(self, p: Path) -> List[Entry]:
+        """p, and everything below it when it is a directory, nothing when it is gone or outside root"""
+        if not self.covers(p) or self._ignored(p):
+            return []
+        try:
+            is_dir = p.is_dir() and not p.is_symlink()
+        except OSError:
+            return []
+        if not is_dir and not p.exists():
+            return []
+        entries = [(str(p), p.name, int(is_dir))]
+        if is_dir:
+            entries.extend(walk(p, skip=self.db_path.parent))
+        return entries
+
+    def _insert(self, conn: sqlite3.Connection, entries: List[Entry]) -> None:
+        if not entries:
+            return
+        # ids only grow, so the rows this insert added are the ones past the previous maximum
+        before = conn.execute("SELECT coalesce(max(id), 0) FROM files").fetchone()[0]
+        conn.executemany("INSERT INTO files(path, name, is_dir) VALUES (?, ?, ?) ON CONFLICT(path) DO NOTHING", entries)
+        if self._fts:
+            conn.execute("INSERT INTO files_fts(rowid, name) SELECT id, name FROM files WHERE id > ?", (before,))
+
+    def _delete(self, conn: sqlite3.Connection, paths: Iterable[str]) -> None:
+        """Drop each path and its subtree, '/' < '0' bounds the subtree on the unique path index"""
+        rows = []
+        for p in paths:
+            rows.extend(conn.execute(
+                "SELECT id, name FROM files WHERE path = ? OR (path >= ? AND path < ?)",
+                (p, p + "/", p + "0")
+            ).fetchall())
+        if not rows:
+            return
+        if self._fts:
+            conn.executemany("INSERT INTO files_fts(files_fts, rowid, name) VALUES('delete', ?, ?)", rows)
+        conn.executemany("DELETE FROM files WHERE id = ?", [(row_id,) for row_id, _ in rows])
+
+    def sync(self, paths: Iterable[Path | str]) -> None:
+        """
+        Bring each path in line with the disk in one transaction: indexed when it exists, dropped with
+        its subtree when it does not. Watcher events of any kind reduce to this once they are batched.
+        """
+        present: List[Entry] = []
+        gone: List[str] = []
+        for path in paths:
+            p = Path(path)
+            if entries := self._entries(p):
+                present.extend(entries)
+            elif self.covers(p) and not self._ignored(p):
+                gone.append(str(p))
+
+        with closing(self._connect()) as conn, conn:
+            self._delete(conn, gone)
+            self._insert(conn, present)
+            self._set_meta(conn, updated_at=time.time())
+
+    def add(self, path: Path | str) -> None:
+        """Index path, and everything below it when it is a directory"""
+        entries = self._entries(Path(path))
+        if not entries:
+            return
+        with closing(self._connect()) as conn, conn:
+            self._insert(conn, entries)
+            self._set_meta(conn, updated_at=time.time())
+
+    def remove(self, path: Path | str) -> None:
+        with closing(self._connect()) as conn, conn:
+            self._delete(conn, [str(path)])
+            self._set_meta(conn, updated_at=time.time())
+
+    def move(self, src: Path | str, dst: Path | str) -> None:
+        self.sync([src, dst])
+
+    def search(self, pattern: str, base: Path | str) -> List[Path] | None:
+        """Paths under base whose name matches the regex pattern, None when the index cannot answer"""
+        base_path = Path(base).expanduser().absolute()
+        if not self.covers(base_path) or not self.is_fresh():
+            return None
+
+        # only the literal pieces between clean_user_search's '.*?' can be pushed into sqlite
+        terms = [term for term in pattern.split(".*?") if term]
+        if any(re.escape(term) != term for term in terms):
+            return None
+
+        prefix = str(base_path).rstrip("/")
+        where = "f.path >= ? AND f.path < ?"
+        params: list = [prefix + "/", prefix + "0"]
+
+        trigrams = [term for term in terms if len(term) >= 3]
+        if self._fts and trigrams:
+            query = (
+                "SELECT f.path, f.name FROM files_fts JOIN files f ON f.id = files_fts.rowid "
+                f"WHERE files_fts MATCH ? AND {where}"
+            )
+            params.insert(0, " AND ".join(f'"{term}"' for term in trigrams))
+        else:
+            like = "%" + "%".join(term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") for term in terms) + "%"
+            query = f"SELECT f.path, f.name FROM files f WHERE f.name LIKE ? ESCAPE '\\' AND {where}"
+            params.insert(0, like)
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        matches, missing = [], []
+        for path, name in rows:
+            if not re.search(pattern, name):
+                continue
+            if os.path.lexists(path):
+                matches.append(Path(path))
+            else:
+                missing.append(path)
+
+        for path in missing:
+            self.remove(path)
+        return matches
+
+    def _ignored(self, path: Path) -> bool:
+        # the index database lives under root, its own writes must not feed back into it
+        return self.db_path.parent == path or self.db_path.parent in path.parents
+
+
+def walk(top: Path | str, skip: Path | None = None) -> Iterator[Entry]:
+    """Iterative scandir walk yielding (path, name, is_dir), symlinked directories are not followed"""
+    stack = [str(top)]
+    skipped = str(skip) if skip else None
+
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.path == skipped:
+                        continue
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        stack.append(entry.path)
+                    yield entry.path, entry.name, int(is_dir)
+        except OSError:
+            continue
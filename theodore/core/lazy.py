@@ -88,10 +88,18 @@ def get_dispatch():
     from theodore.ai.dispatch import Dispatch
     return Dispatch()
 
+SENTENCE_MODEL = "all-MiniLM-L6-v2"
+
 @lru_cache
 def sentence_model():
     from sentence_transformers import SentenceTransformer
-    return  SentenceTransformer("all-MiniLM-L6-v2")
+    return  SentenceTransformer(SENTENCE_MODEL)
+
+@lru_cache
+def get_encoder():
+    """Intent encoder for the THEODORE_INTENT_BACKEND backend, its model loads on first use"""
+    from theodore.ai.encoders import make_encoder
+    return make_encoder()
 
 
 @lru_cache
@@ -119,6 +127,33 @@ def get_file_manager():
     from theodore.managers.file_manager import FileManager
     return FileManager()
 
+@lru_cache
+def get_file_index():
+    from theodore.core.file_index import FileIndex
+    return FileIndex()
+
+@lru_cache
+def get_log_index():
+    from theodore.managers.log_search import LogIndex
+    return LogIndex()
+
+@lru_cache
+def get_log_service():
+    from theodore.managers.log_service import LogService
+    return LogService()
+
+@lru_cache
+def get_live_state():
+    """Writer of the dashboard's shared memory state, only the daemon calls this"""
+    from theodore.core.live_state import LiveState
+    return LiveState()
+
+@lru_cache
+def get_metrics_store():
+    """Read only view of the daemon's metric rings"""
+    from theodore.core.timeseries import MetricsStore
+    return MetricsStore(readonly=True)
+
 @lru_cache
 def get_worker():
     from theodore.managers.daemon_manager import Worker
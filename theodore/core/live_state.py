@@ -0,0 +1,143 @@
+"""
+
+Live daemon state for the dashboard over one shared memory segment.
+The daemon publishes named sections (metrics, downloads, queues, logs, etl) as a JSON document behind a
+sequence lock, the dashboard compares one counter per frame and only decodes when it moved,
+so an idle dashboard costs no file or socket I/O and never sees a half written document.
+
+"""
+
+import getpass
+import json
+import struct
+import threading
+import time
+
+from multiprocessing import shared_memory
+from typing import Any, Dict, Tuple
+
+from theodore.core.logger_setup import base_logger
+
+
+LIVE_STATE_NAME = f"theodore_live_{getpass.getuser()}"
+LIVE_STATE_SIZE = 4 * 1024**2
+HEADER = struct.Struct("<QQ")   # sequence (odd while a write is in progress), payload length
+REATTACH_AFTER = 10.0           # seconds without a new version before a reader checks for a restarted daemon
+READ_RETRIES = 50
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # before 3.13 every attach registers with the resource tracker, which unlinks the segment when the reader exits
+        from multiprocessing import resource_tracker
+
+        segment = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+class LiveState:
+    """Writer side, owned by the daemon. Sections are merged, publishing one leaves the others as they were"""
+    def __init__(self, name: str = LIVE_STATE_NAME, size: int = LIVE_STATE_SIZE):
+        self.name = name
+        self.size = size
+        self._lock = threading.Lock()
+        self._sections: Dict[str, Any] = {}
+        self._sequence = 0
+        try:
+            self._segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # left behind by a daemon that did not shut down cleanly
+            stale = _attach(name)
+            stale.close()
+            stale.unlink()
+            self._segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        HEADER.pack_into(self._segment.buf, 0, 0, 0)
+
+    def publish(self, **sections: Any) -> None:
+        with self._lock:
+            changed = {key: value for key, value in sections.items() if self._sections.get(key) != value}
+            if not changed:
+                return
+            self._sections.update(changed)
+            self._sections["published_at"] = time.time()
+            payload = json.dumps(self._sections, default=str).encode()
+            if HEADER.size + len(payload) > self.size:
+                base_logger.internal(f"Live state of {len(payload)} bytes does not fit the {self.size} byte segment")
+                return
+
+            buf = self._segment.buf
+            self._sequence += 1
+            HEADER.pack_into(buf, 0, self._sequence, 0)
+            buf[HEADER.size:HEADER.size + len(payload)] = payload
+            self._sequence += 1
+            HEADER.pack_into(buf, 0, self._sequence, len(payload))
+
+    def close(self) -> None:
+        with self._lock:
+            self._segment.close()
+            try:
+                self._segment.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class LiveStateReader:
+    """Dashboard side, attaches lazily and follows a daemon restart"""
+    def __init__(self, name: str = LIVE_STATE_NAME):
+        self.name = name
+        self._segment: shared_memory.SharedMemory | None = None
+        self._version = -1
+        self._state: Dict[str, Any] = {}
+        self._changed_at = time.monotonic()
+
+    def _connect(self) -> bool:
+        if self._segment is not None:
+            return True
+        try:
+            self._segment = _attach(self.name)
+        except FileNotFoundError:
+            return False
+        self._version = -1
+        return True
+
+    def _detach(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def version(self) -> int | None:
+        """Sequence of the last complete publish, None while no daemon is publishing"""
+        if not self._connect():
+            return None
+        return HEADER.unpack_from(self._segment.buf, 0)[0] & ~1
+
+    def read(self) -> Tuple[int | None, Dict[str, Any]]:
+        """(version, state), the cached state is returned as is while the version has not moved"""
+        if (version:=self.version()) is None:
+            return None, {}
+        if version == self._version:
+            if time.monotonic() - self._changed_at > REATTACH_AFTER:
+                # a daemon restart replaces the segment, this mapping would never change again
+                self._detach()
+                self._changed_at = time.monotonic()
+            return self._version, self._state
+
+        buf = self._segment.buf
+        for _ in range(READ_RETRIES):
+            before, length = HEADER.unpack_from(buf, 0)
+            if before & 1:
+                time.sleep(0)
+                continue
+            payload = bytes(buf[HEADER.size:HEADER.size + length])
+            if HEADER.unpack_from(buf, 0)[0] == before:
+                self._version = before
+                self._state = json.loads(payload) if payload else {}
+                self._changed_at = time.monotonic()
+                break
+        return self._version, self._state
+
+    def close(self) -> None:
+        self._detach()
@@ -0,0 +1,89 @@
+"""
+
+Non-blocking metric collection for SystemMonitor.
+Every reading is a delta against the previous call, cpu_percent(None) and I/O counters alike,
+so a sample costs a few psutil calls instead of sleeping through the interval.
+Which metric sets run and how often comes from THEODORE_METRICS and THEODORE_METRICS_INTERVAL.
+
+"""
+
+import os
+import time
+import psutil
+
+from typing import Dict, List, Sequence
+
+
+METRIC_SETS = {
+    "system": ["cpu", "mem", "disk"],                       # machine cpu %, memory %, root disk usage %
+    "process": ["ram", "proc_cpu", "threads", "children"],  # the daemon with its children, rss mb and cpu %
+    "io": ["sent", "recv", "read", "write"],                # network and disk mb/s
+}
+DEFAULT_SETS = ["system", "process", "io"]
+METRICS = [name.strip() for name in os.getenv("THEODORE_METRICS", ",".join(DEFAULT_SETS)).split(",") if name.strip() in METRIC_SETS]
+METRICS_INTERVAL = float(os.getenv("THEODORE_METRICS_INTERVAL", 5))
+MB = 1024**2
+
+
+class MetricCollector:
+    def __init__(self, sets: Sequence[str] = METRICS, pid: int | None = None):
+        self.sets = [name for name in sets if name in METRIC_SETS] or DEFAULT_SETS
+        self.names: List[str] = [metric for name in self.sets for metric in METRIC_SETS[name]]
+        self.me = psutil.Process(pid)
+        # Process objects are kept between samples, cpu_percent(None) measures from the previous call on the same object
+        self._processes: Dict[int, psutil.Process] = {self.me.pid: self.me}
+        self._io: Dict[str, tuple] = {}
+        self._last: float | None = None
+        self.sample()
+
+    def sample(self) -> List[float]:
+        """One value per name, rates cover the time since the previous sample"""
+        now = time.monotonic()
+        elapsed = None if self._last is None else max(now - self._last, 1e-6)
+        self._last = now
+
+        values: Dict[str, float] = {}
+        if "system" in self.sets:
+            values["cpu"] = psutil.cpu_percent(None)
+            values["mem"] = psutil.virtual_memory().percent
+            values["disk"] = psutil.disk_usage("/").percent
+        if "process" in self.sets:
+            values.update(self._process_tree())
+        if "io" in self.sets:
+            net = psutil.net_io_counters()
+            disk = psutil.disk_io_counters()
+            values["sent"], values["recv"] = self._rates("net", (net.bytes_sent, net.bytes_recv), elapsed)
+            counters = (disk.read_bytes, disk.write_bytes) if disk is not None else (0, 0)
+            values["read"], values["write"] = self._rates("disk", counters, elapsed)
+        return [round(values[name], 2) for name in self.names]
+
+    def _rates(self, key: str, counters: tuple, elapsed: float | None) -> tuple:
+        previous, self._io[key] = self._io.get(key), counters
+        if previous is None or elapsed is None:
+            return (0.0,) * len(counters)
+        # counters can wrap or reset when an interface goes away, that tick reads as idle
+        return tuple(max(current - before, 0) / MB / elapsed for current, before in zip(counters, previous))
+
+    def _process_tree(self) -> Dict[str, float]:
+        try:
+            children = self.me.children(recursive=True)
+        except psutil.NoSuchProcess:
+            children = []
+
+        alive = {self.me.pid: self.me}
+        for child in children:
+            # reuse the stored object so its cpu_percent has a baseline
+            alive[child.pid] = self._processes.get(child.pid, child)
+        self._processes = alive
+
+        rss = cpu = threads = 0.0
+        for process in alive.values():
+            try:
+                with process.oneshot():
+                    rss += process.memory_info().rss
+                    cpu += process.cpu_percent(None)
+                    threads += process.num_threads()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                # a download or shell command that finished between listing and reading
+                continue
+        return {"ram": rss / MB, "proc_cpu": cpu, "threads": threads, "children": float(len(children))}
@@ -0,0 +1,206 @@
+"""
+
+Mergeable streaming sketches for the ETL profiler.
+Every sketch takes numpy batches, merges with another of its kind, and keeps its memory fixed
+no matter how many rows pass through, so chunks and appended files can be profiled apart and combined.
+
+"""
+
+import numpy as np
+
+
+EXACT_LIMIT = 4_096         # distinct hashes kept exactly before a counter switches to HyperLogLog, past it the set outweighs the 16KB registers
+EXACT_VALUES = 10_000       # raw values a TDigest keeps before it starts merging centroids
+SAMPLE_ROWS = 10_000        # rows measured deeply when estimating object column memory
+
+
+class HyperLogLog:
+    """Distinct count estimate over 64 bit hashes, 2**p one byte registers, ~1.04/sqrt(2**p) relative error"""
+    def __init__(self, p: int = 14):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add(self, hashes: np.ndarray) -> None:
+        if not hashes.size:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.intp)
+        # the top 32 bits left after the index are enough for the rank and convert to float exactly
+        rest = ((hashes << np.uint64(self.p)) >> np.uint64(32)).astype(np.float64)
+        rank = np.full(hashes.shape, 33, dtype=np.uint8)
+        nonzero = rest > 0
+        rank[nonzero] = (32 - np.floor(np.log2(rest[nonzero]))).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.p != self.p:
+            raise ValueError(f"Cannot merge HyperLogLog of precision {other.p} into {self.p}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m**2 / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.m and zeros:
+            # linear counting is far better while many registers are still empty
+            estimate = self.m * np.log(self.m / zeros)
+        return int(round(estimate))
+
+
+class DistinctCounter:
+    """Exact set of hashes up to `limit`, then a HyperLogLog seeded with them. `exact` tells which one answered"""
+    def __init__(self, limit: int = EXACT_LIMIT):
+        self.limit = limit
+        self._seen: set | None = set()
+        self._hll: HyperLogLog | None = None
+
+    @property
+    def exact(self) -> bool:
+        return self._hll is None
+
+    def add(self, hashes: np.ndarray) -> None:
+        if self._hll is not None:
+            self._hll.add(hashes)
+            return
+        self._seen.update(np.unique(hashes).tolist())
+        if len(self._seen) > self.limit:
+            self._promote()
+
+    def _promote(self) -> None:
+        self._hll = HyperLogLog()
+        self._hll.add(np.fromiter(self._seen, dtype=np.uint64, count=len(self._seen)))
+        self._seen = None
+
+    def merge(self, other: "DistinctCounter") -> "DistinctCounter":
+        if other._hll is None:
+            self.add(np.fromiter(other._seen, dtype=np.uint64, count=len(other._seen)))
+            return self
+        if self._hll is None:
+            self._promote()
+        self._hll.merge(other._hll)
+        return self
+
+    def count(self) -> int:
+        return len(self._seen) if self._hll is None else self._hll.count()
+
+
+class TDigest:
+    """
+    Merging t-digest for quantiles and tail fractions. Up to `exact_limit` values are kept raw and answered exactly,
+    past it batches are pre-binned with numpy and centroids merge under the k1 size bound so the tails stay fine grained.
+    """
+    def __init__(self, compression: int = 100, exact_limit: int = EXACT_VALUES):
+        self.compression = compression
+        self.exact_limit = exact_limit
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._raw: list[np.ndarray] | None = []
+
+    @property
+    def exact(self) -> bool:
+        return self._raw is not None
+
+    def update(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)].astype(np.float64, copy=False)
+        if not values.size:
+            return
+        self.count += values.size
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+        if self._raw is not None:
+            self._raw.append(values)
+            if self.count <= self.exact_limit:
+                return
+            values = np.concatenate(self._raw)
+            self._raw = None
+        self._add_sorted(np.sort(values))
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        if not other.count:
+            return self
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+        if self._raw is not None and other._raw is not None and self.count <= self.exact_limit:
+            self._raw.extend(other._raw)
+            return self
+        self._flush()
+        if other._raw is not None:
+            self._add_sorted(np.sort(np.concatenate(other._raw)))
+        else:
+            self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    def _flush(self) -> None:
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        if raw:
+            self._add_sorted(np.sort(np.concatenate(raw)))
+
+    def _add_sorted(self, values: np.ndarray) -> None:
+        bins = max(1, values.size // (self.compression * 20))
+        if bins > 1:
+            edges = np.arange(0, values.size, bins)
+            weights = np.diff(np.append(edges, values.size)).astype(np.float64)
+            means = np.add.reduceat(values, edges) / weights
+        else:
+            means, weights = values, np.ones(values.size)
+        self._compress(np.concatenate([self.means, means]), np.concatenate([self.weights, weights]))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        if not means.size:
+            return
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+
+        new_means, new_weights = [], []
+        cur_mean, cur_weight, before = means[0], weights[0], 0.0
+        for mean, weight in zip(means[1:].tolist(), weights[1:].tolist()):
+            q = (before + cur_weight + weight / 2) / total
+            if cur_weight + weight <= max(1.0, 4 * total * q * (1 - q) / self.compression):
+                cur_weight += weight
+                cur_mean += (mean - cur_mean) * weight / cur_weight
+            else:
+                new_means.append(cur_mean)
+                new_weights.append(cur_weight)
+                before += cur_weight
+                cur_mean, cur_weight = mean, weight
+        new_means.append(cur_mean)
+        new_weights.append(cur_weight)
+
+        self.means = np.asarray(new_means, dtype=np.float64)
+        self.weights = np.asarray(new_weights, dtype=np.float64)
+
+    def _positions(self) -> tuple[np.ndarray, np.ndarray]:
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return np.concatenate([[self.min], self.means, [self.max]]), np.concatenate([[0.0], centers, [self.count]])
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return np.nan
+        if self._raw is not None:
+            return float(np.quantile(np.concatenate(self._raw), q))
+        points, ranks = self._positions()
+        return float(np.interp(q * self.count, ranks, points))
+
+    def cdf(self, x: float) -> float:
+        """Share of values <= x"""
+        if not self.count:
+            return np.nan
+        if self._raw is not None:
+            return float(np.mean(np.concatenate(self._raw) <= x))
+        if x < self.min:
+            return 0.0
+        if x >= self.max:
+            return 1.0
+        points, ranks = self._positions()
+        return float(np.interp(x, points, ranks) / self.count)
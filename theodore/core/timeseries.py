@@ -0,0 +1,192 @@
+"""
+
+Fixed size, memory mapped time series for SystemMonitor samples.
+Each ring is written twice, at slot and slot + capacity, so the newest n samples are always one contiguous
+slice of the map and readers in any process get numpy views without copying. Minute and hour rollups are
+averaged from the finer ring whenever a sample crosses into a new bucket, so they survive daemon restarts.
+
+"""
+
+import json
+import time
+import numpy as np
+
+from pathlib import Path
+from typing import Sequence, Tuple
+
+from theodore.core.paths import DATA_DIR
+
+
+METRICS_DIR = DATA_DIR/"vectors"
+MAGIC = 0x7E0D0001
+HEADER = 4          # int64 words: magic, columns, capacity, samples written
+RAW_CAPACITY = 17_280       # a day at the default 5s interval
+MINUTE_CAPACITY = 7 * 24 * 60
+HOUR_CAPACITY = 366 * 24
+
+
+class RingBuffer:
+    def __init__(self, path: Path | str, columns: int, capacity: int, readonly: bool = False):
+        self.path = Path(path)
+        self.columns = columns
+        self.capacity = capacity
+        self.readonly = readonly
+        self.dtype = np.dtype([("t", "<f8"), ("v", "<f4", (columns,))])
+        self._header: np.memmap | None = None
+        self._records: np.memmap | None = None
+        self._open()
+
+    @property
+    def nbytes(self) -> int:
+        return HEADER * 8 + 2 * self.capacity * self.dtype.itemsize
+
+    def _valid(self) -> bool:
+        if not self.path.exists() or self.path.stat().st_size != self.nbytes:
+            return False
+        header = np.fromfile(self.path, dtype=np.int64, count=HEADER)
+        return bool(header[0] == MAGIC and header[1] == self.columns and header[2] == self.capacity)
+
+    def _open(self) -> None:
+        if not self._valid():
+            if self.readonly:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("wb") as f:
+                f.truncate(self.nbytes)
+                f.write(np.array([MAGIC, self.columns, self.capacity, 0], dtype=np.int64).tobytes())
+
+        mode = "r" if self.readonly else "r+"
+        self._header = np.memmap(self.path, dtype=np.int64, mode=mode, shape=(HEADER,))
+        self._records = np.memmap(self.path, dtype=self.dtype, mode=mode, offset=HEADER * 8, shape=(2 * self.capacity,))
+
+    @property
+    def written(self) -> int:
+        if self._header is None:
+            # a reader opened before the writer created the file
+            self._open()
+        return 0 if self._header is None else int(self._header[3])
+
+    def __len__(self) -> int:
+        return min(self.written, self.capacity)
+
+    def append(self, timestamp: float, values: Sequence[float] | np.ndarray) -> None:
+        written = self.written
+        slot = written % self.capacity
+        self._records[slot] = (timestamp, values)
+        self._records[slot + self.capacity] = (timestamp, values)
+        # the count moves last, a reader never sees a slot that is still being written
+        self._header[3] = written + 1
+
+    def last(self, n: int | None = None) -> np.ndarray:
+        """View of the newest n records, oldest first, fields 't' and 'v'"""
+        written = self.written
+        count = len(self) if n is None else min(n, len(self))
+        if not count:
+            return np.empty(0, dtype=self.dtype)
+        end = (written - 1) % self.capacity + self.capacity + 1
+        return self._records[end - count:end]
+
+    def since(self, timestamp: float) -> np.ndarray:
+        """View of the records at or after timestamp"""
+        records = self.last()
+        return records[np.searchsorted(records["t"], timestamp):]
+
+    def flush(self) -> None:
+        if self._records is not None and not self.readonly:
+            self._records.flush()
+            self._header.flush()
+
+
+class MetricsStore:
+    """
+    Raw samples with 1 minute and 1 hour mean rollups, all RingBuffers under directory.
+    The writer records its column names next to the rings, readers take them from there and follow when they change.
+    """
+    def __init__(self, directory: Path = METRICS_DIR, names: Sequence[str] | None = None, readonly: bool = False):
+        self.directory = directory
+        self.names_file = directory/"metrics.json"
+        self.readonly = readonly
+        self._names_stamp: int | None = None
+        if names is not None and not readonly:
+            directory.mkdir(parents=True, exist_ok=True)
+            self.names_file.write_text(json.dumps(list(names)))
+        self._open(names)
+
+    def _open(self, names: Sequence[str] | None) -> None:
+        if names is None:
+            names = json.loads(self.names_file.read_text()) if self.names_file.exists() else []
+        if self.names_file.exists():
+            self._names_stamp = self.names_file.stat().st_mtime_ns
+        self.names = list(names)
+        columns = len(self.names)
+        self.raw = RingBuffer(self.directory/"metrics.raw", columns, RAW_CAPACITY, self.readonly)
+        self.minute = RingBuffer(self.directory/"metrics.1m", columns, MINUTE_CAPACITY, self.readonly)
+        self.hour = RingBuffer(self.directory/"metrics.1h", columns, HOUR_CAPACITY, self.readonly)
+
+    def _follow(self) -> None:
+        # the daemon restarted with another metric set, the rings were rebuilt for it
+        if not self.readonly:
+            return
+        stamp = self.names_file.stat().st_mtime_ns if self.names_file.exists() else None
+        if stamp != self._names_stamp:
+            self._open(None)
+
+    def column(self, values: np.ndarray, name: str) -> np.ndarray | None:
+        """Column `name` of a sample or window, None when the writer does not collect it"""
+        if name not in self.names:
+            return None
+        return values[..., self.names.index(name)]
+
+    def append(self, values: Sequence[float] | np.ndarray, timestamp: float | None = None) -> None:
+        timestamp = time.time() if timestamp is None else timestamp
+        previous = self.raw.last(1)
+        self.raw.append(timestamp, values)
+        if not previous.size:
+            return
+
+        before = float(previous["t"][0])
+        if (closed:=self._rollup(self.raw, self.minute, 60, before, timestamp)) is not None:
+            self._rollup(self.minute, self.hour, 60 * 60, closed, timestamp)
+
+    def _rollup(self, source: RingBuffer, target: RingBuffer, width: int, before: float, now: float) -> float | None:
+        """Average the bucket `before` fell in once `now` has left it, returns that bucket's start"""
+        start = before - before % width
+        if now < start + width:
+            return None
+        window = source.since(start)
+        window = window[window["t"] < start + width]
+        if window.size:
+            target.append(start, np.nanmean(window["v"], axis=0))
+        return start
+
+    def window(self, seconds: float, now: float | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values) views over the last `seconds`, from the finest ring that still covers them"""
+        self._follow()
+        now = time.time() if now is None else now
+        start = now - seconds
+        records = self.raw.last()
+        for ring in (self.raw, self.minute, self.hour):
+            candidate = ring.last()
+            if not candidate.size:
+                continue
+            if not records.size or candidate["t"][0] < records["t"][0]:
+                records = candidate
+            if candidate["t"][0] <= start:
+                records = candidate
+                break
+        records = records[np.searchsorted(records["t"], start):]
+        return records["t"], records["v"]
+
+    def latest(self, max_age: float | None = None) -> np.ndarray | None:
+        """Newest sample, None when there is none or it is older than max_age seconds"""
+        self._follow()
+        records = self.raw.last(1)
+        if not records.size:
+            return None
+        if max_age is not None and time.time() - records["t"][0] > max_age:
+            return None
+        return records["v"][0]
+
+    def flush(self) -> None:
+        for ring in (self.raw, self.minute, self.hour):
+            ring.flush()
@@ -1,5 +1,5 @@
 import re
-from datetime import datetime
+from datetime import date, datetime
 from functools import partial
 from rich.table import Table
 from typing import  Annotated
@@ -95,12 +95,16 @@ def get_configs_table(data):
     return table
 
 def get_weather_models():
-    from pydantic import BaseModel, ConfigDict, Field
+    from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
     class WeatherModel(BaseModel):
         model_config = ConfigDict(extra='ignore')
-        city: str
+        # the API's location block calls the city 'name'
+        city: Annotated[str, Field(validation_alias=AliasChoices('city', 'name'))]
         country: str
+        lat: float
+        lon: float
+        date: date
         time_requested: Annotated[datetime, Field(default_factory=partial(datetime.now, tz=get_localzone()))]
 
     class CurrentModel(WeatherModel):
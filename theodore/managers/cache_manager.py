@@ -1,6 +1,8 @@
-import json, time
+import fcntl, json, time
+from contextlib import contextmanager
 from typing import Dict, Literal
 from datetime import datetime
+from pathlib import Path
 
 from sqlalchemy import select, insert, update
 from sqlalchemy.exc import SQLAlchemyError
@@ -18,14 +20,17 @@ CACHE_DIR = DATA_DIR / "cache"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 FILE_PATH = CACHE_DIR / 'weather.cache'
+ETL_CACHE_PATH = CACHE_DIR / 'etl.cache'
 
 
 
 
 class Cache_manager:
-    """Loads weather and File cache"""
-    def __init__(self, ttl):
+    """Loads weather and File cache. Entries older than ttl are dropped on write, and the oldest go first past max_bytes"""
+    def __init__(self, ttl, path: Path = FILE_PATH, max_bytes: int | None = None):
         self.ttl = ttl
+        self.path = Path(path)
+        self.max_bytes = max_bytes
         self.cache = self._load_cache()
 
         self.registry = {
@@ -91,22 +96,49 @@ class Cache_manager:
             return send_message(False, message=f"unable to load cache {str(err)}")
         
     def _load_cache(self):
-        if FILE_PATH.exists():
+        if self.path.exists():
             try:
-
-                data = json.loads(FILE_PATH.read_text())
+                self._mtime = self.path.stat().st_mtime
+                data = json.loads(self.path.read_text())
                 return data
 
-            except json.JSONDecodeError:
+            except (json.JSONDecodeError, OSError):
                 return {}
             
         return {}
     
     def _save_cache(self):
-        FILE_PATH.write_text(json.dumps(self.cache, indent=4))
+        # written by the daemon and read by the cli, replace atomically so readers never see half a file
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.cache, indent=4))
+        tmp.replace(self.path)
+        self._mtime = self.path.stat().st_mtime
         return
+
+    @contextmanager
+    def _locked(self):
+        """
+        Exclusive flock on a sidecar file around a read-modify-write. The daemon and CLI processes share the cache file,
+        the current contents are re-read under the lock so a concurrent writer's entries are not overwritten.
+        """
+        with self.path.with_suffix('.lock').open('a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                self.cache = self._load_cache()
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return
+        if mtime != getattr(self, '_mtime', None):
+            self.cache = self._load_cache()
     
     def get_cache(self, key):
+        self._refresh()
         if not self.cache:
             return None
         
@@ -120,7 +152,7 @@ class Cache_manager:
 
         base_logger.internal('filtering recent cache data')
         old_time = record['ttl_stamp']
-        new_time = time.monotonic()
+        new_time = time.time()
         time_difference = new_time - old_time
 
         if time_difference > self.ttl:
@@ -131,20 +163,38 @@ class Cache_manager:
         base_logger.debug(f"Cache manager returned {weather_data}")
         return weather_data
     
+    def _evict(self):
+        now = time.time()
+        self.cache = {key: record for key, record in self.cache.items() if now - record['ttl_stamp'] <= self.ttl}
+        if not self.max_bytes:
+            return
+
+        sizes = {key: len(json.dumps(record)) for key, record in self.cache.items()}
+        total = sum(sizes.values())
+        for key in sorted(self.cache, key=lambda k: self.cache[k]['ttl_stamp']):
+            if total <= self.max_bytes:
+                break
+            total -= sizes[key]
+            self.cache.pop(key)
+            base_logger.debug(f"Cache evicted {key} from {self.path.name}")
+
     def clear_cache(self):
         self.cache = {}
         return
+
+    def pop_cache(self, key):
+        with self._locked():
+            if self.cache.pop(key.lower(), None) is not None:
+                self._save_cache()
+        return
     
     def set_cache(self, key, data):
         key = key.lower()
         try:
-
-            if key in self.cache:
-                self.cache[key]['data'].update(data)
-            else:
-                self.cache[key] = {"ttl_stamp": time.monotonic(), "timestamp": datetime.now(get_localzone()).isoformat(), f"data": data}
-            
-            self._save_cache()
+            with self._locked():
+                self.cache[key] = {"ttl_stamp": time.time(), "timestamp": datetime.now(get_localzone()).isoformat(), f"data": data}
+                self._evict()
+                self._save_cache()
             return send_message(True, message='Cache created')
-        except json.JSONDecodeError as e:
+        except (TypeError, ValueError) as e:
             return send_message(False, message=f"A Json decode error occured {str(e)}")
\ No newline at end of file
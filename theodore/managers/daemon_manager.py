@@ -1,6 +1,11 @@
-import asyncio, heapq, getpass, json, psutil, struct, time, threading, traceback, numpy
+import asyncio, heapq, getpass, json, os, psutil, queue, sqlite3, struct, time, threading, traceback, numpy
+import multiprocessing as mp
+import importlib.util
 
 from asyncio.exceptions import IncompleteReadError
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime as dt, UTC
 from pathlib import Path
 from typing import Mapping, Any, Tuple, List
@@ -8,11 +13,15 @@ from watchdog.observers import Observer
 from watchdog.events import (
     FileClosedEvent, FileSystemEventHandler, DirMovedEvent, 
     FileMovedEvent, DirDeletedEvent, FileDeletedEvent, 
+    DirCreatedEvent, FileCreatedEvent,
     )
 
-from theodore.core.file_helpers import resolve_path, organize
+from theodore.core.file_helpers import resolve_path, organize, shutdown_io_executor
 from theodore.core.logger_setup import base_logger, error_logger, vector_perf, system_logs
 from theodore.core.informers import user_info, user_warning
+from theodore.core.anomaly import SeriesDetector
+from theodore.core.metrics import MetricCollector, METRICS_INTERVAL
+from theodore.core.timeseries import MetricsStore
 from theodore.managers.file_manager import FileManager
 from contextlib import suppress
 
@@ -20,9 +29,8 @@ from theodore.core.paths import (
     SERVER_STATE_FILE, 
     WATCHER_ETL_DIR, 
     CLEANED_ETL_DIR, 
+    ORIGINAL_ETL_DIR, 
     WATCHER_ORGANIZER, 
-    SYS_VECTOR_FILE, 
-    DF_CHANNEL
     )
 
 
@@ -54,7 +62,96 @@ class Signal:
     def stop(self):
         self._signal_shutdown_event.set()
 
+ETL_CACHE_TTL = 7 * 24 * 60 * 60
+ETL_CACHE_BYTES = 8 * 1024**2
+
+
+class MemoryBudget:
+    """
+    Blocks reservations that would push estimated usage past a share of available RAM.
+    A single reservation larger than the whole budget still runs, just alone.
+    """
+    def __init__(self, fraction: float = 0.5):
+        self.fraction = fraction
+        self._cond = threading.Condition()
+        self._reserved = 0
+        self._limit = self._available()
+
+    def _available(self) -> int:
+        return int(psutil.virtual_memory().available * self.fraction)
+
+    @property
+    def reserved(self) -> int:
+        with self._cond:
+            return self._reserved
+
+    @contextmanager
+    def reserve(self, amount: int):
+        with self._cond:
+            while self._reserved and self._reserved + amount > self._limit:
+                self._cond.wait()
+            if not self._reserved:
+                self._limit = self._available()
+            self._reserved += amount
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._reserved -= amount
+                self._cond.notify_all()
+
+def _output_stamp(path: str) -> list | None:
+    """Size and mtime of an ETL output, None once it is gone"""
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
 class ETL:
+    """
+    Transforms run in a process pool so clean_records' string work is not serialised on the GIL.
+    Workers write the cleaned output themselves and send back only the profile JSON,
+    and a MemoryBudget keeps the files in flight within available RAM.
+    """
+    def __init__(self, max_workers: int | None = None, memory_fraction: float = 0.5):
+        from theodore.managers.cache_manager import Cache_manager, ETL_CACHE_PATH
+
+        self._max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self._budget = MemoryBudget(memory_fraction)
+        self._executor: ProcessPoolExecutor | None = None
+        self._dispatch: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        # content hash + options -> output path and profile, so re-dropped files skip the transform
+        self._cache = Cache_manager(ttl=ETL_CACHE_TTL, path=ETL_CACHE_PATH, max_bytes=ETL_CACHE_BYTES)
+        self._cache_lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # the daemon is threaded, forked workers could inherit held locks
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers, mp_context=mp.get_context("spawn"))
+            return self._executor
+
+    def submit(self, path: Path | str, save_to: Path | str = CLEANED_ETL_DIR, **kwds) -> Future:
+        """
+        Queue a transform without waiting on it. The memory reservation and the wait on the process pool
+        happen on a dispatch thread, so a batch of files is in the pool as soon as the budget allows.
+        """
+        with self._lock:
+            if self._dispatch is None:
+                self._dispatch = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="etl-dispatch")
+            dispatch = self._dispatch
+        return dispatch.submit(self.transform, path, save_to, **kwds)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._dispatch is not None:
+                self._dispatch.shutdown(wait=False, cancel_futures=True)
+                self._dispatch = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
 
     def transform(
         self,
@@ -63,18 +160,54 @@ class ETL:
         **kwds
         ):
 
-        from theodore.core.etl_helpers import transform_data
-
+        from theodore.core.etl_helpers import run_transform, estimate_memory, content_key
+        from theodore.managers.shell_manager import TaskID
+
+        start = time.perf_counter()
+        key = content_key(path, save_to=str(save_to), **kwds)
+        with self._cache_lock:
+            cached = self._cache.get_cache(key)
+        if cached is not None:
+            # outputs are named after the input file, a later drop of the same name with other content overwrites it
+            if _output_stamp(cached["output"]) == cached.get("stamp"):
+                vector_perf.internal(numpy.array([TaskID.ETL, 1, time.perf_counter() - start, 0, 0]))
+                base_logger.internal(f"ETL {Path(path).name}: unchanged content, reusing {cached['output']}")
+                self._publish(cached["general"], cached["numeric"])
+                return 1
+            with self._cache_lock:
+                self._cache.pop_cache(key)
+
+        with self._budget.reserve(estimate_memory(path, kwds.get("chunksize"))):
+            waited = time.perf_counter() - start
+            future = self._get_executor().submit(run_transform, path=str(path), save_to=str(save_to), **kwds)
+            try:
+                general, numeric, worker_seconds = future.result()
+            except Exception:
+                vector_perf.internal(numpy.array([TaskID.ETL, 0, time.perf_counter() - start, 0, 1]))
+                raise
 
-        general, numeric = transform_data(path=path, save_to=save_to, **kwds)
+        duration = time.perf_counter() - start
+        rows = json.loads(general).get("row_count", 0)
+        vector_perf.internal(numpy.array([TaskID.ETL, 1, duration, rows, 0]))
+        base_logger.internal(
+            f"ETL {Path(path).name}: {rows} rows in {round(worker_seconds, 2)}s "
+            f"(waited {round(waited, 2)}s for memory, {round(duration, 2)}s total)"
+        )
 
-        stats = {
-            "general": general,
-            "numeric": numeric
-        }
-        DF_CHANNEL.write_text(json.dumps(stats, indent=2))
+        if (output:=json.loads(general).get("storage", {}).get("path")):
+            with self._cache_lock:
+                self._cache.set_cache(key, {"output": output, "stamp": _output_stamp(output), "general": general, "numeric": numeric})
+        self._publish(general, numeric)
         return 1
 
+    def _publish(self, general: str, numeric: str) -> None:
+        from theodore.core.lazy import get_live_state
+
+        get_live_state().publish(etl={"general": general, "numeric": numeric})
+
+    def stats(self) -> dict:
+        return {"etl_reserved_mb": self._budget.reserved // 1024**2}
+
 class Dispatch:
 
     def __init__(self):
@@ -186,48 +319,204 @@ class FileEventHandler:
         self._observer_target_organizer = resolved_paths[0]
         self._observer_target_etl = resolved_paths[1]
         self._observer = Observer()
-        self._file_organize_event = FileEventManager(user=self._user, target_folder=self._observer_target_organizer)
-        self._etl_event_handler = ETLEventManager(target_path=self._observer_target_etl)
+        # the home wide index watch gets its own observer, a failure to set it up must not take the other watchers with it
+        self._index_observer = Observer()
+        self._pipeline = EventPipeline()
+        self._file_organize_event = FileEventManager(user=self._user, pipeline=self._pipeline, target_folder=self._observer_target_organizer)
+        self._etl_event_handler = ETLEventManager(target_path=self._observer_target_etl, pipeline=self._pipeline)
+        self._file_index_handler = FileIndexEventManager(pipeline=self._pipeline)
 
     def start(self):
         user_info("Observer Running")
         self._observer.schedule(event_handler=self._file_organize_event, path=self._observer_target_organizer, recursive=True)
         self._observer.schedule(event_handler=self._etl_event_handler, path=self._observer_target_etl, recursive=True)
+        self._pipeline.start()
         self._observer.start()
 
+        threading.Thread(target=self._watch_index, name="file-index", daemon=True).start()
+
         self._watcher_shutdown_event.wait()
 
+        self._file_index_handler.index.set_watching(False)
+        if self._index_observer.is_alive():
+            self._index_observer.stop()
+            self._index_observer.join(2)
         self._observer.join(2)
         self._observer.stop()
+        self._pipeline.stop()
+        self._etl_event_handler.etl_manager.shutdown()
         user_info("Observer Stopped")
 
+    def stats(self) -> dict:
+        return {**self._pipeline.stats(), **self._etl_event_handler.etl_manager.stats()}
+
+    def _watch_index(self) -> None:
+        """
+        Runs on the file-index thread. Inotify adds a watch per directory under the root when the observer starts,
+        which takes a while for all of ~ and is where the watch limit is hit, so neither holds up the other watchers.
+        """
+        try:
+            self._index_observer.schedule(event_handler=self._file_index_handler, path=str(self._file_index_handler.index.root), recursive=True)
+            self._index_observer.start()
+            watching = True
+        except OSError:
+            # inotify watch limit reached, the index is then trusted for INDEX_MAX_AGE after each build
+            error_logger.internal(traceback.format_exc())
+            self._index_observer.unschedule_all()
+            watching = False
+        self._file_index_handler.prepare(watching)
+
     def stop(self):
         self._watcher_shutdown_event.set()
 
 class SystemMonitor:
     def __init__(self):
-        self._monitor_shutdown_event = threading.Event()
+        self._monitor_shutdown_event = asyncio.Event()
         self.log_handler = LogsHandler()
+        # Worker is also built in CLI processes, only a started monitor probes sensors and opens the ring for writing
+        self.collector: MetricCollector | None = None
+        self.store: MetricsStore | None = None
+        self.detector: SeriesDetector | None = None
+
+    async def start(self, interval=METRICS_INTERVAL) -> None:
+        """Sample on a fixed cadence, collection only reads counters so it runs on the loop without blocking it"""
+        from theodore.core.lazy import get_live_state
 
-    def start(self, interval=15) -> None:
-        # Start Observer
+        loop = asyncio.get_running_loop()
         system_logs.info("System Monitor running")
+        self.collector = MetricCollector()
+        self.store = MetricsStore(names=self.collector.names)
+        self.detector = SeriesDetector(self.collector.names)
+        # the last hour from the ring gives the detector a baseline instead of a fresh warm-up after every restart
+        history = self.store.raw.since(time.time() - 60 * 60)
+        for timestamp, vectors in zip(history["t"].tolist(), history["v"]):
+            self.detector.observe(vectors, dt.fromtimestamp(timestamp))
+
         while not self._monitor_shutdown_event.is_set():
+            started = loop.time()
             try:
-                get_current_metrics(interval)
-                self._monitor_shutdown_event.wait(interval)
-            except (psutil.AccessDenied, psutil.NoSuchProcess):
-                raise
-            except KeyboardInterrupt:
+                vectors = self.collector.sample()
+                self.store.append(vectors)
+                get_live_state().publish(metrics={"names": self.collector.names, "values": vectors, "t": time.time()})
+                for anomaly in self.detector.observe(vectors):
+                    user_warning(f"System anomaly: {anomaly}")
+            except asyncio.CancelledError:
                 raise
+            except Exception:
+                error_logger.internal(traceback.format_exc())
+
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._monitor_shutdown_event.wait(), timeout=max(interval - (loop.time() - started), 0))
 
     def stop(self) -> None:
         if self._monitor_shutdown_event.is_set():
             system_logs.info("System Monitor is currently not running")
             return
         self._monitor_shutdown_event.set()
+        if self.store is not None:
+            self.store.flush()
         system_logs.info("System Monitor Stopped")
 
+class WeatherPrefetcher:
+    def __init__(self):
+        self._prefetch_shutdown_event = asyncio.Event()
+
+    async def start(self, interval=20*60) -> None:
+        """Keep configured locations warm in the weather cache, interval stays inside WEATHER_CACHE_TTL"""
+        from theodore.core.lazy import get_weather_manager
+
+        weather = get_weather_manager()
+        user_info("Weather Prefetcher running")
+        while not self._prefetch_shutdown_event.is_set():
+            try:
+                for location in await weather.get_prefetch_locations():
+                    for alert in await weather.prefetch(location):
+                        user_warning(f"Weather alert for {location}: {alert.get('headline') or alert.get('event')}")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                error_logger.internal(traceback.format_exc())
+
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._prefetch_shutdown_event.wait(), timeout=interval)
+
+    def stop(self) -> None:
+        self._prefetch_shutdown_event.set()
+        user_info("Weather Prefetcher Stopped")
+
+class LogIngestor:
+    def __init__(self):
+        self._ingest_shutdown_event = asyncio.Event()
+        self.embed = importlib.util.find_spec("sentence_transformers") is not None
+
+    async def start(self, interval=60) -> None:
+        """Move new log lines into the structured logs table so queries never grep text files"""
+        from theodore.core.lazy import get_log_service
+
+        service = get_log_service()
+        user_info("Log Ingestor running")
+        while not self._ingest_shutdown_event.is_set():
+            try:
+                response = await service.ingest()
+                if not response.get("ok"):
+                    error_logger.internal(response.get("message"))
+                elif self.embed:
+                    # bounded per pass so a large backlog of records never stalls the loop for long
+                    response = await service.embed_pending()
+                    if not response.get("ok"):
+                        error_logger.internal(response.get("message"))
+                # one pass a minute gives the per-minute keyword rates
+                for anomaly in await asyncio.to_thread(service.detect_anomaly):
+                    user_warning(f"Log anomaly: {anomaly}")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                error_logger.internal(traceback.format_exc())
+
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._ingest_shutdown_event.wait(), timeout=interval)
+
+    def stop(self) -> None:
+        self._ingest_shutdown_event.set()
+        user_info("Log Ingestor Stopped")
+
+class StatePublisher:
+    def __init__(self, downloader, file_event_handler: FileEventHandler):
+        self._publisher_shutdown_event = asyncio.Event()
+        self.downloader = downloader
+        self.file_event_handler = file_event_handler
+
+    async def start(self, interval=1.0) -> None:
+        """
+        Gather what the dashboard shows into the shared live state, once a second. Metrics and ETL
+        profiles are published where they are produced, unchanged sections are not rewritten.
+        """
+        from theodore.core.lazy import get_live_state, get_log_index
+        from theodore.managers.log_search import KEYWORD_SOURCES
+
+        live, index = get_live_state(), get_log_index()
+
+        def log_counts() -> dict:
+            return {name: index.getCounts(path, words).tolist() for name, (path, words) in KEYWORD_SOURCES.items()}
+
+        while not self._publisher_shutdown_event.is_set():
+            try:
+                live.publish(
+                    logs=await asyncio.to_thread(log_counts),
+                    downloads=self.downloader.snapshot(),
+                    queues={**self.file_event_handler.stats(), "tasks": len(asyncio.all_tasks())},
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                error_logger.internal(traceback.format_exc())
+
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._publisher_shutdown_event.wait(), timeout=interval)
+
+    def stop(self) -> None:
+        self._publisher_shutdown_event.set()
+
 class Worker:
     def __init__(self):
         from theodore.managers.download_manager import DownloadManager
@@ -237,9 +526,12 @@ class Worker:
         self.__dispatch = Dispatch()
         self.__scheduler = Scheduler()
         self.__monitor = SystemMonitor()
+        self.__weather_prefetcher = WeatherPrefetcher()
+        self.__log_ingestor = LogIngestor()
         self.__log_handler = LogsHandler()
         self.__file_event_handler = FileEventHandler()
         self.__downloader = DownloadManager()
+        self.__state_publisher = StatePublisher(self.__downloader, self.__file_event_handler)
         self._worker_shutdown_event = asyncio.Event()
         self.__cmd_registry = {
             "STOP-PROCESSES": {"basename": "STOP-PROCESSES", "func": self.start_processes},
@@ -252,10 +544,7 @@ class Worker:
 
     async def start_processes(self) -> None:
         asyncio.create_task(
-            asyncio.to_thread(
-                self.__monitor.start,
-                3
-            ),
+            self.__monitor.start(),
             name="system-monitor"
         )
 
@@ -271,6 +560,21 @@ class Worker:
             name="Scheduler"
         )
 
+        asyncio.create_task(
+            self.__weather_prefetcher.start(),
+            name="weather-prefetch"
+        )
+
+        asyncio.create_task(
+            self.__log_ingestor.start(),
+            name="log-ingest"
+        )
+
+        asyncio.create_task(
+            self.__state_publisher.start(),
+            name="live-state"
+        )
+
         self.signal_task = asyncio.create_task(
             self.__signal.start(),
             name="unix-server"
@@ -279,16 +583,20 @@ class Worker:
         SERVER_STATE_FILE.write_text("running")
         await self._worker_shutdown_event.wait()
         # cleanup
-        DF_CHANNEL.unlink(missing_ok=True)
-        SYS_VECTOR_FILE.unlink(missing_ok=True)
         SERVER_STATE_FILE.unlink(missing_ok=True)
 
     async def stop_processes(self) -> None:
+        from theodore.core.lazy import get_live_state
+
         try:
 
             await self.__dispatch.shutdown()
             self.__monitor.stop()
+            self.__weather_prefetcher.stop()
+            self.__log_ingestor.stop()
+            self.__state_publisher.stop()
             self.__file_event_handler.stop()
+            shutdown_io_executor(wait=False)
             self.__scheduler.stop_jobs()
             self.__signal.stop()
 
@@ -301,8 +609,7 @@ class Worker:
             self._worker_shutdown_event.set()
         # cleanup
         finally:
-            SYS_VECTOR_FILE.unlink(missing_ok=True)
-            DF_CHANNEL.unlink(missing_ok=True)
+            get_live_state().close()
             SERVER_STATE_FILE.unlink(missing_ok=True)
 
     async def __parse_message(self, reader: asyncio.StreamReader) -> bytes | None:
@@ -439,69 +746,205 @@ class Worker:
         self.__dispatch.dispatch_one(basename, func, file_args)
         return
 
+class EventPipeline:
+    """
+    Watchdog callbacks only enqueue here. A debouncer thread merges repeated events per path, waits until
+    a file's size has not changed for `settle` seconds, then hands batches to a small worker pool.
+    """
+    def __init__(self, settle: float = 2.0, max_workers: int = 4, max_batch: int = 500, tick: float = 0.5):
+        self.settle = settle
+        self.max_batch = max_batch
+        self.tick = tick
+        self._events: queue.Queue = queue.Queue()
+        self._pending: dict[tuple[Any, str], list] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="event-pipeline")
+        self._pipeline_shutdown_event = threading.Event()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._processed = 0
+        self._latencies: deque[float] = deque(maxlen=512)
+
+    def start(self) -> None:
+        threading.Thread(target=self._debounce, name="event-debouncer", daemon=True).start()
+
+    def stop(self) -> None:
+        self._pipeline_shutdown_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, handler, path: str | Path, settle: bool = True) -> None:
+        """settle=False hands the path over on the next tick, whether or not it still exists"""
+        self._events.put((handler, str(path), time.monotonic(), settle))
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            in_flight, processed = self._in_flight, self._processed
+        return {
+            "queued": self._events.qsize(),
+            "settling": len(self._pending),
+            "in_flight": in_flight,
+            "processed": processed,
+            "latency_p50": round(latencies[len(latencies) // 2], 3) if latencies else 0.0,
+            "latency_max": round(latencies[-1], 3) if latencies else 0.0,
+        }
+
+    def _debounce(self) -> None:
+        while not self._pipeline_shutdown_event.is_set():
+            try:
+                self._note(*self._events.get(timeout=self.tick))
+                while True:
+                    self._note(*self._events.get_nowait())
+            except queue.Empty:
+                pass
+            self._flush_settled()
+
+    def _note(self, handler, path: str, seen: float, settle: bool) -> None:
+        if (entry:=self._pending.get((handler, path))) is None:
+            self._pending[(handler, path)] = [seen, seen, _file_size(path) if settle else None, settle]
+        else:
+            entry[1] = seen
+
+    def _flush_settled(self) -> None:
+        now = time.monotonic()
+        ready: dict[Any, list] = {}
+
+        for key, entry in list(self._pending.items()):
+            first_seen, last_seen, size, settle = entry
+            if not settle:
+                del self._pending[key]
+                ready.setdefault(key[0], []).append((key[1], first_seen))
+                continue
+            if now - last_seen < self.settle:
+                continue
+            if (current:=_file_size(key[1])) != size:
+                # still being written, wait another settle period
+                entry[1], entry[2] = now, current
+                continue
+            del self._pending[key]
+            if current is not None:
+                ready.setdefault(key[0], []).append((key[1], first_seen))
+
+        for handler, items in ready.items():
+            for i in range(0, len(items), self.max_batch):
+                batch = items[i:i + self.max_batch]
+                with self._lock:
+                    self._in_flight += len(batch)
+                self._executor.submit(self._run, handler, batch)
+
+    def _run(self, handler, batch: list) -> None:
+        try:
+            handler([Path(path) for path, _ in batch])
+        except Exception:
+            error_logger.internal(traceback.format_exc())
+        finally:
+            done = time.monotonic()
+            with self._lock:
+                self._in_flight -= len(batch)
+                self._processed += len(batch)
+                self._latencies.extend(done - first_seen for _, first_seen in batch)
+            system_logs.internal(f"Event pipeline: {self.stats()}")
+
+def _file_size(path: str) -> int | None:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return None
+
 class ETLEventManager(FileSystemEventHandler):
-    def __init__(self, target_path: str | Path):
+    def __init__(self, target_path: str | Path, pipeline: EventPipeline):
         self.target_path = target_path
+        self.pipeline = pipeline
         self.file_manager = FileManager()
         self.etl_manager = ETL()
 
     def on_moved(self, event: DirMovedEvent | FileMovedEvent) -> None:
-        if (p:=resolve_path(event.src_path)).is_dir():
-            return organize(p)
+        if event.is_directory:
+            return self.pipeline.submit(self.process, event.dest_path)
         return super().on_moved(event)
 
     def on_closed(self, event: FileClosedEvent) -> None:
-        if (p:=resolve_path(event.src_path)).is_dir():
-            return organize(p)
-        user_info(f"File detected in data directory. Processing...\nPath: {str(p)}")
-        if not p.suffix == ".csv":
-            return self.file_manager.move_dst_unknown(src=p)
-        signal = self.etl_manager.transform(path=p)
-        if signal:
-            self.file_manager.move_file(src=str(event.src_path), dst="~/scripts/theodore/theodore/tests/original_files")
+        self.pipeline.submit(self.process, event.src_path)
         return super().on_closed(event)
 
+    def process(self, paths: List[Path]) -> None:
+        # one unreadable file is logged and skipped, the rest of the batch still goes through
+        transforms: dict[Future, Path] = {}
+        for p in paths:
+            try:
+                if p.is_dir():
+                    organize(p)
+                    continue
+                user_info(f"File detected in data directory. Processing...\nPath: {str(p)}")
+                if not p.suffix == ".csv":
+                    self.file_manager.move_dst_unknown(src=p)
+                    continue
+                transforms[self.etl_manager.submit(path=p)] = p
+            except Exception:
+                error_logger.internal(f"ETL {p}: {traceback.format_exc()}")
+
+        for future in as_completed(transforms):
+            p = transforms[future]
+            try:
+                if future.result():
+                    self.file_manager.move_file(src=str(p), dst=str(ORIGINAL_ETL_DIR))
+            except Exception:
+                error_logger.internal(f"ETL {p}: {traceback.format_exc()}")
+
 class FileEventManager(FileSystemEventHandler):
-    def __init__(self, user: str, target_folder: str = ""):
+    def __init__(self, user: str, pipeline: EventPipeline, target_folder: str = ""):
         self._target_folder = target_folder
         self._user = user
+        self.pipeline = pipeline
         self.file_manager = FileManager()
 
     def on_moved(self, event: DirMovedEvent | FileMovedEvent) -> None:
         user_info(f"{event.src_path} Moved to {event.dest_path}. USER: {self._user}")
 
     def on_closed(self, event: FileClosedEvent) -> None:
-        if (path:=resolve_path(event.src_path)).is_dir():
-            return
-        user_info(f"New {resolve_path(event.src_path).suffix} file Detected Processing...\n {event.src_path}")
-        self.file_manager.move_dst_unknown(src=path)
+        self.pipeline.submit(self.process, event.src_path)
+
+    def process(self, paths: List[Path]) -> None:
+        for path in paths:
+            if path.is_dir():
+                continue
+            user_info(f"New {path.suffix} file Detected Processing...\n {path}")
+            try:
+                self.file_manager.move_dst_unknown(src=path)
+            except Exception:
+                error_logger.internal(f"Organizer {path}: {traceback.format_exc()}")
 
     def on_deleted(self, event: DirDeletedEvent | FileDeletedEvent) -> None:
         user_warning(f"{event.src_path} Deleted. USER: {self._user}")
 
-def get_current_metrics(interval):
-    me = psutil.Process()
-
-    cpu = psutil.cpu_percent(interval)
-    disk = psutil.disk_usage('/').percent
-
-    net = psutil.net_io_counters()
-
-    sent = round(net.bytes_sent/(1024**2), )
-    recv = round(net.bytes_recv/(1024**2), 2)
+class FileIndexEventManager(FileSystemEventHandler):
+    def __init__(self, pipeline: EventPipeline):
+        from theodore.core.lazy import get_file_index
+        self.index = get_file_index()
+        self.pipeline = pipeline
 
-    ram = round(me.memory_info().rss/1024**2, 2)
-    threads = me.num_threads()
-
-    dirs = Path(__file__).parent.parent/"data"/"vectors"
-    dirs.mkdir(parents=True, exist_ok=True)
+    def prepare(self, watching: bool) -> None:
+        """Rebuild a stale index off the observer thread, then mark it watched"""
+        try:
+            # a flag left set by a daemon that crashed would make the index look fresh
+            self.index.set_watching(False)
+            self.index.build_if_stale()
+            self.index.set_watching(watching)
+        except sqlite3.Error:
+            error_logger.internal(traceback.format_exc())
+
+    def process(self, paths: List[Path]) -> None:
+        try:
+            self.index.sync(paths)
+        except sqlite3.Error:
+            error_logger.internal(traceback.format_exc())
 
-    csv_filepath = dirs/"sys_vectors.csv"
+    # callbacks only enqueue, a bulk copy must not hold the observer thread on sqlite commits
+    def on_created(self, event: DirCreatedEvent | FileCreatedEvent) -> None:
+        self.pipeline.submit(self.process, event.src_path, settle=False)
 
-    vectors = [cpu, ram, disk, sent, recv, threads]
-    numpy.save(file=SYS_VECTOR_FILE, arr=numpy.array(vectors))
-    
-    with csv_filepath.open('a') as f:
-        f.write(f"{cpu},{ram},{disk},{sent},{recv},{threads}\n")
+    def on_deleted(self, event: DirDeletedEvent | FileDeletedEvent) -> None:
+        self.pipeline.submit(self.process, event.src_path, settle=False)
 
-    return
+    def on_moved(self, event: DirMovedEvent | FileMovedEvent) -> None:
+        self.pipeline.submit(self.process, event.src_path, settle=False)
+        self.pipeline.submit(self.process, event.dest_path, settle=False)
@@ -1,4 +1,5 @@
 import json
+import time
 
 from datetime import datetime as dt
 from tzlocal import get_localzone
@@ -14,20 +15,29 @@ from rich.console import Group
 from rich.rule import Rule
 from rich.align import Align
 
-from theodore.core.paths import SYS_VECTOR_FILE, DF_CHANNEL, SERVER_STATE_FILE
-from theodore.managers.log_search import LogSearch
+from theodore.core.paths import SERVER_STATE_FILE
+from theodore.core.live_state import LiveStateReader
 from theodore.core.informers import user_info
 
-from theodore.core.lazy import numpy, Asyncio, NDArray
+from theodore.core.lazy import numpy, Asyncio, NDArray, get_metrics_store
+from theodore.managers.log_search import KEYWORD_SOURCES
 
 # Main purpose is log search but future searches could extend data & logs
 BASEPATH = Path(__file__).parent.parent
 
 
-ctxManager = {
-    "success": [BASEPATH/"data"/"logs"/"theodore.log", ["success", "internal", "timeout", "created", "deleted"]],
-    "error": [BASEPATH/"data"/"logs"/"errors.log", ["timeout", "nonetype", "connection", "brokenpipe", "permission"]],
-}
+ctxManager = KEYWORD_SOURCES
+STALE_AFTER = 60        # seconds without a sample before the daemon's monitor is taken as stopped
+TREND_SECONDS = 10 * 60
+SPARKS = "▁▂▃▄▅▆▇█"
+MIN_FRAME_INTERVAL = 0.1
+MAX_FRAME_INTERVAL = 1.0
+PANEL_METRICS = [
+    ("cpu", "CPU", "%"), ("mem", "Memory", "%"), ("disk", "Disk", "%"),
+    ("ram", "RAM", "mb"), ("proc_cpu", "Theodore CPU", "%"), ("children", "Subprocesses", ""),
+    ("sent", "Net Sent", "mb/s ↑"), ("recv", "Net Recv", "mb/s ↓"),
+    ("read", "Disk Read", "mb/s"), ("write", "Disk Write", "mb/s"),
+]
 
 def getStyle(value: int | float, middle_mark, threshold: int | float):
     if value <= middle_mark:
@@ -37,24 +47,20 @@ def getStyle(value: int | float, middle_mark, threshold: int | float):
     else:
         return "bold red"
 
-def runMath():
-    success = ctxManager["success"]
-    error = ctxManager["error"]
-    
-    instances = {
-        "success": LogSearch(filepath=success[0], keywords=success[1]),
-        "error": LogSearch(filepath=error[0], keywords=error[1])
-    }
+def runMath(state: dict) -> Tuple[NDArray, NDArray]:
+    """Keyword counts per log as the daemon last published them"""
+    np = numpy()
+    logs = state.get("logs", {})
+    success, error = ctxManager["success"][1], ctxManager["error"][1]
 
-    return instances["success"].getLogs(), instances["error"].getLogs()
+    return np.array(logs.get("success", [0] * len(success))), np.array(logs.get("error", [0] * len(error)))
 
 label = "cyan dim"
 units = "dim"
 title = "bold cyan"
 _default = "default"
 
-def logHealthTable(keywords: List[str], logName: str, matrix: NDArray) -> Table:
-    np = numpy()
+def logHealthTable(keywords: List[str], logName: str, counts: NDArray) -> Table:
     header_style = "bold cyan" if logName == "success" else "bold red"
 
     table = Table(
@@ -68,19 +74,31 @@ def logHealthTable(keywords: List[str], logName: str, matrix: NDArray) -> Table:
     table.add_column("Keywords", header_style=header_style)
     table.add_column("Freq", justify="right", header_style=header_style, min_width=50)
 
-    colSum = np.sum(matrix, axis=0)
-    for kw, freq in zip(keywords, colSum):
+    for kw, freq in zip(keywords, counts):
         table.add_row(f"[cyan dim]{kw}[/]", f"[default]{str(int(freq))}[/]")
     return table
 
-def sysHealthPanel() -> Panel | None:
+def sparkline(values: NDArray, width: int = 40) -> str:
     np = numpy()
-
-    if not SYS_VECTOR_FILE.exists():
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return ""
+    # bucket means keep the line to width characters however many samples the window holds
+    if values.size > width:
+        edges = np.linspace(0, values.size, width + 1).astype(int)[:-1]
+        values = np.add.reduceat(values, edges) / np.diff(np.append(edges, values.size))
+    low, high = values.min(), values.max()
+    levels = np.zeros(values.size, dtype=int) if high == low else ((values - low) / (high - low) * (len(SPARKS) - 1)).round().astype(int)
+    return "".join(SPARKS[level] for level in levels)
+
+def sysHealthPanel(metrics: dict | None) -> Panel | None:
+    if not metrics or dt.now().timestamp() - metrics["t"] > STALE_AFTER:
         return None
-    
-    (cpu, ram, disk, sent, recv, threads) = np.load(SYS_VECTOR_FILE)
 
+    store = get_metrics_store()
+    sample = {name: round(float(value), 2) for name, value in zip(metrics["names"], metrics["values"])}
+    cpu, ram = sample.get("cpu", 0), sample.get("ram", 0)
+    _, history = store.window(TREND_SECONDS)
 
     status = "[bold green]✓ Healthy[/]"
     if 50 < cpu <= 75 or 1024 < ram:
@@ -88,38 +106,42 @@ def sysHealthPanel() -> Panel | None:
     elif cpu > 75 or ram > 2048:
         status = "[bold red]Unstable[/]"
 
-    t = Text()
-    c_style = getStyle(cpu, 50, 75)
-    d_style = getStyle(disk, 50, 75)
-    r_style = getStyle(ram, 500, 700)
-
-
+    styles = {
+        "cpu": getStyle(cpu, 50, 75),
+        "mem": getStyle(sample.get("mem", 0), 50, 75),
+        "disk": getStyle(sample.get("disk", 0), 50, 75),
+        "ram": getStyle(ram, 500, 700),
+        "proc_cpu": getStyle(sample.get("proc_cpu", 0), 50, 75),
+    }
+    # only what the daemon's metric sets collect is shown
+    readings = [
+        f"[{label}]{name}[/]: [{styles.get(key, _default)}]{sample[key]:g}[/][{units}] {unit}[/{units}]\n\n"
+        for key, name, unit in PANEL_METRICS if key in sample
+    ]
+    trends = [
+        f"[{label}]{name} {TREND_SECONDS//60}m[/]: [{styles.get(key, _default)}]{sparkline(column)}[/]\n"
+        for key, name in (("cpu", "CPU"), ("ram", "RAM")) if (column:=store.column(history, key)) is not None
+    ]
 
     content = Group(
         Rule("THEODORE SYSTEM HEALTH", style=title),
         f"\nStatus: {status}\n",
         f"Date: {dt.now(get_localzone()).date()}\n",
-        f"Threads: {threads}\n",
+        *([f"Threads: {int(sample['threads'])}\n"] if "threads" in sample else []),
+        *trends,
         Panel(
-            Group(
-                f"[{label}]CPU[/]: [{c_style}]{cpu}[/][{units}] %[/{units}]\n\n",
-                f"[{label}]Disk[/]: [{d_style}]{disk}[/][{units}] %[/{units}]\n\n",
-                f"[{label}]RAM[/]: [{r_style}]{ram}[/][{units}] mb[/{units}]\n\n",
-                f"[{label}]Net Sent[/{label}]: {sent}[{units}] mb/s[/][yellow]↑[/]\n\n",
-                f"[{label}]Net Recv[/{label}]: {recv}[{units}] mb/s[/][{units}]↓[/{units}]\n"
-            ),
+            Group(*readings),
             padding=(1,1)
         )
     )
     system_health = Panel(content, border_style="cyan dim")
     return system_health
 
-def newDataTable() -> Tuple[Panel, Panel] | None:
+def newDataTable(df_profile: dict | None) -> Tuple[Panel, Panel] | None:
     # dataframe overview
-    if not DF_CHANNEL.exists():
+    if not df_profile:
         return None
-    
-    df_profile = json.loads(DF_CHANNEL.read_text())
+
     general = json.loads(df_profile["general"])
 
     t = Text(tab_size=20, no_wrap=False)
@@ -141,6 +163,9 @@ def newDataTable() -> Tuple[Panel, Panel] | None:
     t2.append(f"{general['duplicated_count']}\n\n", style="bold green")
     t2.append(f"Unique:\t", style=label)
     t2.append(f"{general['unique_count']}\n", style=_default)
+    if storage := general.get("storage"):
+        t2.append(f"\nStored ({storage['format']}):\t", style=label)
+        t2.append(f"{storage['input_size']//1024} kb -> {storage['output_size']//1024} kb\n", style=_default)
 
     
     general_group = Panel(
@@ -169,11 +194,14 @@ def newDataTable() -> Tuple[Panel, Panel] | None:
         table.add_column("std", header_style=label, justify="center")
         table.add_column("Max", header_style=label, justify="center")
         table.add_column("Min", header_style=label, justify="center")
+        table.add_column("Median", header_style=label, justify="center")
         table.add_column("Outliers", header_style="red dim", justify="center")
 
-        for col, mean, max, min, std, out in zip(*numeric.values()):
+        medians = numeric.get("median", ["-"] * len(numeric["columns"]))
+        rows = zip(numeric["columns"], numeric["mean"], numeric["max"], numeric["min"], numeric["std"], numeric["outliers"], medians)
+        for col, mean, max, min, std, out, median in rows:
             table.add_row(
-                str(col), str(mean), str(std), str(max), str(min),
+                str(col), str(mean), str(std), str(max), str(min), str(median),
                 f"[{outlier(out)}]{out}[/]",
                 style=label
             )
@@ -184,13 +212,59 @@ def newDataTable() -> Tuple[Panel, Panel] | None:
     return general_group, numeric_group
 
         
-async def runDashboard():
-    np = numpy()
-    asyncio = Asyncio()
+def activityLines(state: dict) -> List[str]:
+    lines = []
+    for download in state.get("downloads", []):
+        percent = round(download["done"] / download["total"] * 100, 1) if download["total"] else 0
+        paused = f" [{units}](paused)[/]" if download["paused"] else ""
+        lines.append(f"[{label}]{download['filename']}[/]: {percent}%{paused}\n")
+    if queues := state.get("queues"):
+        lines.append(f"[{label}]Events[/]: {queues.get('queued', 0)} queued, {queues.get('in_flight', 0)} running\n")
+        if reserved := queues.get("etl_reserved_mb"):
+            lines.append(f"[{label}]ETL memory[/]: {reserved} MB reserved\n")
+        lines.append(f"[{label}]Tasks[/]: {queues.get('tasks', 0)}\n")
+    return lines
+
+def logPanels(state: dict) -> Tuple[Panel, Panel]:
+    successCounts, errorCounts = runMath(state)
+    panels = []
+    for name, heading, counts in (("error", "Error Info", errorCounts), ("success", "Success Info", successCounts)):
+        panels.append(Panel(
+            Align(
+                Group(
+                    Rule(title=f"[{title}]{heading}[/]"),
+                    logHealthTable(logName="success", keywords=ctxManager[name][1], counts=counts)
+                ),
+                vertical="bottom",
+                align="center"),
+            expand=True
+            ))
+    return panels[0], panels[1]
+
+def offlinePanel() -> Panel:
+    return Panel(Align(
+            Group(f"[{label}]Theodore Offline[/]"),
+            align="center",
+            vertical="middle"
+        ),
+        border_style=label
+    )
 
-    if not SERVER_STATE_FILE.exists():
-        return user_info("Cannot run dash Server not running.")
-    
+def activityPanel(state: dict) -> Panel:
+    successCounts, errorCounts = runMath(state)
+    return Panel(
+        Group(
+            f"\n[red dim]Log Errors:\t{errorCounts.sum()}\n",
+            f"Success Logs:\t{successCounts.sum()}\n",
+            *activityLines(state)
+        ),
+        title="Log Summary",
+        title_align="center",
+        style=label,
+        padding=(0, 1),
+    )
+
+def newLayout() -> Layout:
     layout = Layout()
 
     layout.split_row(
@@ -205,76 +279,121 @@ async def runDashboard():
 
     layout["main"].split_column(
         Layout(name="table1", ratio=1),
-        Layout(name="table2", ratio=2),
+        Layout(name="table2", ratio=1),
     )
+    return layout
+
+
+class DashboardRenderer:
+    """
+    Keeps the layout and the inputs each region was last built from, a frame rebuilds only the regions
+    whose slice of the live state changed and tells the caller whether the screen needs repainting.
+    """
+    def __init__(self):
+        self.layout = newLayout()
+        self._inputs: dict = {}
+        self._activity: Panel | None = None
+        self.frame_ms = 0.0     # build and paint time of the last repaint, measured by the caller
+
+    def _stale(self, state: dict) -> bool:
+        metrics = state.get("metrics")
+        return not metrics or dt.now().timestamp() - metrics["t"] > STALE_AFTER
+
+    def render(self, state: dict, force: bool = False) -> List[str]:
+        """Names of the regions rebuilt for this state"""
+        regions = {
+            # log counts only matter while no ETL profile takes their place
+            "main": (state.get("etl"), None if state.get("etl") else state.get("logs")),
+            "systemMonitor": (state.get("metrics"), self._stale(state)),
+            "logActivity": (state.get("logs"), state.get("downloads"), state.get("queues")),
+        }
+        changed = [name for name, inputs in regions.items() if force or self._inputs.get(name, ()) != inputs]
+
+        for name in changed:
+            self._inputs[name] = regions[name]
+            if name == "main":
+                if (data:=newDataTable(state.get("etl"))):
+                    top, bottom = (Align(panel, vertical="bottom") for panel in data)
+                else:
+                    top, bottom = logPanels(state)
+                self.layout["table1"].update(top)
+                self.layout["table2"].update(bottom)
+            elif name == "systemMonitor":
+                monitor = None if self._stale(state) else sysHealthPanel(state.get("metrics"))
+                self.layout["systemMonitor"].update(monitor or offlinePanel())
+            else:
+                self._activity = activityPanel(state)
+                self.layout["logActivity"].update(self._activity)
 
+        if changed and self._activity is not None:
+            # set on the cached panel, a new frame time alone never causes a rebuild
+            self._activity.subtitle = f"[{units}]last frame {self.frame_ms:.1f} ms[/]"
+        return changed
 
-    with Live(layout, refresh_per_second=4, screen=True):
-        while True:
-            layout["table1"].ratio = 1
-            layout["table2"].ratio = 1
 
-            successMatrix, errorMatrix = runMath()
-            if (data:=newDataTable()):
-                generalPanel, numericPanel = data
+async def runDashboard():
+    asyncio = Asyncio()
 
+    if not SERVER_STATE_FILE.exists():
+        return user_info("Cannot run dash Server not running.")
 
-                layout["table1"].update(Align(generalPanel, vertical="bottom"))
-                layout["table2"].update(Align(numericPanel, vertical="bottom"))
+    renderer = DashboardRenderer()
+    reader = LiveStateReader()
+    interval = MIN_FRAME_INTERVAL
+    with Live(renderer.layout, auto_refresh=False, screen=True) as live:
+        size = live.console.size
+        while True:
+            # one shared memory counter per tick, decoding and rebuilding only follow a new publish
+            start = time.perf_counter()
+            _, state = reader.read()
+            resized = live.console.size != size
+            size = live.console.size
+            if renderer.render(state) or resized:
+                live.refresh()
+                renderer.frame_ms = (time.perf_counter() - start) * 1000
+                interval = MIN_FRAME_INTERVAL
             else:
+                # back off while nothing moves, an idle dashboard settles at MAX_FRAME_INTERVAL
+                interval = min(interval * 2, MAX_FRAME_INTERVAL)
+            await asyncio.sleep(interval)
 
-                error = ctxManager["error"]
-                success = ctxManager["success"]
-
-                layout["table1"].update(
-                    Panel(
-                        Align(
-                            Group(
-                                Rule(title=f"[{title}]Error Info[/]"),
-                                logHealthTable(logName="success", keywords=error[1], matrix=errorMatrix)
-                            ),
-                            vertical="bottom",
-                            align="center"),
-                        expand=True
-                        )
-                    )
-                
-                layout["table2"].update(
-                    Panel(
-                        Align(
-                            Group(
-                                Rule(title=f"[{title}]Success Info[/]"),
-                                logHealthTable(logName="success", keywords=success[1], matrix=successMatrix)
-                            ),
-                            vertical="bottom",
-                            align="center"),
-                        expand=True
-                        )
-                    )
-            
-            monitor = sysHealthPanel()
-            if monitor is None:
-                layout["systemMonitor"].update(
-                Panel(Align(
-                    Group(f"[{label}]Theodore Offline[/]"),
-                    align="center",
-                    vertical="middle"
-                ),
-                border_style=label
-                )
-            )
-            else:
-                layout["systemMonitor"].update(monitor)
 
-            layout["logActivity"].update(Panel(
-                Group(
-                    f"\n[red dim]Log Errors:\t{np.sum(errorMatrix.sum(axis=1), axis=0)}\n",
-                    f"Success Logs:\t{np.sum(successMatrix.sum(axis=1), axis=0)}\n"
-                ),
-                title="Log Summary",
-                title_align="center",
-                style=label,
-                padding=(0, 1),
-                )
-            )
-            await asyncio.sleep(0.2)
\ No newline at end of file
+def benchmarkDashboard(frames: int = 200, width: int = 160, height: int = 48) -> dict:
+    """
+    Render cost per frame without a terminal: a full rebuild and paint against a frame where the state is unchanged.
+    Uses the daemon's live state when one is published, a sample state otherwise.
+    """
+    import io
+    from rich.console import Console
+
+    np = numpy()
+    _, state = LiveStateReader().read()
+    if not state:
+        state = {
+            "metrics": {"names": ["cpu", "mem", "disk", "ram", "threads"], "values": [12.5, 41.0, 63.2, 220.4, 14], "t": time.time()},
+            "logs": {name: list(range(len(words))) for name, (_, words) in ctxManager.items()},
+            "downloads": [{"filename": "sample.iso", "done": 1024, "total": 4096, "paused": False}],
+            "queues": {"queued": 0, "in_flight": 0, "tasks": 8, "etl_reserved_mb": 256},
+        }
+
+    console = Console(file=io.StringIO(), width=width, height=height, force_terminal=True, color_system="truecolor")
+    renderer = DashboardRenderer()
+    full, idle = [], []
+    for _ in range(frames):
+        start = time.perf_counter()
+        renderer.render(state, force=True)
+        console.print(renderer.layout)
+        full.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        if renderer.render(state):
+            console.print(renderer.layout)
+        idle.append(time.perf_counter() - start)
+        console.file.seek(0)
+        console.file.truncate()
+
+    def summary(samples: list) -> dict:
+        ms = np.array(samples) * 1000
+        return {"mean_ms": round(float(ms.mean()), 3), "p50_ms": round(float(np.percentile(ms, 50)), 3), "p95_ms": round(float(np.percentile(ms, 95)), 3)}
+
+    return {"frames": frames, "full": summary(full), "unchanged": summary(idle)}
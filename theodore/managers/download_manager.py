@@ -28,9 +28,23 @@ class DownloadManager:
     def __init__(self):
         self.active_events = {}
         self.cancel_flags = {}
+        # filename -> [bytes written, total bytes], read by the daemon's live state publisher
+        self.progress = {}
         self._workers = asyncio.Semaphore(4)
         self._lock = asyncio.Lock()
 
+    def snapshot(self) -> list:
+        """Active downloads with their progress, paused ones have a cleared event"""
+        return [
+            {
+                "filename": filename,
+                "done": self.progress.get(filename, [0, 0])[0],
+                "total": self.progress.get(filename, [0, 0])[1],
+                "paused": not event.is_set(),
+            }
+            for filename, event in list(self.active_events.items())
+        ]
+
     async def stop_download(self, filepath, filename) -> None:
         """Removes the downloading marker."""
         async with self._lock:
@@ -167,6 +181,7 @@ class DownloadManager:
                                                     await f.write(chunk)
                                                     written_chunk = len(chunk)
                                                     t.update(written_chunk)
+                                                    self.progress[filename] = [t.n, total_size]
                                                     downloaded_chunk += written_chunk
 
                                                 chunk_percentage = int((downloaded_chunk / total_size) * 100)
@@ -238,6 +253,7 @@ class DownloadManager:
             finally:
                 self.active_events.pop(filename, None)
                 self.cancel_flags.pop(filename, None)
+                self.progress.pop(filename, None)
         
             stmt = """SELECT 1 FROM download_manager WHERE filename = :filename AND is_downloaded = 0 LIMIT 1"""
             var_map = {'filename': filename}
@@ -1,6 +1,7 @@
-from concurrent.futures import CancelledError
 from pathlib import Path
+from rich.progress import Progress
 from rich.table import Table
+from theodore.core.theme import console
 from theodore.core.utils import normalize_ids
 from theodore.core.informers import user_info
 from theodore.core.transporter import CommunicationChannel
@@ -12,10 +13,9 @@ class FileManager:
         self.channel = CommunicationChannel()
 
     
-    def organize_files(self, src: str | Path) -> None:
+    def organize_files(self, src: str | Path, dry_run: bool = False) -> OrganizeReport | None:
         if resolve_path(src).exists():
-            organize(src_path=src)
-            return
+            return organize(src_path=src, dry_run=dry_run)
         user_error(f"Unknown File Path '{src}'")
 
 
@@ -62,8 +62,8 @@ class FileManager:
         return 
     
     
-    def undo_move(self):
-        return undo()
+    def undo_move(self, steps: int = 1) -> int:
+        return undo(steps=steps)
 
 
     def delete_file(self, *, src: Path | str, all: bool = False) -> None:
@@ -91,46 +91,17 @@ class FileManager:
         directories = [f for f in matches if f.is_dir()]
         files = list()
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-            for dir in directories:
-                try:
-                    task = executor.submit(iter_dir_content, path=dir, recursive=True)
-                    files.append(task.result(timeout=60))
-                except CancelledError:
-                    files.append(f"{dir.name} took too long got cancelled.")
-                    continue
+        # submit every directory at once, the walk has to happen inside the worker so list() the generator there
+        walk_dir = lambda d: list(iter_dir_content(path=d, recursive=True))
+        for _, contents in iter_completed(walk_dir, directories, timeout=60):
+            files.extend(contents)
 
         return files
-    
-
-    # def list_all_files(self, *, target_dir: str | Path) -> list[Any]:
-    # _target = resolve_path(target_dir)
-    # if _target.exists():
-    #     return list(iter_dir_content(_target))
-    
-    # dirname = clean_user_search(target_dir)
-    # matches = search_with_match(entry_name=dirname, recursive=True)
-    # directories = [f for f in matches if f.is_dir()]
-    
-    # files = []
-    # with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-    #     # Submit all tasks at once
-    #     future_to_dir = {executor.submit(iter_dir_content, path=d, recursive=True): d for d in directories}
-        
-    #     for future in concurrent.futures.as_completed(future_to_dir):
-    #         d = future_to_dir[future]
-    #         try:
-    #             files.extend(list(future.result())) # use extend for a flat list
-    #         except Exception as e:
-    #             files.append(f"Error reading {d.name}: {e}")
-    # return files
-
 
 
     def whereis(self, *, target_name: str | Path) -> list[Any]:
         name = clean_user_search(target_name)
-        matches = search_with_match(entry_name=name, recursive=True)
-        # still in the works
+        return search_with_match(entry_name=name, recursive=True)
 
 
     def process_non_conventional(self, *, func: Any, dst: str | Path, src: str, prompt: str):
@@ -153,10 +124,19 @@ class FileManager:
             case "q" | "n" | "no":
                 return
             case "all" | "a":
-                report = bulk_run(func, dst=dst, records=match_dict)
+                indices = None
             case _:
-                ids = normalize_ids(task_ids=response)
-                report = bulk_run(func, records=match_dict, indices=ids, dst=dst)
+                indices = normalize_ids(task_ids=response)
+
+        with Progress(console=console, transient=True) as progress:
+            task = progress.add_task(f"{getattr(func, '__name__', 'task')}...", total=len(indices or match_dict))
+            update = lambda completed, total: progress.update(task, completed=completed)
+            try:
+                report = bulk_run(func, dst=dst, records=match_dict, indices=indices, progress=update)
+            except KeyboardInterrupt:
+                # the interrupt unwinds through iter_completed, whose finally cancels every task not yet started
+                user_info("Cancelled, queued tasks dropped.")
+                return
 
         return report
 
@@ -182,4 +162,24 @@ class FileManager:
             file_dict[index] = file
 
         return table, file_dict
+
+    def get_organize_table(self, report: OrganizeReport) -> Table:
+        table = Table()
+        table.title = "Organize (dry run)" if report.dry_run else "Organize"
+        table.add_column('destination')
+        table.add_column('files', justify='right')
+
+        for destination, count in sorted(report.planned.items(), key=lambda item: -item[1]):
+            table.add_row(destination, str(count))
+
+        table.add_section()
+        table.add_row("[bold]planned[/]", str(report.total))
+        if not report.dry_run:
+            table.add_row("[bold]moved[/]", str(report.moved))
+            table.add_row("[bold]cross device[/]", str(report.cross_device))
+            table.add_row("[bold red]failed[/]", str(report.failed))
+        table.add_row("[dim]plan time[/]", f"{report.plan_seconds}s")
+        if not report.dry_run:
+            table.add_row("[dim]move time[/]", f"{report.move_seconds}s")
+        return table
     
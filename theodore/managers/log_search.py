@@ -1,96 +1,438 @@
 # import numpy as np
 import concurrent.futures
+import json
+import mmap
+import multiprocessing as mp
+import os
+import re
+import sqlite3
+import sys
+import time
 
+from contextlib import closing, suppress
 from pathlib import Path
 from typing import List, Tuple, Optional
 
 from theodore.core.file_helpers import resolve_path
 from theodore.core.lazy import numpy, NDArray
+from theodore.core.paths import DATA_DIR
+
+
+LOG_INDEX_DB = DATA_DIR/"log_index.db"
+READ_BLOCK = 4 * 1024**2
+
+SCAN_MODE = os.getenv("THEODORE_LOG_SCAN_MODE", "thread").lower()
+SCAN_WORKERS = int(os.getenv("THEODORE_LOG_SCAN_WORKERS", 0)) or os.cpu_count() or 1
+PROCESS_MIN_BYTES = 32 * 1024**2    # below this a process pool costs more than it saves
+
+# log file and the keywords counted in it, shown on the dashboard and watched for rate anomalies
+KEYWORD_SOURCES = {
+    "success": [DATA_DIR/"logs"/"theodore.log", ["success", "internal", "timeout", "created", "deleted"]],
+    "error": [DATA_DIR/"logs"/"errors.log", ["timeout", "nonetype", "connection", "brokenpipe", "permission"]],
+}
+
+LOG_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    offset INTEGER NOT NULL DEFAULT 0,
+    keywords TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counts (
+    path TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (path, keyword)
+);
+CREATE TABLE IF NOT EXISTS hits (
+    path TEXT NOT NULL,
+    inode INTEGER NOT NULL,
+    keyword TEXT NOT NULL,
+    offset INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hits_keyword ON hits(path, keyword, inode, offset);
+"""
+
+class KeywordMatcher:
+    """
+    Finds every keyword in a block of log lines without a per line loop. The block is lowercased once,
+    each keyword is a literal regex scanned over that one buffer, match starts are mapped to line numbers
+    through the newline positions and set in a preallocated (lines, keywords) bool matrix.
+    Literal patterns get re's fast substring search, a single alternation falls back to the slow
+    general matcher and measured several times slower, so each keyword keeps its own pass.
+    """
+    def __init__(self, keywords: List[str]):
+        self.keywords = [word.lower() for word in keywords]
+        # ascii keywords can be searched on raw bytes, anything else needs the decoded text
+        self._binary = all(word.isascii() for word in self.keywords)
+        self._patterns = [
+            re.compile(re.escape(word).encode() if self._binary else re.escape(word))
+            for word in self.keywords
+        ]
+
+    def _prepare(self, data: bytes) -> Tuple[bytes | str, NDArray]:
+        np = numpy()
+        if self._binary:
+            text = data.lower()
+            newlines = np.flatnonzero(np.frombuffer(text, dtype=np.uint8) == 10)
+            return text, newlines
+        text = data.decode(errors="ignore").lower()
+        newlines = np.array([m.start() for m in re.finditer("\n", text)], dtype=np.int64)
+        return text, newlines
+
+    def match(self, data: bytes) -> NDArray:
+        """(lines, keywords) bool matrix for a block of whole lines"""
+        np = numpy()
+        text, newlines = self._prepare(data)
+        lines = len(newlines) + (1 if len(text) and (not len(newlines) or newlines[-1] != len(text) - 1) else 0)
+        matrix = np.zeros((lines, len(self.keywords)), dtype=bool)
+
+        for col, pattern in enumerate(self._patterns):
+            starts = np.fromiter((m.start() for m in pattern.finditer(text)), dtype=np.int64)
+            if starts.size:
+                matrix[np.searchsorted(newlines, starts, side="left"), col] = True
+        return matrix
+
+    def lineOffsets(self, data: bytes) -> NDArray:
+        """Byte offset of each line start within data, aligned with the rows of match()"""
+        np = numpy()
+        newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 10)
+        starts = np.concatenate(([0], newlines + 1))
+        return starts[starts < len(data)] if len(data) else starts[:0]
+
 
 class LogSearch:
-    def __init__(self, filepath, keywords: List[str], splitSize = 10):
+    """
+    Keyword matrix over a log, split into line aligned byte ranges and matched in parallel.
+    mode="thread" slices one mmap of the file from a thread pool, which mostly overlaps I/O since re holds the GIL.
+    mode="process" hands ranges to a spawn pool whose workers each map the file once and read it
+    straight from the page cache, only the bit packed matrices come back.
+    """
+    def __init__(self, filepath, keywords: List[str], splitSize = 10, mode: str = SCAN_MODE, workers: int = SCAN_WORKERS):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Scan mode must be 'thread' or 'process', got {mode}")
         self.filepath = resolve_path(filepath)
         self.SplitSize = splitSize
+        self.mode = mode
+        self.workers = max(1, workers)
         self._lastLocation: int = 0
+        self._inode: int | None = None
         self._cumulative: NDArray | None = None
         self._keywords = keywords
+        self._matcher = KeywordMatcher(keywords)
+        self._processPool: concurrent.futures.ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> "LogSearch":
+        return self
 
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._processPool is not None:
+            self._processPool.shutdown(wait=False, cancel_futures=True)
+            self._processPool = None
 
     def getLogs(self) -> Optional[NDArray]:
         np = numpy()
-        if (path:=self.filepath.stat().st_size) == self._lastLocation:
+        stat = self.filepath.stat()
+        if stat.st_ino != self._inode or stat.st_size < self._lastLocation:
+            # rotated or truncated, the matrix restarts with the new file
+            self._inode, self._lastLocation, self._cumulative = stat.st_ino, 0, None
+        if (path:=stat.st_size) == self._lastLocation:
             return self._cumulative
-        
-        splits = fileSplitter(filepath=self.filepath, splitSize=self.SplitSize, start=self._lastLocation)
-        num_workers = len(splits)
-        outerMatrix  = []
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
-            innerMatrices = executor.map(self.searchLogs, *zip(*splits))
-            for matrix in innerMatrices:
-                outerMatrix.append(matrix)
+        splits = fileSplitter(filepath=self.filepath, splitSize=self.SplitSize, start=self._lastLocation, end=path)
+        if not splits:
+            self._lastLocation = path
+            return self._cumulative
+        if self.mode == "process" and path - self._lastLocation >= PROCESS_MIN_BYTES:
+            outerMatrix = self._searchProcesses(splits)
+        else:
+            outerMatrix = self._searchThreads(splits)
 
-        if self._cumulative is None:
+        if self._cumulative is not None:
+            outerMatrix.insert(0, self._cumulative)
+        if outerMatrix:
             self._cumulative = np.vstack(outerMatrix)
-        else:
-            self._cumulative = np.vstack((self._cumulative,outerMatrix))
         
         self._lastLocation = path
         return self._cumulative
 
+    def _searchThreads(self, splits: List[Tuple[int, int]]) -> List[NDArray]:
+        with self.filepath.open('rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(self.workers, len(splits))) as executor:
+                return list(executor.map(lambda split: self._matcher.match(mm[split[0]:split[1]]), splits))
 
-
-
-    def searchLogs(self, startBytes, endBytes) -> List[NDArray]:
-        innerMatrix = []
+    def _searchProcesses(self, splits: List[Tuple[int, int]]) -> List[NDArray]:
         np = numpy()
+        if self._processPool is None:
+            self._processPool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=mp.get_context("spawn"),
+                initializer=_initScanner,
+                initargs=(str(self.filepath), self._keywords)
+            )
+        # map keeps range order, so the merged matrix rows stay in file order
+        packed = self._processPool.map(_scanRange, *zip(*splits))
+        return [np.unpackbits(bits, axis=1, count=len(self._keywords)).astype(bool) for bits in packed]
+
+    def searchLogs(self, startBytes, endBytes) -> NDArray:
         with self.filepath.open('rb') as f:
             chunk = endBytes - startBytes
             
             # set marker
             f.seek(startBytes)
-            dataTxt = f.read(chunk).decode(errors='ignore')
-            for line in dataTxt.splitlines():
-                innerMatrix.append(np.array([1 if word.lower() in line.lower() else 0 for word in self._keywords]))
-        return innerMatrix
+            return self._matcher.match(f.read(chunk))
+
+
+_scanPath: str | None = None
+_scanMap: mmap.mmap | None = None
+_scanIdentity: Tuple[int, int, int] | None = None
+_scanMatcher: KeywordMatcher | None = None
+
+
+def _initScanner(filepath: str, keywords: List[str]) -> None:
+    """Process pool initializer, one matcher and one mapping per worker"""
+    global _scanPath, _scanMatcher
+    _scanPath = filepath
+    _scanMatcher = KeywordMatcher(keywords)
+
+
+def _scanRange(startBytes: int, endBytes: int) -> NDArray:
+    global _scanMap, _scanIdentity
+    # a rotated or truncated log can be as long as the old mapping, so the mapping follows device, inode and size
+    stat = os.stat(_scanPath)
+    if _scanMap is None or _scanIdentity != (stat.st_dev, stat.st_ino, stat.st_size):
+        if _scanMap is not None:
+            _scanMap.close()
+        with open(_scanPath, 'rb') as f:
+            _scanMap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            identity = os.fstat(f.fileno())
+        _scanIdentity = (identity.st_dev, identity.st_ino, identity.st_size)
+    return numpy().packbits(_scanMatcher.match(_scanMap[startBytes:endBytes]), axis=1)
+
+
+class LogIndex:
+    """
+    Persistent keyword index over log files. Each source remembers its inode and the byte offset read so far,
+    so every call only scans lines appended since the last one, across dashboard frames and restarts.
+    RotatingFileHandler renames the live file to .1 and starts a new one, the unread tail is then taken
+    from whichever backup still carries the old inode before the new file is read from byte 0.
+    """
+    def __init__(self, db_path: Path | str = LOG_INDEX_DB):
+        self.db_path = Path(db_path)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(LOG_INDEX_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def update(self, filepath: Path | str, keywords: List[str]) -> None:
+        path = resolve_path(filepath)
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+
+        key = str(path)
+        signature = json.dumps([word.lower() for word in keywords])
+        with closing(self._connect()) as conn:
+            # one writer per source at a time, a second dashboard waits instead of counting lines twice
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT inode, offset, keywords FROM sources WHERE path = ?", (key,)).fetchone()
+                inode, offset = (row[0], row[1]) if row else (stat.st_ino, 0)
 
+                if row and row[2] != signature:
+                    # keyword set changed, counts for the new words only exist from a full rescan
+                    conn.execute("DELETE FROM counts WHERE path = ?", (key,))
+                    conn.execute("DELETE FROM hits WHERE path = ?", (key,))
+                    inode, offset = stat.st_ino, 0
 
+                if inode != stat.st_ino:
+                    if (rotated:=findInode(path, inode)) is not None:
+                        self._scan(conn, key, rotated, inode, offset, keywords)
+                    self._prune(conn, path)
+                    inode, offset = stat.st_ino, 0
+                elif stat.st_size < offset:
+                    # truncated in place
+                    offset = 0
 
-def fileSplitter(filepath: Path | str, splitSize: int, start: int=0) ->  List[Tuple[int, int]]:
+                offset = self._scan(conn, key, path, inode, offset, keywords)
+                conn.execute(
+                    "INSERT INTO sources(path, inode, offset, keywords) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(path) DO UPDATE SET inode = excluded.inode, offset = excluded.offset, keywords = excluded.keywords",
+                    (key, inode, offset, signature)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _scan(self, conn: sqlite3.Connection, key: str, path: Path, inode: int, offset: int, keywords: List[str]) -> int:
+        """Count keyword hits in whole lines from offset on, returns the offset after the last complete line"""
+        np = numpy()
+        matcher = KeywordMatcher(keywords)
+        words = matcher.keywords
+        counts = np.zeros(len(words), dtype=np.int64)
+        hits = []
+
+        with path.open("rb") as f:
+            f.seek(offset)
+            carry = b""
+            while block := f.read(READ_BLOCK):
+                data = carry + block
+                end = data.rfind(b"\n") + 1
+                # a partial last line is left for the next call
+                carry = data[end:]
+                if end:
+                    matrix = matcher.match(data[:end])
+                    starts = matcher.lineOffsets(data[:end]) + offset
+                    counts += matrix.sum(axis=0)
+                    for row, col in zip(*np.nonzero(matrix)):
+                        hits.append((key, inode, words[col], int(starts[row])))
+                offset += end
+
+        conn.executemany(
+            "INSERT INTO counts(path, keyword, count) VALUES (?, ?, ?) "
+            "ON CONFLICT(path, keyword) DO UPDATE SET count = count + excluded.count",
+            [(key, word, int(count)) for word, count in zip(words, counts)]
+        )
+        conn.executemany("INSERT INTO hits(path, inode, keyword, offset) VALUES (?, ?, ?, ?)", hits)
+        return offset
+
+    def _prune(self, conn: sqlite3.Connection, path: Path) -> None:
+        """Drop line offsets of files rotated past backupCount, counts stay cumulative"""
+        alive = []
+        for candidate in logBackups(path):
+            with suppress(OSError):
+                alive.append(candidate.stat().st_ino)
+        marks = ",".join("?" * len(alive)) or "NULL"
+        conn.execute(f"DELETE FROM hits WHERE path = ? AND inode NOT IN ({marks})", (str(path), *alive))
+
+    def getCounts(self, filepath: Path | str, keywords: List[str]) -> NDArray:
+        """Hits per keyword in keyword order, brought up to date first"""
+        np = numpy()
+        self.update(filepath, keywords)
+        key = str(resolve_path(filepath))
+        with closing(self._connect()) as conn:
+            rows = dict(conn.execute("SELECT keyword, count FROM counts WHERE path = ?", (key,)).fetchall())
+        return np.array([rows.get(word.lower(), 0) for word in keywords], dtype=np.int64)
+
+    def getLines(self, filepath: Path | str, keyword: str, limit: int = 20) -> List[str]:
+        """Most recent lines matching keyword, read back through the stored offsets"""
+        path = resolve_path(filepath)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT inode, offset FROM hits WHERE path = ? AND keyword = ? ORDER BY rowid DESC LIMIT ?",
+                (str(path), keyword.lower(), limit)
+            ).fetchall()
+
+        lines, files = [], {}
+        for inode, offset in rows:
+            if inode not in files:
+                files[inode] = findInode(path, inode)
+            if (source:=files[inode]) is None:
+                continue
+            with source.open("rb") as f:
+                f.seek(offset)
+                lines.append(f.readline().decode(errors="ignore").rstrip("\n"))
+        return lines[::-1]
+
+
+def logBackups(path: Path) -> List[Path]:
+    """The live log and its RotatingFileHandler backups, newest first"""
+    return [path, *sorted(path.parent.glob(f"{path.name}.*"))]
+
+
+def findInode(path: Path, inode: int) -> Path | None:
+    """Whichever of path and its backups still carries inode, where a rotated file's unread tail now lives"""
+    for candidate in logBackups(path):
+        try:
+            if candidate.stat().st_ino == inode:
+                return candidate
+        except OSError:
+            continue
+    return None
+
+
+def fileSplitter(filepath: Path | str, splitSize: int, start: int=0, end: int | None = None) ->  List[Tuple[int, int]]:
     if not (path:=resolve_path(filepath)).exists():
         raise ValueError(f"Path {str(filepath)} could not be resolved.")
     
-    filesize = path.stat().st_size
-    approxChunk = filesize//splitSize
+    filesize = path.stat().st_size if end is None else end
+    if filesize <= start:
+        return []
+    approxChunk = max(1, (filesize - start)//splitSize)
     currentPosition = start
 
     fileSplits = []
 
-    with path.open('rb') as f:
+    with path.open('rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
         for i in range(splitSize):
-            if i == splitSize - 1:
+            if i == splitSize - 1 or currentPosition + approxChunk >= filesize:
                 fileSplits.append((currentPosition, filesize))
                 break
 
-            totalBytes = currentPosition + approxChunk
-
-            # set marker
-            f.seek(totalBytes)
-
             # read till the next line relative marker.
-            f.readline()
-
-            # get position and append
-            safeEnd = f.tell()
+            newline = mm.find(b"\n", currentPosition + approxChunk, filesize)
+            safeEnd = filesize if newline == -1 else newline + 1
             fileSplits.append((currentPosition, safeEnd))
             currentPosition = safeEnd
+            if safeEnd >= filesize:
+                break
     return fileSplits
 
 
+def legacyMatch(data: bytes, keywords: List[str]) -> NDArray:
+    """The per line, per keyword loop KeywordMatcher replaced, kept as the benchmark baseline"""
+    np = numpy()
+    return np.vstack([
+        np.array([1 if word.lower() in line.lower() else 0 for word in keywords])
+        for line in data.decode(errors='ignore').splitlines()
+    ])
+
+
+def benchmarkMatcher(filepath: Path | str, keywords: List[str], block: int = 64 * 1024**2) -> dict:
+    """Time legacyMatch against KeywordMatcher over the same line aligned blocks and check they agree"""
+    np = numpy()
+    matcher = KeywordMatcher(keywords)
+    timings = {"legacy": 0.0, "matcher": 0.0, "lines": 0, "bytes": 0}
+
+    with resolve_path(filepath).open("rb") as f:
+        while data := f.read(block) + f.readline():
+            start = time.perf_counter()
+            expected = legacyMatch(data, keywords)
+            timings["legacy"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            matrix = matcher.match(data)
+            timings["matcher"] += time.perf_counter() - start
+
+            if not np.array_equal(expected.astype(bool), matrix):
+                raise AssertionError("KeywordMatcher disagrees with the per line baseline")
+            timings["lines"] += len(matrix)
+            timings["bytes"] += len(data)
+    return timings
+
+
 if __name__ == "__main__":
     np = numpy()
-    filepath = Path("~/scripts/theodore/theodore/data/logs/errors.log").expanduser()
     KEYWORDS = ["timeout", "nonetype", "connection", "brokenpipe", "permission"]
+
+    if len(sys.argv) > 2 and sys.argv[1] == "--bench":
+        # python -m theodore.managers.log_search --bench /path/to/1gb.log
+        result = benchmarkMatcher(sys.argv[2], KEYWORDS)
+        print(f"{result['lines']} lines, {result['bytes'] / 1024**2:.0f} mb")
+        print(f"legacy:  {result['legacy']:.2f}s")
+        print(f"matcher: {result['matcher']:.2f}s ({result['legacy'] / max(result['matcher'], 1e-9):.1f}x)")
+        sys.exit(0)
+
+    filepath = Path("~/scripts/theodore/theodore/data/logs/errors.log").expanduser()
     logs = LogSearch(keywords=KEYWORDS, filepath=filepath)
     matrix = logs.getLogs()
     # np.save("theodore/data/vectors/error_log_matrix.npy", matrix)
@@ -98,4 +440,4 @@ if __name__ == "__main__":
     print("<------------------ THEODORE HEALTH REPORT---------------->")
     column_sum = np.sum(matrix, axis=0)
     for col, freq in zip(KEYWORDS, column_sum):
-        print(f"{col.upper()}: ", freq)
\ No newline at end of file
+        print(f"{col.upper()}: ", freq)
@@ -1,11 +1,410 @@
+import asyncio
+import fcntl
+import json
+import os
+import re
+import threading
+import time
 import numpy as np
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from rich.table import Table
+from sqlalchemy import select, insert, update, bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from theodore.core.informers import base_logger, send_message
+from theodore.core.logger_setup import LOGS_DIR, vector_perf
+from theodore.core.paths import DATA_DIR
+from theodore.core.lazy import sentence_model, SENTENCE_MODEL, get_log_index
+from theodore.core.anomaly import Anomaly, RateDetector
+from theodore.managers.log_search import findInode, KEYWORD_SOURCES
+from theodore.models.base import get_async_session
+from theodore.models.other_models import LOGSEARCH, LOGSOURCES
+
+
+# matches logger_setup's "%(asctime)s [%(levelname)-8s - %(name)-10s] - %(lineno)4d - %(message)s"
+LOG_LINE = re.compile(
+    rb"^(\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}) \[(\w+)\s*- (.*?)\s*\] - \s*(\d+) - (.*)$"
+)
+LOG_TIME_FORMAT = "%Y/%m/%d %H:%M:%S"
+# numpy vectors, not messages
+INGEST_SKIP = {"performance.log", "sys_vector.log"}
+INGEST_BATCH = 1000
+SETTLE = 2.0    # seconds without writes before the last record of a file is trusted to be complete
+EMBED_BATCH = 512
+SEARCH_BLOCK = 65_536    # matrix rows scored per matmul, bounds the temporary score array
+SEARCH_WORKERS = min(8, os.cpu_count() or 1)
+VECTORS_DIR = DATA_DIR/"vector_embeddings"
+LOG_VECTORS = VECTORS_DIR/"log_vectors.f32"
+LOG_VECTOR_IDS = VECTORS_DIR/"log_vectors.ids"
+LOG_VECTOR_META = VECTORS_DIR/"log_vectors.json"
+LOG_VECTOR_LOCK = VECTORS_DIR/"log_vectors.lock"
+LEVEL_STYLES = {"DEBUG": "dim", "INTERNAL": "cyan dim", "INFO": "green", "WARNING": "yellow", "ERROR": "bold red", "CRITICAL": "bold red"}
+
+
+def parse_records(data: bytes, base: int, keep_last: bool) -> Tuple[List[Dict], int]:
+    """
+    Structured rows from whole log lines starting at byte `base`, lines without a header are
+    continuations (tracebacks) of the record above. Unless keep_last, the final record is held back
+    since its continuation may still be on its way, the returned offset is where reading resumes.
+    """
+    records: List[Dict] = []
+    starts: List[int] = []
+    position = base
+
+    for raw in data.splitlines(keepends=True):
+        line = raw.rstrip(b"\r\n")
+        if match := LOG_LINE.match(line):
+            stamp, level, name, lineno, message = match.groups()
+            try:
+                timestamp = datetime.strptime(stamp.decode(), LOG_TIME_FORMAT)
+            except ValueError:
+                timestamp = None
+            if timestamp is not None:
+                records.append({
+                    "timestamp": timestamp,
+                    "level": level.decode(),
+                    "logger": name.decode(errors="ignore"),
+                    "lineno": int(lineno),
+                    "message": message.decode(errors="ignore"),
+                })
+                starts.append(position)
+                position += len(raw)
+                continue
+        if records:
+            records[-1]["message"] += "\n" + line.decode(errors="ignore")
+        position += len(raw)
+
+    if records and not keep_last:
+        return records[:-1], starts[-1]
+    return records, position
+
+
+def read_source(path: Path, offset: int, keep_last: bool) -> Tuple[List[Dict], int]:
+    with path.open("rb") as f:
+        f.seek(offset)
+        data = f.read()
+    # a partial last line is left for the next pass
+    end = data.rfind(b"\n") + 1
+    return parse_records(data[:end], offset, keep_last)
+
+
+class LogVectorIndex:
+    """
+    Unit float32 embeddings of log messages as one contiguous row major file, with a parallel file of
+    logs ids. Both are append only and read through np.memmap, so search touches the page cache
+    instead of the database and nothing but the top-k rows is ever fetched from sqlite.
+    The daemon and a CLI search both embed into the same files, writers hold an flock on lock_path.
+    """
+    def __init__(
+            self,
+            vectors: Path = LOG_VECTORS,
+            ids: Path = LOG_VECTOR_IDS,
+            meta: Path = LOG_VECTOR_META,
+            lock: Path = LOG_VECTOR_LOCK
+        ):
+        self.vectors_path = vectors
+        self.ids_path = ids
+        self.meta_path = meta
+        self.lock_path = lock
+        self._lock = threading.Lock()
+        self.dim: int | None = None
+        self._load_meta(reset=False)
+
+    def _load_meta(self, reset: bool) -> None:
+        """Dim of the files on disk, another process may have created them since. Vectors of another model are only dropped by a writer"""
+        self.dim = None
+        if self.meta_path.exists():
+            info = json.loads(self.meta_path.read_text())
+            if info.get("model") == SENTENCE_MODEL:
+                self.dim = info["dim"]
+            elif reset:
+                self.reset()
+
+    def lock(self):
+        """Block until this process is the only writer, returns the handle for unlock. Blocking, call it off the event loop"""
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        handle = self.lock_path.open("a")
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        # last_id and the file lengths have to be what the other writer left
+        self._load_meta(reset=True)
+        return handle
+
+    def unlock(self, handle) -> None:
+        fcntl.flock(handle, fcntl.LOCK_UN)
+        handle.close()
+
+    def reset(self) -> None:
+        for path in (self.vectors_path, self.ids_path, self.meta_path):
+            path.unlink(missing_ok=True)
+        self.dim = None
+
+    def __len__(self) -> int:
+        if self.dim is None or not self.vectors_path.exists() or not self.ids_path.exists():
+            return 0
+        # a crash between the two appends leaves one file ahead, the shorter one is the truth
+        return min(self.vectors_path.stat().st_size // (4 * self.dim), self.ids_path.stat().st_size // 8)
+
+    def last_id(self) -> int:
+        if not (count:=len(self)):
+            return 0
+        return int(np.memmap(self.ids_path, dtype=np.int64, mode="r", shape=(count,))[-1])
+
+    def append(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        """Callers hold lock()"""
+        with self._lock:
+            if self.dim is None:
+                VECTORS_DIR.mkdir(parents=True, exist_ok=True)
+                self.dim = int(vectors.shape[1])
+                self.meta_path.write_text(json.dumps({"model": SENTENCE_MODEL, "dim": self.dim}))
+            count = len(self)
+            with self.vectors_path.open("r+b" if self.vectors_path.exists() else "wb") as f:
+                f.truncate(count * 4 * self.dim)
+                f.seek(0, 2)
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            with self.ids_path.open("r+b" if self.ids_path.exists() else "wb") as f:
+                f.truncate(count * 8)
+                f.seek(0, 2)
+                f.write(np.asarray(ids, dtype=np.int64).tobytes())
+
+    def top_k(self, query: np.ndarray, k: int = 10) -> List[Tuple[int, float]]:
+        """(logs id, cosine) of the k nearest messages, query must be a unit vector"""
+        if not (count:=len(self)):
+            return []
+        matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+        ids = np.memmap(self.ids_path, dtype=np.int64, mode="r", shape=(count,))
+        query = query.astype(np.float32, copy=False)
+
+        def block_top(start: int) -> Tuple[np.ndarray, np.ndarray]:
+            scores = matrix[start:start + SEARCH_BLOCK] @ query
+            keep = np.argpartition(scores, -k)[-k:] if scores.size > k else np.arange(scores.size)
+            return scores[keep], keep + start
+
+        # numpy drops the GIL inside the matmul, so blocks are scored on every core
+        starts = range(0, count, SEARCH_BLOCK)
+        if len(starts) > 1 and SEARCH_WORKERS > 1:
+            with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as pool:
+                tops = list(pool.map(block_top, starts))
+        else:
+            tops = [block_top(start) for start in starts]
+
+        best_scores = np.concatenate([scores for scores, _ in tops])
+        best_rows = np.concatenate([rows for _, rows in tops])
+        if best_scores.size > k:
+            keep = np.argpartition(best_scores, -k)[-k:]
+            best_scores, best_rows = best_scores[keep], best_rows[keep]
+        order = np.argsort(-best_scores)
+        return [(int(ids[best_rows[i]]), float(best_scores[i])) for i in order]
+
+
 class LogService:
-    def search(self, txt):...
+    def __init__(self, logs_dir: Path = LOGS_DIR):
+        self.logs_dir = logs_dir
+        self._vectors: LogVectorIndex | None = None
+        self._rates: RateDetector | None = None
+
+    def sources(self) -> List[Path]:
+        return [path for path in sorted(self.logs_dir.glob("*.log")) if path.name not in INGEST_SKIP]
+
+    async def ingest(self) -> Dict:
+        """Append new lines of every log file to the logs table, each file resumes from its stored offset and inode"""
+        from theodore.managers.shell_manager import TaskID
+
+        start = time.perf_counter()
+        total = 0
+        try:
+            async with get_async_session() as conn:
+                for path in self.sources():
+                    total += await self._ingest_source(conn, path)
+                await conn.commit()
+        except SQLAlchemyError as e:
+            return send_message(False, message=f"Unable to ingest logs: {e}")
+        # to performance.log, which is not ingested, a line in theodore.log would be picked up by the next pass
+        vector_perf.internal(np.array([TaskID.LogIngest, 1, time.perf_counter() - start, total, 0]))
+        return send_message(True, data=total)
+
+    async def _ingest_source(self, conn, path: Path) -> int:
+        try:
+            stat = path.stat()
+        except OSError:
+            return 0
+
+        row = (await conn.execute(
+            select(LOGSOURCES.c.inode, LOGSOURCES.c.offset).where(LOGSOURCES.c.path == str(path))
+        )).first()
+        inode, offset = (row.inode, row.offset) if row else (stat.st_ino, 0)
+        records: List[Dict] = []
+
+        if inode != stat.st_ino:
+            # rotated: finish the old file from whichever backup holds it now, then start the new one
+            if (rotated:=findInode(path, inode)) is not None:
+                tail, _ = await asyncio.to_thread(read_source, rotated, offset, True)
+                records.extend(tail)
+            inode, offset = stat.st_ino, 0
+        elif stat.st_size < offset:
+            offset = 0
+
+        settled = time.time() - stat.st_mtime > SETTLE
+        fresh, offset = await asyncio.to_thread(read_source, path, offset, settled)
+        records.extend(fresh)
+
+        # the daemon and a CLI query ingest the same files, the offset only moves from the value this pass read.
+        # The claim takes sqlite's write lock, whoever claims second finds the offset moved and inserts nothing
+        if row is None:
+            claim = sqlite_insert(LOGSOURCES).values(path=str(path), inode=inode, offset=offset)
+            claim = claim.on_conflict_do_nothing(index_elements=[LOGSOURCES.c.path])
+        else:
+            claim = update(LOGSOURCES).where(
+                LOGSOURCES.c.path == str(path), LOGSOURCES.c.inode == row.inode, LOGSOURCES.c.offset == row.offset
+            ).values(inode=inode, offset=offset)
+        if (await conn.execute(claim)).rowcount != 1:
+            return 0
+
+        for i in range(0, len(records), INGEST_BATCH):
+            await conn.execute(insert(LOGSEARCH), records[i:i + INGEST_BATCH])
+        return len(records)
+
+    async def query(
+            self,
+            since: datetime | None = None,
+            until: datetime | None = None,
+            levels: List[str] | None = None,
+            logger: str | None = None,
+            contains: str | None = None,
+            limit: int = 50
+            ) -> Dict:
+        """Newest first, served by the timestamp, level and logger indexes"""
+        await self.ingest()
+        query = select(
+            LOGSEARCH.c.timestamp, LOGSEARCH.c.level, LOGSEARCH.c.logger, LOGSEARCH.c.lineno, LOGSEARCH.c.message
+        )
+        if since: query = query.where(LOGSEARCH.c.timestamp >= since)
+        if until: query = query.where(LOGSEARCH.c.timestamp <= until)
+        if levels: query = query.where(LOGSEARCH.c.level.in_([level.upper() for level in levels]))
+        if logger: query = query.where(LOGSEARCH.c.logger.startswith(logger))
+        if contains: query = query.where(LOGSEARCH.c.message.contains(contains))
+        query = query.order_by(LOGSEARCH.c.timestamp.desc()).limit(limit)
+
+        try:
+            async with get_async_session() as conn:
+                response = await conn.execute(query)
+                return send_message(True, data=response.mappings().all())
+        except SQLAlchemyError as e:
+            return send_message(False, message=f"Unable to query logs: {e}")
 
-    def vectorize_txt(self, txt):...
+    def get_logs_table(self, rows) -> Table:
+        table = Table(title="Logs", show_lines=False, expand=True)
+        table.add_column("[bold]Time[/]", no_wrap=True)
+        table.add_column("[bold]Level[/]", no_wrap=True)
+        table.add_column("[bold]Logger[/]", no_wrap=True)
+        table.add_column("[bold]Line[/]", justify="right")
+        table.add_column("[bold]Message[/]", overflow="fold")
+        scored = bool(rows) and "score" in rows[0]
+        if scored:
+            table.add_column("[bold]Score[/]", justify="right")
+        for row in reversed(rows):
+            style = LEVEL_STYLES.get(row["level"], "default")
+            table.add_row(
+                row["timestamp"].strftime(LOG_TIME_FORMAT),
+                f"[{style}]{row['level']}[/]",
+                row["logger"] or "",
+                str(row["lineno"] or ""),
+                row["message"] or "",
+                *([f"{row['score']:.3f}"] if scored else []),
+            )
+        return table
 
-    def detect_anomaly(self):...
+    def _vector_index(self) -> LogVectorIndex:
+        if self._vectors is None:
+            self._vectors = LogVectorIndex()
+        return self._vectors
+
+    def vectorize_txt(self, txt: str | List[str]) -> np.ndarray:
+        """Unit float32 embeddings from the sentence model IntentRouter uses"""
+        vectors = sentence_model().encode(txt, convert_to_numpy=True, precision="float32", batch_size=64)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    async def embed_pending(self, limit: int | None = 4 * EMBED_BATCH) -> Dict:
+        """
+        Embed up to limit logs rows (all when None) past the last indexed id, in batches. Repeated messages are encoded once per batch,
+        vectors go to the memory mapped matrix and, compactly as float32 bytes, to logs.vector.
+        """
+        index = self._vector_index()
+        embedded = 0
+        handle = await asyncio.to_thread(index.lock)
+        try:
+            async with get_async_session() as conn:
+                while limit is None or embedded < limit:
+                    rows = (await conn.execute(
+                        select(LOGSEARCH.c.id, LOGSEARCH.c.message)
+                        .where(LOGSEARCH.c.id > index.last_id())
+                        .order_by(LOGSEARCH.c.id)
+                        .limit(EMBED_BATCH)
+                    )).all()
+                    if not rows:
+                        break
+
+                    messages = [row.message or "" for row in rows]
+                    unique, inverse = np.unique(np.array(messages, dtype=object), return_inverse=True)
+                    vectors = (await asyncio.to_thread(self.vectorize_txt, unique.tolist()))[inverse]
+                    ids = np.array([row.id for row in rows], dtype=np.int64)
+
+                    await conn.execute(
+                        update(LOGSEARCH).where(LOGSEARCH.c.id == bindparam("row_id")).values(vector=bindparam("blob")),
+                        [{"row_id": int(i), "blob": arr_to_bytes(v)} for i, v in zip(ids, vectors)]
+                    )
+                    await conn.commit()
+                    index.append(ids, vectors)
+                    embedded += len(rows)
+        except SQLAlchemyError as e:
+            return send_message(False, message=f"Unable to embed logs: {e}")
+        finally:
+            index.unlock(handle)
+        return send_message(True, data=embedded)
+
+    async def search(self, txt: str, k: int = 10) -> Dict:
+        """Top-k log records by cosine similarity to txt"""
+        index = self._vector_index()
+        start = time.perf_counter()
+        query = await asyncio.to_thread(self.vectorize_txt, txt)
+        hits = index.top_k(query, k=k)
+        base_logger.internal(f"Log search over {len(index)} vectors took {round((time.perf_counter() - start) * 1000, 1)}ms")
+        if not hits:
+            return send_message(True, data=[])
+
+        scores = dict(hits)
+        try:
+            async with get_async_session() as conn:
+                rows = (await conn.execute(
+                    select(
+                        LOGSEARCH.c.id, LOGSEARCH.c.timestamp, LOGSEARCH.c.level,
+                        LOGSEARCH.c.logger, LOGSEARCH.c.lineno, LOGSEARCH.c.message
+                    ).where(LOGSEARCH.c.id.in_(list(scores)))
+                )).mappings().all()
+        except SQLAlchemyError as e:
+            return send_message(False, message=f"Unable to search logs: {e}")
+
+        ranked = sorted(({**row, "score": scores[row["id"]]} for row in rows), key=lambda row: -row["score"])
+        return send_message(True, data=ranked)
+
+    def detect_anomaly(self, sources: Dict[str, list] = KEYWORD_SOURCES) -> List[Anomaly]:
+        """
+        Per-minute keyword rates from the log index, scored against their usual rate for the hour.
+        Call it about once a minute, the first call only sets the starting counts.
+        """
+        index = get_log_index()
+        names = [f"{name}.{word}" for name, (_, words) in sources.items() for word in words]
+        if self._rates is None or self._rates.names != names:
+            self._rates = RateDetector(names)
+
+        counts = np.concatenate([index.getCounts(path, words) for path, words in sources.values()])
+        return self._rates.observe_counts(counts)
 
 
 
@@ -14,5 +413,3 @@ def arr_to_bytes(arr: np.ndarray):
 
 def arr_from_bytes(blob: bytes) -> np.ndarray:
     return np.frombuffer(blob,dtype=np.float32)
-
-
@@ -27,6 +27,10 @@ class TaskID(IntEnum):
     Extraction = 3
     Compression = 4
     Backup = 5
+    ETL = 6
+    FirstPrompt = 7
+    ModelReady = 8
+    LogIngest = 9
 
 
 class ShellManager:
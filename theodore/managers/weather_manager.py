@@ -1,5 +1,6 @@
 import fake_user_agent
-import httpx, time, os
+import asyncio, httpx, os, traceback
+from contextlib import nullcontext
 from dotenv import load_dotenv, find_dotenv
 from datetime import datetime, timedelta
 from rich.table import Table
@@ -8,13 +9,12 @@ from theodore.core.logger_setup import base_logger
 from theodore.core.informers import send_message, user_error
 from theodore.core.db_operations import DBTasks
 from theodore.core.utils import get_weather_models
-from theodore.models.base import get_async_session
 from theodore.models.configs import ConfigTable
 from theodore.models.weather import Current, Alerts, Forecasts
-from sqlalchemy import select, or_
 from theodore.core.paths import DATA_DIR
 from theodore.core.time_converters import get_localzone
 from theodore.managers.configs_manager import ConfigManager
+from theodore.managers.cache_manager import Cache_manager
 from httpx import ConnectTimeout, ReadTimeout, ReadError
 from typing import Type, TypeVar
 
@@ -32,56 +32,93 @@ T = TypeVar('T', bound=WeatherModel)
 
 FILE_PATH = CACHE_DIR / 'dummy.cache'
 
+# The daemon prefetcher refreshes well inside this window so interactive calls hit the cache
+WEATHER_CACHE_TTL = 30 * 60
+ALERT_MEMORY = 24 * 60 * 60     # seconds an alert is remembered as raised at least, feeds keep listing some past their expiry
+
+def alert_expiry(alert: dict, now: float) -> float:
+    """Epoch seconds until which the alert counts as raised, its own 'expires' when that is later than ALERT_MEMORY from now"""
+    try:
+        expires = datetime.fromisoformat(alert.get('expires') or '')
+    except (TypeError, ValueError):
+        return now + ALERT_MEMORY
+    if expires.tzinfo is None:
+        expires = expires.replace(tzinfo=get_localzone())
+    return max(expires.timestamp(), now + ALERT_MEMORY)
+
+
 class WeatherManager:
+    def __init__(self):
+        self.cache = Cache_manager(ttl=WEATHER_CACHE_TTL)
+        # alert key -> epoch seconds it expires, pruned on every prefetch so a long running daemon does not grow it
+        self._seen_alerts: dict[tuple, float] = {}
 
     def validate_data(self, schema: Type[T], raw_data: dict, extra_context: dict):
         return schema(**raw_data, **extra_context).model_dump()
 
-    async def make_request(self, query, location: str = None, retries: int =3, clear_cache = False):
+    async def get_defaults(self):
+        with DBTasks(ConfigTable) as config_manager:
+            return await config_manager.get_features({'category': 'weather'}, first=True)
+
+    async def get_prefetch_locations(self) -> list[str]:
+        """Configured default location first, then any extra ';' separated WEATHER_PREFETCH_LOCATIONS"""
+        defaults = await self.get_defaults()
+        locations = [defaults.default_location] if defaults and defaults.default_location else []
+        extra = os.getenv('WEATHER_PREFETCH_LOCATIONS') or ''
+        locations.extend(loc.strip() for loc in extra.split(';') if loc.strip())
+        return list(dict.fromkeys(locations))
+
+    async def prefetch(self, location: str) -> list[dict]:
+        """Refresh current, forecast and alerts for location, returns alerts not seen before"""
+        new_alerts = []
+        now = datetime.now(get_localzone()).timestamp()
+        self._seen_alerts = {key: expires for key, expires in self._seen_alerts.items() if expires > now}
+        for query in ('current', 'forecast', 'alerts'):
+            response = await self.make_request(query=query, location=location, prefetch=True)
+            if not response.get('ok'):
+                base_logger.internal(f"Prefetch {query} for {location} failed: {response.get('message')}")
+                continue
+            if query != 'alerts':
+                continue
+
+            for alert in (response.get('data') or {}).get('alerts', {}).get('alert', []):
+                key = (location.lower(), alert.get('headline'), alert.get('effective'))
+                if key in self._seen_alerts:
+                    continue
+                self._seen_alerts[key] = alert_expiry(alert, now)
+                new_alerts.append(alert)
+        return new_alerts
+
+    async def make_request(self, query, location: str = None, retries: int =3, clear_cache = False, prefetch: bool = False):
         """Make weather request from the weather API 
 
-        - headers: special key_word headers you'd like to add
+        - prefetch: skip cache reads and the spinner, used by the daemon to keep the cache warm
 
         returns dict with request response and validation response
-        for attempt in range(retries + 1):
-
         """
         base_logger.internal('Attempting weather request')
-        weather_map = {
-            'forecast': select(Forecasts),
-            'current': select(Current),
-            'alerts': select(Alerts)
-        }
-
-        async with get_async_session() as session:
-            NOW = datetime.now(tz=get_localzone())
-            table = weather_map[query]
-            stmt = (table
-                    .where(or_(table.c.city == location, table.c.country == location))
-                    .where(table.c.time_requested >= NOW - timedelta(minutes=30))
-                    .order_by(table.c.time_requested.desc())
-                    .limit(1)
-                    )
-            result = await session.execute(stmt)
-            cache = result.mappings().first()
-
-        if cache is not None:
-            return send_message(True, data=cache)
-
-        with DBTasks(ConfigTable) as config_manager:
-            defaults = await config_manager.get_features({'category': 'weather'}, first=True)
+        defaults = await self.get_defaults()
 
         if location is None:
-            location = defaults.default_location
+            location = defaults.default_location if defaults else None
             if not location:
-                    user_error.error("Unable to fetch no location to query weather data from.")
+                    user_error("Unable to fetch no location to query weather data from.")
                     return send_message(False, message='no location')
+
+        cache_key = f"{query}:{location}"
+        if clear_cache:
+            self.cache.pop_cache(cache_key)
+        elif not prefetch and (cache:=self.cache.get_cache(cache_key)) is not None:
+            base_logger.internal(f'{query} weather for {location} served from cache')
+            return send_message(True, data=cache)
+
         data = {}
-        
-        with console.status(f'Fetching weather data for {location.capitalize()}', spinner='arc'):
+        status = nullcontext() if prefetch else console.status(f'Fetching weather data for {location.capitalize()}', spinner='arc')
+
+        with status:
             for attempt in range(retries + 1):
                 try:
-                    API_KEY  = os.getenv('WEATHER_API_KEY') or defaults.api_key
+                    API_KEY  = os.getenv('WEATHER_API_KEY') or (defaults.api_key if defaults else None)
                     if not API_KEY:
                         base_logger.internal("[!] Missing environment variable: 'weather_api_key' aborting")
                         return send_message(False, message="Missing environment variable: 'weather_api_key'")
@@ -98,14 +135,23 @@ class WeatherManager:
                     async with httpx.AsyncClient(timeout=30) as client:
                         base_logger.internal('awaiting response from client')
                         response = await client.get(url=url, params=params, headers=headers)
+                        try:
+                            data = response.json()
+                        except ValueError:
+                            data = {}
+                        # API errors carry a json body, let them through to the error handling below
+                        if 'error' in data:
+                            break
                         response.raise_for_status() 
                         base_logger.debug(f'weather data jsonified {data}')
+                        break
                 except (ConnectTimeout, ReadTimeout, ReadError,) as e:
                     if attempt == retries:
                         base_logger.internal(f'{type(e).__name__} error. Aborting...')
                         return send_message(False, message='A server error occurred')
-                    time.sleep(1)
+                    await asyncio.sleep(1)
                 except httpx.HTTPError:
+                    data = {}
                     continue
                 except Exception as e:
                     user_error(f'{type(e).__name__} error. Aborting...')
@@ -128,30 +174,53 @@ class WeatherManager:
                     final_message = f"{error_code} - {error_message}"
                 return send_message(False, message=f"[red bold][!] An API error occurred:[/red bold] {final_message}")
 
-            registry = {
-                'current': {'table': Current, 'schema': CurrentModel, 'path': ['current']},
-                'forecast': {'table': Forecasts, 'schema': ForecastModel, 'path': ['forecast', 'forecastday', 0, {'split': ['day', 'astro']}]},
-                'alerts': {'table': Alerts, 'schema': AlertsModel, 'path': ['alerts', 'alert']}
-            }
+            self.cache.set_cache(cache_key, data)
+            await self.save_history(query=query, data=data)
+            return send_message(True, data=data)
+
+    async def save_history(self, query, data: dict) -> None:
+        """Store validated weather rows, the raw payload in the cache is what gets served"""
+        registry = {
+            'current': {'table': Current, 'schema': CurrentModel, 'path': ['current']},
+            'forecast': {'table': Forecasts, 'schema': ForecastModel, 'path': ['forecast', 'forecastday', 0, {'split': ['day', 'astro']}]},
+            'alerts': {'table': Alerts, 'schema': AlertsModel, 'path': ['alerts', 'alert'], 'many': True}
+        }
 
-            reg = registry[query]
-            nested_data = data
-            extra_context = {}
+        reg = registry[query]
+        nested_data = data
+        extra_context = {}
 
+        try:
             for key in reg['path']:
-                if key == 'split':
-                    extra_context = nested_data.get('astro')
-                    nested_data = nested_data.get('day')
-                if key.isdigit():
-                    nested_data = nested_data[key]
-                nested_data = nested_data.get(key, {})
-
-            extra_context.update(data.get('location', {}))
-            table = reg['table']
-            data_dict = self.validate_data(reg['schema'], raw_data=nested_data, extra_context=extra_context)
-            
-            await DBTasks(table).upsert_features(values=data_dict)
-            return send_message(True, data=data_dict)
+                if isinstance(key, dict):
+                    extra_context = dict(nested_data.get('astro', {}))
+                    nested_data = nested_data.get('day', {})
+                elif isinstance(key, int):
+                    nested_data = nested_data[key] if len(nested_data) > key else {}
+                else:
+                    nested_data = nested_data.get(key, {})
+
+            if not nested_data:
+                return
+
+            location = data.get('location', {})
+            extra_context.update(location)
+            # one history row per location and day: the forecast's own day, otherwise the location's local date
+            day = None
+            if query == 'forecast':
+                day = (data.get('forecast', {}).get('forecastday') or [{}])[0].get('date')
+            extra_context['date'] = day or str(location.get('localtime') or '')[:10] or datetime.now(get_localzone()).date()
+
+            key_columns = [column.name for column in reg['table'].primary_key.columns]
+            for item in (nested_data if reg.get('many') else [nested_data]):
+                data_dict = self.validate_data(reg['schema'], raw_data=item, extra_context=extra_context)
+                if reg.get('many'):
+                    # alerts are told apart by headline and start, sqlite never matches a NULL key on conflict
+                    data_dict.update({column: data_dict.get(column) or '' for column in ('headline', 'effective')})
+                key = {column: data_dict[column] for column in key_columns}
+                await DBTasks(reg['table']).upsert_features(values=data_dict, primary_key=key)
+        except Exception:
+            base_logger.internal(f'Unable to save {query} weather history\n{traceback.format_exc()}')
         
 
     def get_current_weather_table(self, data, temp = None, speed= None):
@@ -1,7 +1,7 @@
 from theodore.models.base import meta, DB 
 from theodore.models.configs import ConfigTable
 from theodore.models.downloads import DownloadTable
-from theodore.models.other_models import Queues, FileLogsTable
+from theodore.models.other_models import Queues, FileLogsTable, LOGSEARCH, LOGSOURCES
 from theodore.models.tasks import TasksTable
 from theodore.models.weather import Current, Forecasts, Alerts
 
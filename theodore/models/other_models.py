@@ -1,6 +1,6 @@
 import pickle
 from theodore.models.base import meta
-from sqlalchemy import Table, Column, String, DateTime, Boolean, TIMESTAMP, BLOB
+from sqlalchemy import Table, Column, String, DateTime, Boolean, TIMESTAMP, BLOB, Integer, Index
 
 Queues = Table(
     'queues',
@@ -25,9 +25,25 @@ FileLogsTable = Table(
 LOGSEARCH = Table(
     "logs",
     meta,
+    # explicit so the log vector index survives VACUUM, which may renumber implicit rowids
+    Column('id', Integer, primary_key=True, autoincrement=True),
     Column('timestamp', TIMESTAMP, nullable=False),
     Column('level', String(20), nullable=False),
     Column('message', String(256)),
-    Column('vector', BLOB)
+    Column('vector', BLOB),
+    Column('logger', String(50)),
+    Column('lineno', Integer),
+    Index('ix_logs_timestamp', 'timestamp'),
+    Index('ix_logs_level_timestamp', 'level', 'timestamp'),
+    Index('ix_logs_logger_timestamp', 'logger', 'timestamp'),
+    sqlite_autoincrement=True,
+)
+
+LOGSOURCES = Table(
+    "log_sources",
+    meta,
+    Column('path', String, primary_key=True, nullable=False),
+    Column('inode', Integer, nullable=False),
+    Column('offset', Integer, nullable=False, default=0),
 )
 
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Table, Column, String, Float, Integer, ForeignKey, DateTime
+from sqlalchemy import Table, Column, String, Float, Integer, Date, DateTime
 from theodore.models.base import meta
 from theodore.core.time_converters import get_localzone
 
@@ -8,6 +8,9 @@ Current = Table(
     'current',
     meta,
     Column('city', String, primary_key=True),
+    Column('lat', Float, primary_key=True),
+    Column('lon', Float, primary_key=True),
+    Column('date', Date, primary_key=True),
     Column('country', String),
     Column("text", String),
     Column("temp_c", Float),
@@ -24,15 +27,19 @@ Current = Table(
 Alerts = Table(
     'alerts',
     meta,
-    Column("country", String, primary_key=True),
-    Column('headline', String),
+    Column('city', String, primary_key=True),
+    Column('lat', Float, primary_key=True),
+    Column('lon', Float, primary_key=True),
+    Column('date', Date, primary_key=True),
+    Column("country", String),
+    # several alerts can be active for one location and day
+    Column('headline', String, primary_key=True),
     Column('event', String),
-    Column('city', ForeignKey('current.city')),
     Column('certainty', String),
     Column('urgency', String),
     Column('severity', String),
     Column('note', String),
-    Column('effective', String),
+    Column('effective', String, primary_key=True),
     Column('description', String),
     Column('instructions', String),
     Column('time_requested', DateTime(timezone=True), default=datetime.now(get_localzone())),
@@ -41,7 +48,11 @@ Alerts = Table(
 Forecasts = Table(
     'forecasts',
     meta,
-    Column("country", String, primary_key=True),
+    Column('city', String, primary_key=True),
+    Column('lat', Float, primary_key=True),
+    Column('lon', Float, primary_key=True),
+    Column('date', Date, primary_key=True),
+    Column("country", String),
     Column('time_requested', DateTime(timezone=True), default=datetime.now(get_localzone())),
     Column("sunrise", DateTime(True)),
     Column("sunset", DateTime(True)),
@@ -61,7 +72,6 @@ Forecasts = Table(
     Column("daily_chance_of_snow", Float),
     Column("daily_will_it_rain", Integer),
     Column("daily_will_it_snow", Integer),
-    Column('city', ForeignKey('current.city')),
 )
 
 # ctrl + shift + u + 00b0 + ENTER